@@ -134,9 +134,23 @@ class WorkflowConfiguration(BaseModel):
     isolation_method: str = Field(default="direct", description="Script isolation method: direct, docker, or vm")
     execution_timeout: int = Field(default=300, description="Script execution timeout in seconds")
     max_retries: int = Field(default=3, description="Maximum retry attempts for operations")
+    output_head_size: int = Field(default=256 * 1024, description="Characters of script output kept from the start")
+    output_tail_size: int = Field(default=1024 * 1024, description="Characters of script output kept from the end")
+    output_log_dir: Optional[Path] = Field(default=None, description="Directory for compressed full output logs (system temp directory if unset); older logs are pruned to output_log_max_files and output_log_max_age whenever a new one is written")
+    output_log_max_files: int = Field(default=100, description="Full output logs kept in output_log_dir")
+    output_log_max_age: Optional[int] = Field(default=7 * 24 * 3600, description="Seconds full output logs are kept (None keeps them regardless of age)")
+    script_cpu_limit: Optional[int] = Field(default=None, description="CPU seconds each process of a directly executed script may use")
+    script_memory_limit: Optional[int] = Field(default=None, description="Address space in bytes each process of a directly executed script may use")
+    script_open_files_limit: Optional[int] = Field(default=None, description="Open files each process of a directly executed script may hold")
+    script_file_size_limit: Optional[int] = Field(default=None, description="Largest file in bytes a directly executed script may write")
+    script_cache_ttl: int = Field(default=30, description="Seconds results of scripts marked idempotent are reused (0 disables)")
+    docker_pool_size: int = Field(default=0, description="Warm containers kept per Docker image for scripts marked read-only (0 starts a new container per script); other scripts always get a fresh container")
+    docker_pool_max_uses: int = Field(default=20, description="Scripts run in a pooled container before it is replaced")
+    docker_pool_idle_timeout: int = Field(default=300, description="Seconds before an idle pooled container is removed")
     
     # Verification settings
     skip_verification: bool = Field(default=False, description="Skip verification steps")
+    verification_shell_worker: bool = Field(default=False, description="Run directly executed verification steps in a pool of persistent shells instead of a new process each; resource limits do not apply to them")
     verify_rollback: bool = Field(default=True, description="Verify system state after rollback")
     
     # Features
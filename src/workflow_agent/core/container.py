@@ -341,7 +341,7 @@ class DependencyContainer:
         self.register_singleton("state_manager", StateManager, storage_path)
         
         # Register execution history manager
-        self.register_singleton("execution_history_manager", ExecutionHistoryManager, config)
+        self.register_singleton("execution_history_manager", ExecutionHistoryManager)
         
     def _load_integration_components(self, config) -> None:
         """Load integration-related components."""
@@ -65,8 +65,8 @@ class ExecutionMetrics(BaseModel):
     start_time: datetime = Field(default_factory=datetime.now)
     end_time: Optional[datetime] = None
     duration: float = 0.0
-    memory_usage: float = 0.0
-    cpu_usage: float = 0.0
+    memory_usage: float = 0.0  # Peak resident memory of the script in MB
+    cpu_usage: float = 0.0  # CPU seconds used by the script
     disk_io: Dict[str, int] = Field(default_factory=dict)
 
     class Config:
@@ -79,6 +79,10 @@ class OutputData(BaseModel):
     exit_code: int = 0
     duration: float = 0.0
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    truncated: bool = False
+    log_path: Optional[str] = None
+    cpu_time: Optional[float] = None
+    max_rss: Optional[int] = None
 
     class Config:
         frozen = True
@@ -185,6 +189,12 @@ class WorkflowState(BaseModel):
         """Add a change to the state."""
         return self.evolve(changes=list(self.changes) + [change])
 
+    def add_changes(self, changes: List[Change]) -> 'WorkflowState':
+        """Add several changes to the state in one transition."""
+        if not changes:
+            return self
+        return self.evolve(changes=list(self.changes) + list(changes))
+
     def add_warning(self, warning: str) -> 'WorkflowState':
         """Add a warning to the state."""
         return self.evolve(warnings=list(self.warnings) + [warning])
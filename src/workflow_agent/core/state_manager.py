@@ -36,6 +36,8 @@ class StateManager:
         self.max_history = max_history
         self._in_memory_states: Dict[str, List[WorkflowState]] = {}
         self._active_states: Dict[str, WorkflowState] = {}
+        # Changes recorded live during execution, per transaction
+        self._change_events: Dict[str, List[Change]] = {}
         
         # Initialize storage if path provided
         if self.storage_path:
@@ -79,6 +81,22 @@ class StateManager:
                 ON workflow_states (is_active);
                 """)
                 
+                # Create change journal for changes recorded while scripts run
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS workflow_change_events (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    transaction_id TEXT NOT NULL,
+                    change_id TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL,
+                    change_data TEXT NOT NULL
+                );
+                """)
+                
+                cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_change_events_transaction_id
+                ON workflow_change_events (transaction_id);
+                """)
+                
                 conn.commit()
                 logger.debug(f"State storage initialized at {self.storage_path}")
         except Exception as e:
@@ -400,6 +418,102 @@ class StateManager:
         except Exception as e:
             logger.error(f"Failed to persist state {state.state_id}: {e}")
     
+    @handle_safely
+    def record_changes(self, transaction_id: str, changes: List[Change]) -> None:
+        """
+        Append changes to a transaction's change journal as soon as they happen.
+        
+        The journal survives the script being killed or the agent crashing, so a
+        partial execution can still be rolled back.
+        
+        Args:
+            transaction_id: Transaction ID
+            changes: Changes to record
+        """
+        if not changes:
+            return
+            
+        self._change_events.setdefault(transaction_id, []).extend(changes)
+        
+        if self.storage_path:
+            try:
+                with self._get_db_connection() as conn:
+                    conn.executemany("""
+                    INSERT INTO workflow_change_events (
+                        transaction_id,
+                        change_id,
+                        created_at,
+                        change_data
+                    ) VALUES (?, ?, ?, ?)
+                    """, [
+                        (
+                            transaction_id,
+                            str(change.change_id),
+                            change.timestamp.isoformat(),
+                            change.model_dump_json()
+                        )
+                        for change in changes
+                    ])
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"Failed to record changes for transaction {transaction_id}: {e}")
+                
+        logger.debug(f"Recorded {len(changes)} changes for transaction {transaction_id}")
+    
+    @handle_safely
+    def get_recorded_changes(self, transaction_id: str) -> List[Change]:
+        """
+        Get the changes recorded for a transaction, in the order they happened.
+        
+        Args:
+            transaction_id: Transaction ID
+            
+        Returns:
+            List of recorded changes
+        """
+        # Check in-memory first
+        if transaction_id in self._change_events:
+            return list(self._change_events[transaction_id])
+            
+        changes = []
+        if self.storage_path:
+            try:
+                with self._get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                    SELECT change_data FROM workflow_change_events 
+                    WHERE transaction_id = ?
+                    ORDER BY event_id
+                    """, (transaction_id,))
+                    
+                    changes = [Change.model_validate_json(row['change_data']) for row in cursor.fetchall()]
+                    
+                # Cache in memory
+                self._change_events[transaction_id] = list(changes)
+            except Exception as e:
+                logger.error(f"Failed to load recorded changes for transaction {transaction_id}: {e}")
+                
+        return changes
+    
+    def merge_recorded_changes(self, state: WorkflowState) -> WorkflowState:
+        """
+        Add recorded changes that a state does not know about yet.
+        
+        Args:
+            state: Workflow state
+            
+        Returns:
+            State including every recorded change of its transaction
+        """
+        known = {change.change_id for change in state.changes}
+        missing = [
+            change for change in self.get_recorded_changes(state.transaction_id) or []
+            if change.change_id not in known
+        ]
+        if missing:
+            logger.info(f"Restored {len(missing)} recorded changes for transaction {state.transaction_id}")
+        return state.add_changes(missing)
+    
     @handle_safely
     def get_active_transactions(self) -> List[str]:
         """
@@ -465,10 +579,15 @@ class StateManager:
                     DELETE FROM workflow_states 
                     WHERE transaction_id = ?
                     """, (transaction_id,))
+                    cursor.execute("""
+                    DELETE FROM workflow_change_events 
+                    WHERE transaction_id = ?
+                    """, (transaction_id,))
                     
                     # Remove from in-memory storage
                     if transaction_id in self._in_memory_states:
                         del self._in_memory_states[transaction_id]
+                    self._change_events.pop(transaction_id, None)
                         
                 conn.commit()
                 
@@ -1,56 +1,251 @@
 """Module for fetching and parsing integration documentation."""
 import aiohttp
+import asyncio
+import json
+import os
 from bs4 import BeautifulSoup
 from typing import Dict, Any, List, Optional
 import logging
 import re
 
+from ..error.exceptions import DocumentationFetchError
+from .snapshot import DocumentationSnapshotCache
+
 logger = logging.getLogger(__name__)
 
+# Longest description kept from a documentation page
+MAX_DESCRIPTION_LENGTH = 1000
+# Most list items or commands kept per extracted section
+MAX_SECTION_ITEMS = 50
+# Section headings whose list items become the given documentation key
+_SECTION_KEYWORDS = (
+    ("installation_steps", ("install", "setup", "set up")),
+    ("verification_steps", ("verify", "verification", "check", "test")),
+    ("configuration_steps", ("configure", "configuration")),
+)
+
 class DocumentationParser:
     """Fetches and parses integration documentation from New Relic."""
     
-    def __init__(self, base_url: str = "https://docs.newrelic.com/docs/infrastructure/choose-infra-install-method/"):
+    def __init__(
+        self,
+        base_url: str = "https://docs.newrelic.com/docs/infrastructure/choose-infra-install-method/",
+        snapshot_dir: Optional[str] = None,
+        max_age: int = 86400,
+        offline: Optional[bool] = None,
+        fetch: Optional[bool] = None,
+        max_connections: int = 10,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize the documentation parser.
+        
+        Args:
+            base_url: Base documentation URL
+            snapshot_dir: Directory of local documentation snapshots
+                (defaults to $WORKFLOW_DOCS_SNAPSHOT_DIR or cache/docs)
+            max_age: Seconds a snapshot is used without revalidating against the server
+            offline: Serve only from snapshots, never touching the network
+                (defaults to $WORKFLOW_DOCS_OFFLINE)
+            fetch: Fetch documentation missing from the snapshots over the network
+                (defaults to $WORKFLOW_DOCS_FETCH); when disabled, integrations
+                without a snapshot get default documentation
+            max_connections: Connection pool size of the shared HTTP session
+            timeout: Total timeout in seconds for a single request
+        """
         self.base_url = base_url
+        self.snapshots = DocumentationSnapshotCache(
+            snapshot_dir or os.environ.get("WORKFLOW_DOCS_SNAPSHOT_DIR", os.path.join("cache", "docs")),
+            max_age=max_age
+        )
+        if offline is None:
+            offline = os.environ.get("WORKFLOW_DOCS_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        if fetch is None:
+            fetch = os.environ.get("WORKFLOW_DOCS_FETCH", "").lower() in ("1", "true", "yes")
+        self.fetch = fetch
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._entered = 0
+
+    async def __aenter__(self) -> "DocumentationParser":
+        self._entered += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._entered -= 1
+        if not self._entered:
+            await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared, connection-pooled HTTP session."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def fetch_integration_docs(self, integration_type: str) -> Optional[Dict[str, Any]]:
         """Fetch and parse documentation for an integration type."""
+        docs = {
+            "name": integration_type,
+            "description": f"Documentation for {integration_type}",
+            "verification_steps": [
+                "Check if service is running",
+                "Check if port is listening",
+                "Check if configuration file exists"
+            ]
+        }
         try:
-            # Will fetch and parse documentation from the base URL,
-            # extract structured data using BeautifulSoup, and 
-            # organize into knowledge format for agent consumption
-            return {
-                "name": integration_type,
-                "description": f"Documentation for {integration_type}",
-                "verification_steps": [
-                    "Check if service is running",
-                    "Check if port is listening",
-                    "Check if configuration file exists"
-                ]
-            }
-        except Exception as e:
-            raise
+            urls = await self._search_documentation(integration_type)
+            if urls:
+                content = await self._fetch(urls[0])
+                docs.update(await self._extract_structured_knowledge(content.decode("utf-8", errors="replace")))
+                docs["source_url"] = urls[0]
+        except DocumentationFetchError as e:
+            if self.offline:
+                raise
+            if self.fetch:
+                logger.warning(f"Using default documentation for {integration_type}: {e}")
+            else:
+                logger.debug(f"Using default documentation for {integration_type}: {e}")
+        finally:
+            # Without `async with`, nothing else would close the session
+            if not self._entered:
+                await self.close()
+        return docs
+
+    async def _fetch(self, url: str) -> bytes:
+        """
+        Fetch a URL through the snapshot cache.
+        
+        Fresh snapshots are returned without a request; stale ones are revalidated
+        with If-None-Match/If-Modified-Since and served as-is when the server is
+        unreachable or fetching is disabled.
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            Response body
+        """
+        ref = self.snapshots.lookup(url)
+        if ref and (self.offline or not self.fetch or self.snapshots.is_fresh(ref)):
+            return self.snapshots.read(ref)
+        if self.offline:
+            raise DocumentationFetchError(f"No offline snapshot for {url}")
+        if not self.fetch:
+            raise DocumentationFetchError(f"No snapshot for {url} and network fetching is disabled")
+
+        headers = {}
+        if ref and ref.get("etag"):
+            headers["If-None-Match"] = ref["etag"]
+        if ref and ref.get("last_modified"):
+            headers["If-Modified-Since"] = ref["last_modified"]
+
+        try:
+            session = await self._get_session()
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and ref:
+                    self.snapshots.touch(ref)
+                    return self.snapshots.read(ref)
+                if response.status != 200:
+                    raise DocumentationFetchError(f"HTTP {response.status} fetching {url}")
+                body = await response.read()
+                self.snapshots.store(
+                    url,
+                    body,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    content_type=response.headers.get("Content-Type")
+                )
+                return body
+        except (aiohttp.ClientError, asyncio.TimeoutError, DocumentationFetchError) as e:
+            if ref:
+                logger.warning(f"Serving stale documentation snapshot for {url}: {e}")
+                return self.snapshots.read(ref)
+            if isinstance(e, DocumentationFetchError):
+                raise
+            raise DocumentationFetchError(f"Error fetching {url}: {e}") from e
 
     async def _extract_structured_knowledge(self, content: str) -> Dict[str, Any]:
-        """Extract structured knowledge from the documentation content."""
+        """
+        Extract structured knowledge from an HTML documentation page.
+        
+        Args:
+            content: Page HTML
+            
+        Returns:
+            Title, description, list items of install, verification and
+            configuration sections, and code blocks as commands; keys without
+            content on the page are omitted
+        """
         try:
             soup = BeautifulSoup(content, 'html.parser')
-            # Implementation details would go here
-            return {"content": content}  # Placeholder
+            for tag in soup(["script", "style", "nav", "header", "footer"]):
+                tag.decompose()
+
+            knowledge: Dict[str, Any] = {}
+            title = soup.find("h1") or soup.title
+            if title and title.get_text(strip=True):
+                knowledge["title"] = title.get_text(" ", strip=True)
+
+            meta = soup.find("meta", attrs={"name": "description"})
+            description = meta.get("content", "").strip() if meta else ""
+            if not description:
+                paragraph = soup.find("p")
+                description = paragraph.get_text(" ", strip=True) if paragraph else ""
+            if description:
+                knowledge["description"] = description[:MAX_DESCRIPTION_LENGTH]
+
+            for heading in soup.find_all(["h2", "h3"]):
+                heading_text = heading.get_text(" ", strip=True).lower()
+                key = next(
+                    (key for key, keywords in _SECTION_KEYWORDS if any(word in heading_text for word in keywords)),
+                    None
+                )
+                if key is None or key in knowledge:
+                    continue
+                items = []
+                for sibling in heading.find_next_siblings():
+                    if sibling.name in ("h1", "h2", "h3"):
+                        break
+                    for item in sibling.find_all("li") if sibling.name != "li" else [sibling]:
+                        text = item.get_text(" ", strip=True)
+                        if text:
+                            items.append(text)
+                if items:
+                    knowledge[key] = items[:MAX_SECTION_ITEMS]
+
+            commands = []
+            for block in soup.find_all("pre"):
+                text = block.get_text().strip()
+                if text and text not in commands:
+                    commands.append(text)
+            if commands:
+                knowledge["commands"] = commands[:MAX_SECTION_ITEMS]
+            return knowledge
         except Exception as e:
             logger.error(f"Error extracting structured knowledge: {e}")
             return {}
 
-    async def _search_documentation(self, integration_type: str, session: aiohttp.ClientSession) -> List[str]:
+    async def _search_documentation(self, integration_type: str) -> List[str]:
         """Search for documentation URLs."""
         try:
             search_url = f"https://docs.newrelic.com/api/search?query={integration_type}+integration+install"
-            async with session.get(search_url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    # Extract relevant URLs from search results
-                    return [result['url'] for result in data.get('results', [])][:1]
-                return []
+            data = json.loads(await self._fetch(search_url))
+            # Extract relevant URLs from search results
+            return [result['url'] for result in data.get('results', [])][:1]
+        except DocumentationFetchError:
+            raise
         except Exception as e:
             logger.error(f"Error searching documentation: {e}")
             return []
@@ -0,0 +1,119 @@
+"""Content-addressed local snapshots of fetched documentation."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class DocumentationSnapshotCache:
+    """
+    Stores fetched documentation bodies by content hash with per-URL metadata.
+
+    Layout::
+
+        <root>/objects/<sha256>       response bodies, shared by identical content
+        <root>/refs/<sha256 of url>.json  url, object hash, ETag, Last-Modified, fetch time
+    """
+
+    def __init__(self, root: str, max_age: int = 86400):
+        """
+        Initialize the snapshot cache.
+
+        Args:
+            root: Snapshot directory
+            max_age: Seconds a snapshot is served without revalidation
+        """
+        self.root = Path(root)
+        self.max_age = max_age
+
+    def _ref_path(self, url: str) -> Path:
+        return self.root / "refs" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get snapshot metadata for a URL.
+
+        Args:
+            url: Documentation URL
+
+        Returns:
+            Metadata dictionary or None if no snapshot exists
+        """
+        path = self._ref_path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                ref = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable documentation snapshot {path}: {e}")
+            return None
+        if not self._object_path(ref.get("sha256", "")).exists():
+            return None
+        return ref
+
+    def is_fresh(self, ref: Dict[str, Any]) -> bool:
+        """Check whether a snapshot is within the staleness window."""
+        return time.time() - ref.get("fetched_at", 0) <= self.max_age
+
+    def read(self, ref: Dict[str, Any]) -> bytes:
+        """Read the body of a snapshot."""
+        with open(self._object_path(ref["sha256"]), "rb") as f:
+            return f.read()
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a fetched body and point the URL at it.
+
+        Args:
+            url: Documentation URL
+            body: Response body
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            content_type: Content-Type response header
+
+        Returns:
+            Stored metadata
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self._write_atomic(object_path, body)
+        ref = {
+            "url": url,
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "fetched_at": time.time()
+        }
+        self._write_atomic(self._ref_path(url), json.dumps(ref).encode("utf-8"))
+        return ref
+
+    def touch(self, ref: Dict[str, Any]) -> None:
+        """Mark a snapshot as revalidated now."""
+        ref["fetched_at"] = time.time()
+        self._write_atomic(self._ref_path(ref["url"]), json.dumps(ref).encode("utf-8"))
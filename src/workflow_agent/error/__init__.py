@@ -14,6 +14,7 @@ from .exceptions import (
     SecurityError,
     IntegrationError,
     DocumentationFetchError,
+    KnowledgeEnhancementError,
     VerificationError,
     LLMError,
     NetworkError,
@@ -45,6 +46,7 @@ __all__ = [
     'SecurityError',
     'IntegrationError',
     'DocumentationFetchError',
+    'KnowledgeEnhancementError',
     'VerificationError',
     'LLMError',
     'NetworkError',
@@ -92,6 +92,10 @@ class DocumentationFetchError(WorkflowError):
     """Error fetching documentation."""
     pass
 
+class KnowledgeEnhancementError(WorkflowError):
+    """Error enhancing workflow state with documentation knowledge."""
+    pass
+
 class VerificationError(WorkflowError):
     """Error during verification."""
     pass
@@ -2,11 +2,16 @@
 Execution module for running scripts with isolation and security.
 """
 from .executor import ScriptExecutor
-from .isolation import IsolationFactory, DockerIsolation, DirectIsolation
+from .isolation import IsolationFactory, DockerIsolation, DirectIsolation, ShellWorkerIsolation
+from .batch import BatchExecutor, BatchPolicy, BatchResult
 
 __all__ = [
     'ScriptExecutor',
     'IsolationFactory',
     'DockerIsolation',
-    'DirectIsolation'
+    'DirectIsolation',
+    'ShellWorkerIsolation',
+    'BatchExecutor',
+    'BatchPolicy',
+    'BatchResult'
 ]
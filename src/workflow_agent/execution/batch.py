@@ -0,0 +1,215 @@
+"""
+Concurrent execution of workflow states across many targets.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from ..config.configuration import WorkflowConfiguration
+from ..core.state import WorkflowState
+from ..core.state_manager import StateManager
+from .executor import ScriptExecutor
+
+logger = logging.getLogger(__name__)
+
+StateRunner = Callable[[WorkflowState], Awaitable[WorkflowState]]
+
+def default_target(state: WorkflowState) -> str:
+    """Target a state runs against: its host if one is given, else its target name."""
+    return state.system_context.get("host") or state.parameters.get("host") or state.target_name
+
+def default_group(state: WorkflowState) -> str:
+    """Group a state's target belongs to for per-group concurrency limits."""
+    return state.system_context.get("group") or state.parameters.get("group") or "default"
+
+@dataclass
+class BatchPolicy:
+    """
+    Concurrency and failure policy for a batch.
+
+    States marked canary (system_context["canary"]) run first, or the first
+    `canary_count` states if none are marked; the rest only start once every
+    canary succeeded. Once the batch is aborted no new state starts; running
+    ones finish and the remaining ones are reported as skipped.
+    """
+    max_concurrency: int = 4
+    group_limits: Dict[str, int] = field(default_factory=dict)
+    default_group_limit: Optional[int] = None
+    fail_fast: bool = False
+    max_failure_percentage: Optional[float] = None
+    canary_count: int = 0
+
+@dataclass
+class BatchResult:
+    """Outcome of one state of a batch."""
+    index: int
+    target: str
+    group: str
+    state: WorkflowState
+    duration: float = 0.0
+    skipped: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.skipped and not self.state.has_error
+
+class BatchExecutor:
+    """
+    Runs workflow states for many targets concurrently under a BatchPolicy.
+
+    By default each state's script is executed with ScriptExecutor, using the
+    state's isolation method or the configured one; pass a runner such as
+    WorkflowAgent.run_workflow to run whole workflows instead.
+    """
+
+    def __init__(self,
+                config: WorkflowConfiguration,
+                policy: Optional[BatchPolicy] = None,
+                runner: Optional[StateRunner] = None,
+                state_manager: Optional[StateManager] = None,
+                target_key: Callable[[WorkflowState], str] = default_target,
+                group_key: Callable[[WorkflowState], str] = default_group):
+        """
+        Initialize the batch executor.
+
+        Args:
+            config: Workflow configuration
+            policy: Concurrency and failure policy
+            runner: Coroutine function running one state, defaults to script execution
+            state_manager: State manager journaling changes of default script executions
+            target_key: Function naming the target of a state
+            group_key: Function naming the target group of a state
+        """
+        self.config = config
+        self.policy = policy or BatchPolicy()
+        self.state_manager = state_manager
+        self.target_key = target_key
+        self.group_key = group_key
+        self._runner = runner or self._execute_script
+        self._executor = ScriptExecutor(config) if runner is None else None
+        self.stats = {"succeeded": 0, "failed": 0, "skipped": 0}
+        self.abort_reason: Optional[str] = None
+
+    async def _execute_script(self, state: WorkflowState) -> WorkflowState:
+        return await self._executor._execute(state, self.state_manager)
+
+    def _phases(self, states: List[WorkflowState]) -> List[List[int]]:
+        """Split state indices into the canary phase and the rest."""
+        canaries = [i for i, state in enumerate(states) if state.system_context.get("canary")]
+        if not canaries and self.policy.canary_count > 0:
+            canaries = list(range(min(self.policy.canary_count, len(states))))
+        rest = [i for i in range(len(states)) if i not in set(canaries)]
+        return [phase for phase in (canaries, rest) if phase]
+
+    def _record_failure(self, total: int) -> None:
+        if self.abort_reason is not None:
+            return
+        failed = self.stats["failed"]
+        if self.policy.fail_fast:
+            self.abort_reason = "fail-fast after first failure"
+        elif self.policy.max_failure_percentage is not None and failed * 100 / total > self.policy.max_failure_percentage:
+            self.abort_reason = f"{failed} of {total} targets failed, over the {self.policy.max_failure_percentage}% limit"
+        if self.abort_reason:
+            logger.warning(f"Aborting batch: {self.abort_reason}")
+
+    async def run(self, states: Iterable[WorkflowState]) -> AsyncIterator[BatchResult]:
+        """
+        Run states concurrently, yielding each result as soon as it is available.
+
+        Args:
+            states: Workflow states, one per target
+
+        Yields:
+            Batch results in completion order, skipped states included
+        """
+        states = list(states)
+        self.stats = {"succeeded": 0, "failed": 0, "skipped": 0}
+        self.abort_reason = None
+        results: asyncio.Queue = asyncio.Queue()
+        global_limit = asyncio.Semaphore(max(1, self.policy.max_concurrency))
+        group_limits: Dict[str, asyncio.Semaphore] = {}
+        done = object()
+
+        def group_limit(group: str) -> Optional[asyncio.Semaphore]:
+            limit = self.policy.group_limits.get(group, self.policy.default_group_limit)
+            if limit is None:
+                return None
+            if group not in group_limits:
+                group_limits[group] = asyncio.Semaphore(max(1, limit))
+            return group_limits[group]
+
+        async def run_one(index: int) -> None:
+            state = states[index]
+            target, group = self.target_key(state), self.group_key(state)
+            semaphore = group_limit(group)
+            # Group slot first so a saturated group does not hold global slots
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                async with global_limit:
+                    if self.abort_reason is not None:
+                        self.stats["skipped"] += 1
+                        await results.put(BatchResult(
+                            index, target, group, state.set_error(f"Skipped: batch aborted ({self.abort_reason})"),
+                            skipped=True
+                        ))
+                        return
+                    start = time.monotonic()
+                    try:
+                        final_state = await self._runner(state)
+                    except Exception as e:
+                        logger.error(f"Batch execution for {target} failed: {e}", exc_info=True)
+                        final_state = state.set_error(f"Error during batch execution: {e}")
+                    result = BatchResult(index, target, group, final_state, time.monotonic() - start)
+                    if result.succeeded:
+                        self.stats["succeeded"] += 1
+                    else:
+                        self.stats["failed"] += 1
+                        self._record_failure(len(states))
+                    await results.put(result)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+        async def schedule() -> None:
+            try:
+                phases = self._phases(states)
+                for number, phase in enumerate(phases):
+                    await asyncio.gather(*(run_one(index) for index in phase))
+                    if number == 0 and len(phases) > 1 and self.abort_reason is None and self.stats["failed"]:
+                        self.abort_reason = "canary failed"
+                        logger.warning(f"Aborting batch: {self.abort_reason}")
+            finally:
+                await results.put(done)
+
+        scheduler = asyncio.create_task(schedule())
+        try:
+            while True:
+                result = await results.get()
+                if result is done:
+                    break
+                logger.info(
+                    f"Batch target {result.target} "
+                    f"{'skipped' if result.skipped else 'succeeded' if result.succeeded else 'failed'}"
+                )
+                yield result
+            await scheduler
+        finally:
+            if not scheduler.done():
+                scheduler.cancel()
+                await asyncio.gather(scheduler, return_exceptions=True)
+
+    async def run_all(self, states: Iterable[WorkflowState]) -> List[BatchResult]:
+        """
+        Run states concurrently and collect every result.
+
+        Args:
+            states: Workflow states, one per target
+
+        Returns:
+            Batch results in input order
+        """
+        results = [result async for result in self.run(states)]
+        return sorted(results, key=lambda result: result.index)
@@ -6,12 +6,216 @@ import re
 import json
 import logging
 import platform
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..core.state import Change
 
 logger = logging.getLogger(__name__)
 
+JSON_BEGIN = "CHANGE_JSON_BEGIN"
+JSON_END = "CHANGE_JSON_END"
+
+# One pattern for every change marker; the type is dispatched through MARKER_HANDLERS
+_MARKER_RE = re.compile(r"CHANGE:(\w+):(\S+)")
+
+# Marker type -> (factory method name, change type)
+MARKER_HANDLERS: Dict[str, Tuple[str, str]] = {
+    # File operations
+    "FILE_CREATED": ("_create_file_change", "file_created"),
+    "FILE_MODIFIED": ("_create_file_change", "file_modified"),
+    "FILE_DELETED": ("_create_file_change", "file_deleted"),
+    "FILE_PERMISSIONS": ("_create_file_change", "file_permissions_changed"),
+    "FILE_OWNERSHIP": ("_create_file_change", "file_ownership_changed"),
+    
+    # Directory operations
+    "DIRECTORY_CREATED": ("_create_directory_change", "directory_created"),
+    "DIRECTORY_DELETED": ("_create_directory_change", "directory_deleted"),
+    
+    # Package operations
+    "PACKAGE_INSTALLED": ("_create_package_change", "package_installed"),
+    "PACKAGE_REMOVED": ("_create_package_change", "package_removed"),
+    "PACKAGE_UPDATED": ("_create_package_change", "package_updated"),
+    
+    # Service operations
+    "SERVICE_INSTALLED": ("_create_service_change", "service_installed"),
+    "SERVICE_REMOVED": ("_create_service_change", "service_removed"),
+    "SERVICE_STARTED": ("_create_service_change", "service_started"),
+    "SERVICE_STOPPED": ("_create_service_change", "service_stopped"),
+    "SERVICE_ENABLED": ("_create_service_change", "service_enabled"),
+    "SERVICE_DISABLED": ("_create_service_change", "service_disabled"),
+    
+    # Configuration operations
+    "CONFIG_MODIFIED": ("_create_config_change", "config_modified"),
+    
+    # Registry operations (Windows)
+    "REGISTRY_ADDED": ("_create_registry_change", "registry_added"),
+    "REGISTRY_MODIFIED": ("_create_registry_change", "registry_modified"),
+    "REGISTRY_DELETED": ("_create_registry_change", "registry_deleted"),
+}
+
+# Fallback patterns used only when the output has no explicit changes
+_INFER_PACKAGE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"(?:installed|Installing)\s+(?:package|module)\s+(\S+)",
+        r"(?:apt-get|yum|dnf|pip)\s+install.*?(\S+)",
+        r"npm\s+install\s+(-g\s+)?(\S+)",
+        r"successfully\s+installed\s+(\S+)"
+    )
+]
+_INFER_FILE_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), change_type) for pattern, change_type in (
+        (r"(?:created|creating)\s+(?:file|config)\s+(\S+)", "inferred_file_created"),
+        (r"(?:copied|copying)\s+(?:file)\s+.*?to\s+(\S+)", "inferred_file_created"),
+        (r"(?:removed|removing)\s+(?:file)\s+(\S+)", "inferred_file_deleted")
+    )
+]
+
+class ChangeScanner:
+    """
+    Single-pass, incremental change extractor for script output.
+    
+    Output can be fed in arbitrary chunks; complete lines are scanned once for
+    JSON change blocks and change markers, and partial lines are buffered until
+    the next chunk. Changes are deduplicated by type and target.
+    """
+    
+    def __init__(self, tracker: "ChangeTracker"):
+        """
+        Initialize the scanner.
+        
+        Args:
+            tracker: Change tracker providing the change factories
+        """
+        self.tracker = tracker
+        self._pending = ""
+        self._changes: List[Change] = []
+        self._inferred: List[Change] = []
+        self._seen = set()
+        self._finished = False
+        
+    @property
+    def changes(self) -> List[Change]:
+        """Changes found so far, falling back to inferred changes when there are no explicit ones."""
+        return self._changes or self._inferred
+        
+    def feed(self, chunk: str) -> List[Change]:
+        """
+        Scan the next chunk of output.
+        
+        Args:
+            chunk: Output chunk
+            
+        Returns:
+            Explicit changes found in this chunk
+        """
+        found = len(self._changes)
+        data = self._pending + chunk
+        consumed = self._scan(data, final=False)
+        self._pending = data[consumed:]
+        return self._changes[found:]
+        
+    def finish(self) -> List[Change]:
+        """
+        Scan any buffered output and return all changes.
+        
+        Returns:
+            List of Change objects
+        """
+        if not self._finished:
+            self._scan(self._pending, final=True)
+            self._pending = ""
+            self._finished = True
+            if not self._changes and self._inferred:
+                logger.warning("Using inferred changes from output. Change tracking in script is insufficient.")
+        return self.changes
+        
+    def _scan(self, data: str, final: bool) -> int:
+        """
+        Scan complete lines of data.
+        
+        Args:
+            data: Buffered output
+            final: Whether no more output will follow
+            
+        Returns:
+            Number of characters consumed
+        """
+        end = len(data) if final else data.rfind("\n") + 1
+        pos = 0
+        while True:
+            begin = data.find(JSON_BEGIN, pos, end)
+            if begin == -1:
+                self._scan_text(data, pos, end)
+                return end
+            self._scan_text(data, pos, begin)
+            
+            close = data.find(JSON_END, begin + len(JSON_BEGIN))
+            if close == -1:
+                if not final:
+                    # Wait for the rest of the block
+                    return begin
+                self._scan_text(data, begin + len(JSON_BEGIN), end)
+                return end
+                
+            self._add_json_block(data[begin + len(JSON_BEGIN):close].strip())
+            pos = close + len(JSON_END)
+            if pos > end:
+                return pos
+                
+    def _scan_text(self, data: str, start: int, stop: int) -> None:
+        """
+        Scan plain output for change markers, inferring changes while there are none.
+        
+        Args:
+            data: Buffered output
+            start: Start offset
+            stop: End offset
+        """
+        if start >= stop:
+            return
+        handlers = self.tracker._marker_handlers
+        for match in _MARKER_RE.finditer(data, start, stop):
+            marker, target = match.groups()
+            try:
+                handler = handlers.get(marker)
+                if handler is not None:
+                    factory, change_type = handler
+                    change = factory(change_type, target)
+                else:
+                    change = self.tracker._create_generic_change(marker.lower(), target)
+                self._add(change)
+            except Exception as e:
+                logger.error(f"Error processing change marker {match.group(0)}: {e}")
+                
+        if not self._changes:
+            self._inferred.extend(self.tracker._infer_changes(data, start, stop))
+            
+    def _add_json_block(self, json_block: str) -> None:
+        """
+        Add the changes described by a JSON change block.
+        
+        Args:
+            json_block: JSON text between the block markers
+        """
+        try:
+            change_data = json.loads(json_block)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse JSON change block: {json_block[:100]}")
+            return
+            
+        # Handle both single change and array of changes
+        items = change_data if isinstance(change_data, list) else [change_data]
+        for item in items:
+            change = self.tracker._change_from_item(item)
+            if change is not None:
+                self._add(change)
+                
+    def _add(self, change: Change) -> None:
+        key = (change.type, change.target)
+        if key not in self._seen:
+            self._seen.add(key)
+            self._changes.append(change)
+
 class ChangeTracker:
     """
     Centralized change tracking functionality for script execution.
@@ -26,11 +230,15 @@ class ChangeTracker:
             "release": platform.release(),
             "version": platform.version()
         }
+        self._marker_handlers = {
+            marker: (getattr(self, method), change_type)
+            for marker, (method, change_type) in MARKER_HANDLERS.items()
+        }
     
     def extract_changes(self, output: str) -> List[Change]:
         """
         Extract changes from script output using enhanced structured change tracking.
-        Processes both structured JSON blocks and simple change markers.
+        Processes both structured JSON blocks and simple change markers in one pass.
         
         Args:
             output: Script output to parse
@@ -38,144 +246,59 @@ class ChangeTracker:
         Returns:
             List of Change objects
         """
-        changes = []
-        
-        # Step 1: Process JSON change blocks - the most reliable format
-        self._process_json_changes(output, changes)
-        
-        # Step 2: Process structured change markers
-        self._process_structured_changes(output, changes)
-        
-        # Step 3: If no changes detected, try to infer from output
-        if not changes and len(output) > 0:
-            changes.extend(self._infer_changes_from_output(output))
+        scanner = self.create_scanner()
+        scanner.feed(output)
+        changes = scanner.finish()
         
         # Log the detected changes
         logger.info(f"Extracted {len(changes)} changes from script output")
         return changes
-    
-    def _process_json_changes(self, output: str, changes_list: List[Change]) -> None:
-        """
-        Process JSON change blocks in script output.
         
-        Args:
-            output: Script output to parse
-            changes_list: List to add extracted changes to
+    def create_scanner(self) -> ChangeScanner:
         """
-        # Find JSON blocks marked with CHANGE_JSON_BEGIN and CHANGE_JSON_END
-        json_change_blocks = re.findall(r"CHANGE_JSON_BEGIN\s*(.*?)\s*CHANGE_JSON_END", output, re.DOTALL)
+        Create a scanner for extracting changes from output as it is produced.
         
-        for json_block in json_change_blocks:
-            try:
-                change_data = json.loads(json_block)
-                
-                # Handle both single change and array of changes
-                if isinstance(change_data, list):
-                    for item in change_data:
-                        self._process_change_item(item, changes_list)
-                else:
-                    self._process_change_item(change_data, changes_list)
-                    
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse JSON change block: {json_block[:100]}")
+        Returns:
+            Incremental change scanner
+        """
+        return ChangeScanner(self)
     
-    def _process_change_item(self, item: Dict[str, Any], changes_list: List[Change]) -> None:
+    def _change_from_item(self, item: Dict[str, Any]) -> Optional[Change]:
         """
-        Process a single change item from JSON and add it to the changes list.
+        Convert a change item from JSON into a Change.
         
         Args:
             item: Change item data
-            changes_list: List to add the change to
+            
+        Returns:
+            Change object, or None if the item is invalid
         """
         if not isinstance(item, dict) or "type" not in item or "target" not in item:
             logger.warning(f"Invalid change item format: {item}")
-            return
+            return None
             
         try:
-            # Extract change data with proper defaults
-            change_type = item["type"]
-            target = item["target"]
-            revertible = item.get("revertible", False)
-            revert_command = item.get("revert_command")
-            backup_file = item.get("backup_file")
-            metadata = item.get("metadata", {})
-            
-            # Convert dictionary to Change object
-            change = Change(
-                type=change_type,
-                target=target,
-                revertible=revertible,
-                revert_command=revert_command,
-                backup_file=backup_file,
-                metadata=metadata
+            # Convert dictionary to Change object with proper defaults
+            return Change(
+                type=item["type"],
+                target=item["target"],
+                revertible=item.get("revertible", False),
+                revert_command=item.get("revert_command"),
+                backup_file=item.get("backup_file"),
+                metadata=item.get("metadata", {})
             )
-            changes_list.append(change)
         except Exception as e:
             logger.error(f"Error processing change item: {e}")
+            return None
     
-    def _process_structured_changes(self, output: str, changes_list: List[Change]) -> None:
-        """
-        Process structured change markers in script output.
-        
-        Args:
-            output: Script output to parse
-            changes_list: List to add extracted changes to
-        """
-        # Define patterns for different change types
-        change_patterns = {
-            # File operations
-            r"CHANGE:FILE_CREATED:(\S+)": lambda match: self._create_file_change("file_created", match[0]),
-            r"CHANGE:FILE_MODIFIED:(\S+)(?::(\S+))?": lambda match: self._create_file_change("file_modified", match[0], match[1] if len(match) > 1 else None),
-            r"CHANGE:FILE_DELETED:(\S+)": lambda match: self._create_file_change("file_deleted", match[0]),
-            r"CHANGE:FILE_PERMISSIONS:(\S+)(?::(\S+))?": lambda match: self._create_file_change("file_permissions_changed", match[0], match[1] if len(match) > 1 else None),
-            r"CHANGE:FILE_OWNERSHIP:(\S+)(?::(\S+))?": lambda match: self._create_file_change("file_ownership_changed", match[0], match[1] if len(match) > 1 else None),
-            
-            # Directory operations
-            r"CHANGE:DIRECTORY_CREATED:(\S+)": lambda match: self._create_directory_change("directory_created", match[0]),
-            r"CHANGE:DIRECTORY_DELETED:(\S+)": lambda match: self._create_directory_change("directory_deleted", match[0]),
-            
-            # Package operations
-            r"CHANGE:PACKAGE_INSTALLED:(\S+)(?::(\S+))?": lambda match: self._create_package_change("package_installed", match[0], match[1] if len(match) > 1 else None),
-            r"CHANGE:PACKAGE_REMOVED:(\S+)": lambda match: self._create_package_change("package_removed", match[0]),
-            r"CHANGE:PACKAGE_UPDATED:(\S+)(?::(\S+))?": lambda match: self._create_package_change("package_updated", match[0], match[1] if len(match) > 1 else None),
-            
-            # Service operations
-            r"CHANGE:SERVICE_INSTALLED:(\S+)": lambda match: self._create_service_change("service_installed", match[0]),
-            r"CHANGE:SERVICE_REMOVED:(\S+)": lambda match: self._create_service_change("service_removed", match[0]),
-            r"CHANGE:SERVICE_STARTED:(\S+)": lambda match: self._create_service_change("service_started", match[0]),
-            r"CHANGE:SERVICE_STOPPED:(\S+)": lambda match: self._create_service_change("service_stopped", match[0]),
-            r"CHANGE:SERVICE_ENABLED:(\S+)": lambda match: self._create_service_change("service_enabled", match[0]),
-            r"CHANGE:SERVICE_DISABLED:(\S+)": lambda match: self._create_service_change("service_disabled", match[0]),
-            
-            # Configuration operations
-            r"CHANGE:CONFIG_MODIFIED:(\S+)(?::(\S+))?": lambda match: self._create_config_change("config_modified", match[0], match[1] if len(match) > 1 else None),
-            
-            # Registry operations (Windows)
-            r"CHANGE:REGISTRY_ADDED:(\S+)": lambda match: self._create_registry_change("registry_added", match[0]),
-            r"CHANGE:REGISTRY_MODIFIED:(\S+)(?::(\S+))?": lambda match: self._create_registry_change("registry_modified", match[0], match[1] if len(match) > 1 else None),
-            r"CHANGE:REGISTRY_DELETED:(\S+)": lambda match: self._create_registry_change("registry_deleted", match[0]),
-            
-            # Generic catch-all
-            r"CHANGE:(\w+):(\S+)(?::(.+))?": lambda match: self._create_generic_change(match[0].lower(), match[1], match[2] if len(match) > 2 else None)
-        }
-        
-        # Process each pattern
-        for pattern, handler in change_patterns.items():
-            for match in re.finditer(pattern, output):
-                try:
-                    change = handler(match.groups())
-                    if change:
-                        changes_list.append(change)
-                except Exception as e:
-                    logger.error(f"Error processing change with pattern {pattern}: {e}")
-    
-    def _infer_changes_from_output(self, output: str) -> List[Change]:
+    def _infer_changes(self, output: str, start: int, stop: int) -> List[Change]:
         """
-        Attempt to infer changes from unstructured output.
-        This is a fallback when no explicit change markers are present.
+        Infer changes from a range of unstructured output.
         
         Args:
             output: Script output to parse
+            start: Start offset
+            stop: End offset
             
         Returns:
             List of inferred changes
@@ -183,44 +306,26 @@ class ChangeTracker:
         changes = []
         
         # Look for common installation patterns
-        package_patterns = [
-            r"(?:installed|Installing)\s+(?:package|module)\s+(\S+)",
-            r"(?:apt-get|yum|dnf|pip)\s+install.*?(\S+)",
-            r"npm\s+install\s+(-g\s+)?(\S+)",
-            r"successfully\s+installed\s+(\S+)"
-        ]
-        
-        for pattern in package_patterns:
-            for match in re.finditer(pattern, output, re.IGNORECASE):
-                package_name = match.group(1)
+        for pattern in _INFER_PACKAGE_PATTERNS:
+            for match in pattern.finditer(output, start, stop):
+                # The npm pattern captures an optional -g flag before the package
                 changes.append(self._create_package_change(
                     "inferred_package_install", 
-                    package_name, 
+                    match.group(match.lastindex), 
                     None,
                     metadata={"inferred": True}
                 ))
         
         # Look for file operations
-        file_patterns = [
-            (r"(?:created|creating)\s+(?:file|config)\s+(\S+)", "inferred_file_created"),
-            (r"(?:copied|copying)\s+(?:file)\s+.*?to\s+(\S+)", "inferred_file_created"),
-            (r"(?:removed|removing)\s+(?:file)\s+(\S+)", "inferred_file_deleted")
-        ]
-        
-        for pattern, change_type in file_patterns:
-            for match in re.finditer(pattern, output, re.IGNORECASE):
-                file_path = match.group(1)
+        for pattern, change_type in _INFER_FILE_PATTERNS:
+            for match in pattern.finditer(output, start, stop):
                 changes.append(self._create_file_change(
                     change_type,
-                    file_path,
+                    match.group(1),
                     None,
                     metadata={"inferred": True}
                 ))
         
-        # Add a warning about inferred changes
-        if changes:
-            logger.warning("Using inferred changes from output. Change tracking in script is insufficient.")
-        
         return changes
     
     def _create_file_change(
@@ -0,0 +1,325 @@
+"""
+Pool of warm Docker containers for script isolation.
+"""
+import asyncio
+import atexit
+import logging
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..error.exceptions import ExecutionError
+from ..utils.subprocess_utils import OutputCapture, stream_process_output
+
+logger = logging.getLogger(__name__)
+
+# Scratch directory inside pooled containers, emptied before every script
+CONTAINER_WORKDIR = "/tmp/workflow-agent"
+
+@dataclass
+class PooledContainer:
+    """A long-running container that scripts are executed in with `docker exec`."""
+    container_id: str
+    name: str
+    image: str
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+
+class ContainerPool:
+    """
+    Pre-started containers for one image, reused across script executions.
+
+    Containers are started with `docker run -d ... sleep infinity` and scripts run
+    through `docker exec`. Only the scratch directory is reset between uses, so
+    a container is returned to the pool only after a read-only script; any
+    other script gets a container that is removed afterwards. Containers are
+    health-checked after being idle, recycled after `max_uses` executions or
+    any failure to finish, and removed after `idle_timeout`.
+    """
+
+    def __init__(self,
+                image: str,
+                max_size: int = 2,
+                max_uses: int = 20,
+                idle_timeout: float = 300,
+                health_check_interval: float = 30,
+                memory_limit: str = "512m",
+                cpu_limit: str = "1.0",
+                docker_command: str = "docker"):
+        """
+        Initialize the pool.
+
+        Args:
+            image: Image containers are started from
+            max_size: Maximum number of containers
+            max_uses: Executions after which a container is replaced
+            idle_timeout: Seconds after which an idle container is removed
+            health_check_interval: Idle seconds after which a container is checked before reuse
+            memory_limit: Container memory limit
+            cpu_limit: Container CPU limit
+            docker_command: Docker CLI executable
+        """
+        self.image = image
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.docker_command = docker_command
+        self._idle: List[PooledContainer] = []
+        self._busy: Dict[str, PooledContainer] = {}
+        self._starting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"started": 0, "reused": 0, "removed": 0}
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._busy) + self._starting
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Pools outlive event loops; asyncio primitives must not
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def _docker(self, *args: str, timeout: float = 60) -> Tuple[int, str, str]:
+        """
+        Run a docker CLI command.
+
+        Args:
+            args: Command arguments
+            timeout: Timeout in seconds
+
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+        """
+        process = await asyncio.create_subprocess_exec(
+            self.docker_command, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return 124, "", f"docker {args[0]} timed out"
+        return process.returncode, stdout.decode(errors="replace").strip(), stderr.decode(errors="replace").strip()
+
+    async def acquire(self) -> PooledContainer:
+        """
+        Get a healthy container, starting one if none is idle.
+
+        Returns:
+            Container reserved for the caller
+
+        Raises:
+            ExecutionError: If a container cannot be started
+        """
+        await self.reap_idle()
+        condition = self._get_condition()
+        while True:
+            async with condition:
+                while not self._idle and self.size >= self.max_size:
+                    await condition.wait()
+                if self._idle:
+                    container = self._idle.pop()
+                    self._busy[container.container_id] = container
+                else:
+                    container = None
+                    self._starting += 1
+
+            if container is None:
+                try:
+                    container = await self._start_container()
+                finally:
+                    async with condition:
+                        self._starting -= 1
+                        if container is not None:
+                            self._busy[container.container_id] = container
+                        condition.notify()
+                return container
+
+            if time.monotonic() - container.last_checked < self.health_check_interval or await self._is_healthy(container):
+                self.stats["reused"] += 1
+                return container
+            logger.warning(f"Pooled container {container.name} failed its health check; replacing it")
+            await self._remove(container)
+
+    async def release(self, container: PooledContainer, reusable: bool = True) -> None:
+        """
+        Return a container to the pool.
+
+        Args:
+            container: Container from acquire()
+            reusable: False if the container may be left in an unknown state
+        """
+        condition = self._get_condition()
+        container.uses += 1
+        container.last_used = time.monotonic()
+        if not reusable or container.uses >= self.max_uses:
+            await self._remove(container)
+            return
+        async with condition:
+            self._busy.pop(container.container_id, None)
+            self._idle.append(container)
+            condition.notify()
+
+    async def _start_container(self) -> PooledContainer:
+        name = f"workflow-agent-pool-{uuid.uuid4().hex[:12]}"
+        exit_code, stdout, stderr = await self._docker(
+            "run", "-d", "--name", name,
+            "--label", "workflow-agent.pool=1",
+            f"--memory={self.memory_limit}", f"--cpus={self.cpu_limit}",
+            "--entrypoint", "sleep",
+            self.image, "infinity"
+        )
+        if exit_code != 0 or not stdout:
+            raise ExecutionError(f"Failed to start pooled container from {self.image}: {stderr}")
+        container = PooledContainer(container_id=stdout.splitlines()[-1], name=name, image=self.image)
+        self.stats["started"] += 1
+        _track_container(self.docker_command, container.container_id)
+        logger.debug(f"Started pooled container {name} from {self.image}")
+        return container
+
+    async def _is_healthy(self, container: PooledContainer) -> bool:
+        exit_code, stdout, _ = await self._docker(
+            "inspect", "-f", "{{.State.Running}}", container.container_id, timeout=10
+        )
+        container.last_checked = time.monotonic()
+        return exit_code == 0 and stdout == "true"
+
+    async def _remove(self, container: PooledContainer) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._busy.pop(container.container_id, None)
+            if container in self._idle:
+                self._idle.remove(container)
+            condition.notify()
+        await self._docker("rm", "-f", container.container_id, timeout=30)
+        _untrack_container(container.container_id)
+        self.stats["removed"] += 1
+        logger.debug(f"Removed pooled container {container.name} after {container.uses} uses")
+
+    async def reap_idle(self) -> int:
+        """
+        Remove containers that have been idle longer than the idle timeout.
+
+        Returns:
+            Number of containers removed
+        """
+        now = time.monotonic()
+        expired = [c for c in self._idle if now - c.last_used > self.idle_timeout]
+        for container in expired:
+            await self._remove(container)
+        return len(expired)
+
+    async def execute(self,
+                     script_content: str,
+                     capture: OutputCapture,
+                     timeout: Optional[float] = None,
+                     read_only: bool = False) -> int:
+        """
+        Run a script in a pooled container.
+
+        Args:
+            script_content: Script to run
+            capture: Capture receiving the output
+            timeout: Timeout in seconds
+            read_only: Whether the script leaves the container unchanged outside the
+                scratch directory; otherwise the container is discarded afterwards
+
+        Returns:
+            Script exit code
+
+        Raises:
+            asyncio.TimeoutError: If the script does not finish in time
+        """
+        container = await self.acquire()
+        reusable = False
+        try:
+            # Reset the scratch directory, receive the script on stdin, then run it
+            command = (
+                f"rm -rf {CONTAINER_WORKDIR} && mkdir -p {CONTAINER_WORKDIR} && "
+                f"cat > {CONTAINER_WORKDIR}/script.sh && chmod +x {CONTAINER_WORKDIR}/script.sh && "
+                f"cd {CONTAINER_WORKDIR} && exec ./script.sh"
+            )
+            process = await asyncio.create_subprocess_exec(
+                self.docker_command, "exec", "-i", container.container_id, "sh", "-c", command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            process.stdin.write(script_content.encode())
+            await process.stdin.drain()
+            process.stdin.close()
+
+            try:
+                exit_code = await stream_process_output(process, capture, timeout)
+            except asyncio.TimeoutError:
+                # The script may still be running inside; the container is discarded
+                if process.returncode is None:
+                    process.kill()
+                raise
+            reusable = read_only
+            return exit_code
+        finally:
+            await self.release(container, reusable=reusable)
+
+    async def close(self) -> None:
+        """Remove every container in the pool."""
+        for container in list(self._idle) + list(self._busy.values()):
+            await self._remove(container)
+
+_pools: Dict[Tuple, ContainerPool] = {}
+_live_containers: Dict[str, str] = {}
+_registry_lock = threading.Lock()
+
+def get_container_pool(image: str, **kwargs) -> ContainerPool:
+    """
+    Get the process-wide pool for an image and container settings.
+
+    Args:
+        image: Docker image
+        kwargs: ContainerPool settings
+
+    Returns:
+        Shared container pool
+    """
+    key = (image, tuple(sorted(kwargs.items())))
+    with _registry_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ContainerPool(image, **kwargs)
+            _pools[key] = pool
+        return pool
+
+def _track_container(docker_command: str, container_id: str) -> None:
+    with _registry_lock:
+        _live_containers[container_id] = docker_command
+
+def _untrack_container(container_id: str) -> None:
+    with _registry_lock:
+        _live_containers.pop(container_id, None)
+
+@atexit.register
+def _remove_live_containers() -> None:
+    """Remove pooled containers left running when the process exits."""
+    with _registry_lock:
+        containers = dict(_live_containers)
+        _live_containers.clear()
+    for container_id, docker_command in containers.items():
+        try:
+            subprocess.run([docker_command, "rm", "-f", container_id],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+        except Exception as e:
+            logger.debug(f"Failed to remove pooled container {container_id}: {e}")
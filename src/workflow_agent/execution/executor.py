@@ -16,12 +16,17 @@ from datetime import datetime
 
 from ..error.exceptions import ExecutionError, SecurityError
 from ..core.state import WorkflowState, Change, OutputData, WorkflowStatus
+from ..core.state_manager import StateManager
 from ..config.configuration import WorkflowConfiguration, validate_script_security
 from ..utils.subprocess_utils import async_secure_shell_execute
 from ..error.handler import ErrorHandler, handle_safely_async
 from .isolation import IsolationFactory, IsolationStrategy
+from .change_tracker import ChangeTracker
+from .result_cache import get_result_cache
 
 logger = logging.getLogger(__name__)
+# Live script output, one record per line at DEBUG level
+output_logger = logging.getLogger(f"{__name__}.output")
 
 class ScriptExecutor:
     """Handles script execution with security and change tracking."""
@@ -37,12 +42,13 @@ class ScriptExecutor:
         self._context = {}  # Execution context for integration execution
         
     @handle_safely_async
-    async def execute(self, state: WorkflowState) -> WorkflowState:
+    async def execute(self, state: WorkflowState, state_manager: Optional[StateManager] = None) -> WorkflowState:
         """
         Execute a script contained in the workflow state.
         
         Args:
             state: Workflow state with script to execute
+            state_manager: Optional state manager journaling changes as they happen
             
         Returns:
             Updated workflow state with execution results
@@ -51,6 +57,19 @@ class ScriptExecutor:
             ExecutionError: If script execution fails
             SecurityError: If script fails security validation
         """
+        return await self._execute(state, state_manager)
+        
+    async def _execute(self, state: WorkflowState, state_manager: Optional[StateManager] = None) -> WorkflowState:
+        """
+        Validate and run a script with the isolation method of the state or configuration.
+        
+        Args:
+            state: Workflow state with script to execute
+            state_manager: Optional state manager journaling changes as they happen
+            
+        Returns:
+            Updated workflow state with execution results
+        """
         if not state.script:
             logger.error("No script provided for execution")
             return state.set_error("No script provided for execution")
@@ -66,21 +85,81 @@ class ScriptExecutor:
         
         logger.info(f"Executing script with {isolation.get_name()} isolation")
         
+        return await self._run_script(validation_state, isolation, state_manager)
+        
+    async def _run_script(
+        self, 
+        state: WorkflowState, 
+        isolation: IsolationStrategy,
+        state_manager: Optional[StateManager] = None
+    ) -> WorkflowState:
+        """
+        Run a validated script, tracking changes while its output streams in.
+        
+        Changes are recorded with the state manager as soon as their markers are
+        printed and are kept in the returned state even if the script fails or
+        times out, so partial executions can be rolled back.
+        
+        Args:
+            state: Validated workflow state with script to execute
+            isolation: Isolation strategy to run the script with
+            state_manager: State manager journaling changes as they happen
+            
+        Returns:
+            Updated workflow state with execution results
+        """
         # Mark state as running
-        execution_state = validation_state.mark_running()
+        execution_state = state.mark_running()
+        transaction_id = execution_state.transaction_id
+        
+        # Extract changes from stdout as it streams in, so truncated output loses none
+        scanner = ChangeTracker().create_scanner()
+        recorded = 0
+        
+        def record(changes: List[Change]) -> None:
+            nonlocal recorded
+            recorded += len(changes)
+            if state_manager is not None:
+                state_manager.record_changes(transaction_id, changes)
+        
+        def on_output(stream: str, line: str) -> None:
+            if stream == "stdout":
+                new_changes = scanner.feed(line)
+                if new_changes:
+                    record(new_changes)
+            if output_logger.isEnabledFor(logging.DEBUG):
+                output_logger.debug(f"[{stream}] {line.rstrip()}")
+                
+        def with_changes(result_state: WorkflowState) -> WorkflowState:
+            changes = scanner.finish()
+            record(changes[recorded:])
+            logger.info(f"Extracted {len(changes)} changes from script output")
+            return result_state.add_changes(changes)
         
         try:
             # Execute the script
             start_time = datetime.now()
-            output = await isolation.execute(
-                execution_state.script,
-                execution_state.parameters,
-                None  # Use default working directory
-            )
+            try:
+                output = await isolation.execute(
+                    execution_state.script,
+                    execution_state.parameters,
+                    None,  # Use default working directory
+                    on_output
+                )
+            finally:
+                # The script may have changed what cached probes observed
+                get_result_cache().invalidate()
             execution_time = (datetime.now() - start_time).total_seconds()
             
-            # Update state with execution results
-            result_state = execution_state.set_output(output)
+            # Update state with execution results and every change made, even on failure
+            result_state = with_changes(execution_state.set_output(output))
+            if output.cpu_time is not None:
+                result_state = result_state.evolve(
+                    metrics=result_state.metrics.model_copy(update={
+                        "cpu_usage": output.cpu_time,
+                        "memory_usage": (output.max_rss or 0) / (1024 * 1024)
+                    })
+                )
             
             # Check exit code
             if output.exit_code != 0:
@@ -90,15 +169,9 @@ class ScriptExecutor:
                     logger.error(f"Error output: {output.stderr[:500]}")
                 return result_state.set_error(error_msg)
                 
-            # Extract and track changes
-            changes = self._extract_changes(output.stdout)
-            change_state = result_state
-            for change in changes:
-                change_state = change_state.add_change(change)
-                
             # Update metrics
-            metrics_state = change_state.evolve(
-                metrics=change_state.metrics.model_copy(update={
+            metrics_state = result_state.evolve(
+                metrics=result_state.metrics.model_copy(update={
                     "end_time": datetime.now(),
                     "duration": execution_time
                 })
@@ -106,18 +179,18 @@ class ScriptExecutor:
             
             # Mark as completed
             completed_state = metrics_state.mark_completed()
-            logger.info(f"Script execution completed successfully with {len(changes)} changes tracked")
+            logger.info(f"Script execution completed successfully with {len(result_state.changes)} changes tracked")
             
             return completed_state
             
         except asyncio.TimeoutError:
             error_msg = "Script execution timed out"
             logger.error(error_msg)
-            return execution_state.set_error(error_msg)
+            return with_changes(execution_state).set_error(error_msg)
         except Exception as e:
             error_msg = f"Error during script execution: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return execution_state.set_error(error_msg)
+            return with_changes(execution_state).set_error(error_msg)
     
     async def _validate_script_security(self, state: WorkflowState) -> WorkflowState:
         """
@@ -191,8 +264,6 @@ class ScriptExecutor:
         Returns:
             List of Change objects
         """
-        # Import and use the consolidated ChangeTracker
-        from .change_tracker import ChangeTracker
         tracker = ChangeTracker()
         return tracker.extract_changes(output)
             
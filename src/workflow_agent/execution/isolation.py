@@ -6,6 +6,7 @@ import os
 import tempfile
 import asyncio
 import platform
+import shlex
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Union
@@ -13,6 +14,14 @@ from typing import Dict, Any, Optional, List, Union
 from ..error.exceptions import ExecutionError
 from ..core.state import OutputData
 from ..config.configuration import WorkflowConfiguration
+from ..utils.subprocess_utils import (
+    OutputCapture, OutputCallback, ResourceLimits, ResourceUsage, build_limited_command,
+    kill_process_group, read_resource_usage, stream_process_output
+)
+from ..utils.capabilities import get_capability_registry
+from ..utils.shell_worker import get_shell_pool
+from .container_pool import get_container_pool
+from .result_cache import get_result_cache, is_idempotent_script
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +37,8 @@ class IsolationStrategy(ABC):
         self, 
         script_content: str,
         parameters: Dict[str, Any],
-        working_dir: Optional[Path] = None
+        working_dir: Optional[Path] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> OutputData:
         """
         Execute a script with isolation.
@@ -37,12 +47,120 @@ class IsolationStrategy(ABC):
             script_content: Content of the script to execute
             parameters: Parameters to pass to the script
             working_dir: Working directory for execution
+            on_output: Callback receiving (stream name, line) as output arrives
             
         Returns:
             Output data with stdout, stderr, exit code
         """
         pass
         
+    async def execute_cached(
+        self,
+        script_content: str,
+        parameters: Dict[str, Any],
+        working_dir: Optional[Path] = None,
+        on_output: Optional[OutputCallback] = None,
+        idempotent: Optional[bool] = None
+    ) -> OutputData:
+        """
+        Execute a script, reusing a recent successful result if the script is idempotent.
+        
+        Args:
+            script_content: Content of the script to execute
+            parameters: Parameters to pass to the script
+            working_dir: Working directory for execution; results are not cached if set
+            on_output: Callback receiving (stream name, line), replayed for cached results
+            idempotent: Whether the script only reads state, None to look for the marker comment
+            
+        Returns:
+            Output data with stdout, stderr, exit code
+        """
+        ttl = getattr(self.config, "script_cache_ttl", 0)
+        if idempotent is None:
+            idempotent = is_idempotent_script(script_content)
+        if not idempotent or ttl <= 0 or working_dir is not None:
+            return await self.execute(script_content, parameters, working_dir, on_output)
+            
+        cache = get_result_cache()
+        key = cache.make_key(script_content, parameters, self.cache_scope())
+        output = cache.get(key)
+        if output is not None:
+            logger.debug(f"Reusing cached result of idempotent script ({self.get_name()} isolation)")
+            if on_output is not None:
+                for line in output.stdout.splitlines(keepends=True):
+                    on_output("stdout", line)
+                for line in output.stderr.splitlines(keepends=True):
+                    on_output("stderr", line)
+            return output
+            
+        output = await self.execute(script_content, parameters, working_dir, on_output)
+        cache.put(key, output, ttl)
+        return output
+        
+    def cache_scope(self) -> str:
+        """
+        Get what besides the host distinguishes where scripts run, for result caching.
+        
+        Returns:
+            Cache scope
+        """
+        return self.get_name()
+        
+    def _create_capture(self, on_output: Optional[OutputCallback] = None) -> OutputCapture:
+        """
+        Create a bounded output capture from the configured limits.
+        
+        Args:
+            on_output: Callback receiving (stream name, line) as output arrives
+            
+        Returns:
+            Output capture
+        """
+        log_dir = getattr(self.config, "output_log_dir", None)
+        return OutputCapture(
+            head_size=getattr(self.config, "output_head_size", 256 * 1024),
+            tail_size=getattr(self.config, "output_tail_size", 1024 * 1024),
+            spill_dir=str(log_dir) if log_dir else os.path.join(tempfile.gettempdir(), "workflow-agent-output"),
+            on_output=on_output,
+            spill_max_files=getattr(self.config, "output_log_max_files", 100),
+            spill_max_age=getattr(self.config, "output_log_max_age", 7 * 24 * 3600)
+        )
+        
+    def _output_data(
+        self,
+        capture: OutputCapture,
+        exit_code: int,
+        duration: float,
+        error: Optional[str] = None,
+        usage: Optional[ResourceUsage] = None
+    ) -> OutputData:
+        """
+        Build output data from a capture.
+        
+        Args:
+            capture: Output capture
+            exit_code: Process exit code
+            duration: Execution duration in seconds
+            error: Message appended to stderr
+            usage: Resources used by the script, if measured
+            
+        Returns:
+            Output data
+        """
+        stderr = capture.stderr_text()
+        if error:
+            stderr = f"{stderr}{error}" if not stderr or stderr.endswith("\n") else f"{stderr}\n{error}"
+        return OutputData(
+            stdout=capture.stdout_text(),
+            stderr=stderr,
+            exit_code=exit_code,
+            duration=duration,
+            truncated=capture.truncated,
+            log_path=capture.log_path,
+            cpu_time=usage.cpu_time if usage else None,
+            max_rss=usage.max_rss if usage else None
+        )
+        
     @abstractmethod
     def get_name(self) -> str:
         """Get the name of the isolation strategy."""
@@ -59,7 +177,8 @@ class DirectIsolation(IsolationStrategy):
         self, 
         script_content: str,
         parameters: Dict[str, Any],
-        working_dir: Optional[Path] = None
+        working_dir: Optional[Path] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> OutputData:
         """Execute a script directly on the host."""
         is_windows = platform.system().lower() == 'windows'
@@ -78,56 +197,61 @@ class DirectIsolation(IsolationStrategy):
             if not is_windows:
                 os.chmod(script_path, 0o755)
                 
-            # Execute the script
-            if is_windows:
-                cmd = f'powershell.exe -ExecutionPolicy Bypass -File "{script_path}"'
-            else:
-                cmd = f'bash "{script_path}"'
-                
-            logger.info(f"Executing script with command: {cmd}")
-            
             # Track execution time
             import time
             start_time = time.time()
             
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=working_dir
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.config.execution_timeout
+            capture = self._create_capture(on_output)
+            if is_windows:
+                cmd = f'powershell.exe -ExecutionPolicy Bypass -File "{script_path}"'
+                logger.info(f"Executing script with command: {cmd}")
+                process = await asyncio.create_subprocess_shell(
+                    cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=working_dir
                 )
-            except asyncio.TimeoutError:
-                if process.returncode is None:
-                    process.terminate()
-                    return OutputData(
-                        stdout="",
-                        stderr="Script execution timed out",
-                        exit_code=124,
-                        duration=time.time() - start_time
+                try:
+                    await stream_process_output(process, capture, self.config.execution_timeout)
+                except asyncio.TimeoutError:
+                    await self._terminate(process)
+                    return self._output_data(capture, 124, time.time() - start_time, "Script execution timed out")
+                except BaseException:
+                    # Cancelled by the caller: stop the script before giving up on it
+                    await self._terminate(process)
+                    raise
+                usage = None
+            else:
+                # Run in a new session so a timeout can kill every process the script started
+                logger.info(f'Executing script with command: bash "{script_path}"')
+                usage_path = f"{script_path}.usage"
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *build_limited_command(["bash", script_path], self._resource_limits(), usage_path),
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=working_dir,
+                        start_new_session=True
                     )
-            
-            # Convert stdout and stderr to strings
-            stdout_str = stdout.decode() if stdout else ""
-            stderr_str = stderr.decode() if stderr else ""
-            
+                    try:
+                        await stream_process_output(process, capture, self.config.execution_timeout)
+                    except asyncio.TimeoutError:
+                        await kill_process_group(process)
+                        return self._output_data(capture, 124, time.time() - start_time, "Script execution timed out")
+                    except BaseException:
+                        # Cancelled by the caller: the script tree must not outlive the task
+                        await kill_process_group(process)
+                        raise
+                    usage = read_resource_usage(usage_path)
+                finally:
+                    if os.path.exists(usage_path):
+                        os.unlink(usage_path)
+                        
             duration = time.time() - start_time
             
-            # Parse output for changes
-            changes = self._parse_changes(stdout_str)
-            
             # Create output data
-            output = OutputData(
-                stdout=stdout_str,
-                stderr=stderr_str,
-                exit_code=process.returncode or 0,
-                duration=duration
-            )
+            output = self._output_data(capture, process.returncode or 0, duration, usage=usage)
+            stderr_str = output.stderr
             
             # Log result
             if process.returncode == 0:
@@ -145,56 +269,90 @@ class DirectIsolation(IsolationStrategy):
                 os.unlink(script_path)
             except Exception as e:
                 logger.warning(f"Failed to remove temporary script: {e}")
+                
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process) -> None:
+        """Terminate a process, killing it if it does not exit within five seconds."""
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
     
-    def _parse_changes(self, output: str) -> List[Dict[str, Any]]:
-        """Parse script output for changes."""
-        changes = []
+    def _resource_limits(self) -> ResourceLimits:
+        """
+        Get the configured per-process resource limits.
         
-        # Look for standardized change indicators
-        import re
+        Returns:
+            Resource limits for directly executed scripts
+        """
+        return ResourceLimits(
+            cpu_seconds=getattr(self.config, "script_cpu_limit", None),
+            memory_bytes=getattr(self.config, "script_memory_limit", None),
+            open_files=getattr(self.config, "script_open_files_limit", None),
+            file_size_bytes=getattr(self.config, "script_file_size_limit", None)
+        )
+    
+    def get_name(self) -> str:
+        """Get isolation name."""
+        return "direct"
+
+class ShellWorkerIsolation(IsolationStrategy):
+    """
+    Execute short shell scripts on the host in the shared pool of persistent shell workers.
+    
+    Output is delivered when the script finishes, bounded to the configured
+    head and tail sizes, and no resource limits apply,
+    so this suits quick read-only checks. Scripts with a non-shell interpreter
+    line fall back to direct execution.
+    """
+    
+    _SHELL_INTERPRETERS = ("sh", "bash")
+    
+    def _runs_in_shell(self, script_content: str) -> bool:
+        if not script_content.startswith("#!"):
+            return True
+        interpreter = script_content[2:].split("\n", 1)[0].split()
+        if interpreter and os.path.basename(interpreter[0]) == "env":
+            interpreter = interpreter[1:]
+        return bool(interpreter) and os.path.basename(interpreter[0]) in self._SHELL_INTERPRETERS
         
-        # Package installations
-        for match in re.finditer(r"CHANGE:PACKAGE_INSTALLED:(\S+)", output):
-            package_name = match.group(1)
-            changes.append({
-                "type": "package_installed",
-                "target": package_name,
-                "revertible": True
-            })
-            
-        # File creations
-        for match in re.finditer(r"CHANGE:FILE_CREATED:(\S+)", output):
-            file_path = match.group(1)
-            changes.append({
-                "type": "file_created",
-                "target": file_path,
-                "revertible": True
-            })
-            
-        # Directory creations
-        for match in re.finditer(r"CHANGE:DIRECTORY_CREATED:(\S+)", output):
-            dir_path = match.group(1)
-            changes.append({
-                "type": "directory_created",
-                "target": dir_path,
-                "revertible": True
-            })
+    async def execute(
+        self, 
+        script_content: str,
+        parameters: Dict[str, Any],
+        working_dir: Optional[Path] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> OutputData:
+        """Execute a script in the shell worker."""
+        if platform.system().lower() == 'windows' or not self._runs_in_shell(script_content):
+            return await DirectIsolation(self.config).execute(script_content, parameters, working_dir, on_output)
             
-        # Service operations
-        for match in re.finditer(r"CHANGE:SERVICE_(\w+):(\S+)", output):
-            operation = match.group(1).lower()
-            service_name = match.group(2)
-            changes.append({
-                "type": f"service_{operation}",
-                "target": service_name,
-                "revertible": operation in ["started", "enabled"]
-            })
+        if working_dir is not None:
+            script_content = f"cd {shlex.quote(str(working_dir))} || exit 1\n{script_content}"
             
-        return changes
+        import time
+        start_time = time.time()
+        exit_code, stdout, stderr = await get_shell_pool().run(script_content, timeout=self.config.execution_timeout)
+        capture = self._create_capture(on_output)
+        try:
+            for line in stdout.splitlines(keepends=True):
+                capture.add("stdout", line)
+            for line in stderr.splitlines(keepends=True):
+                capture.add("stderr", line)
+        finally:
+            capture.close()
+        return self._output_data(capture, exit_code, time.time() - start_time)
+        
+    def cache_scope(self) -> str:
+        """Get the cache scope: scripts see the same host as direct execution."""
+        return "direct"
         
     def get_name(self) -> str:
         """Get isolation name."""
-        return "direct"
+        return "worker"
 
 class DockerIsolation(IsolationStrategy):
     """Execute scripts in Docker containers."""
@@ -205,12 +363,38 @@ class DockerIsolation(IsolationStrategy):
         self.image = config.docker_image if hasattr(config, 'docker_image') else "debian:stable-slim"
         self.memory_limit = "512m"
         self.cpu_limit = "1.0"
+        self.docker_command = "docker"
+        self.pool_size = getattr(config, "docker_pool_size", 0)
+        
+    def cache_scope(self) -> str:
+        """Get the cache scope: results differ per image."""
+        return f"docker:{self.image}"
+        
+    def get_pool(self):
+        """
+        Get the shared warm container pool for this image and limits.
+        
+        Returns:
+            Container pool, or None if pooling is disabled
+        """
+        if self.pool_size <= 0:
+            return None
+        return get_container_pool(
+            self.image,
+            max_size=self.pool_size,
+            max_uses=getattr(self.config, "docker_pool_max_uses", 20),
+            idle_timeout=getattr(self.config, "docker_pool_idle_timeout", 300),
+            memory_limit=self.memory_limit,
+            cpu_limit=self.cpu_limit,
+            docker_command=self.docker_command
+        )
         
     async def execute(
         self, 
         script_content: str,
         parameters: Dict[str, Any],
-        working_dir: Optional[Path] = None
+        working_dir: Optional[Path] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> OutputData:
         """Execute a script in a Docker container."""
         # Check if Docker is available
@@ -218,6 +402,11 @@ class DockerIsolation(IsolationStrategy):
             logger.error("Docker is not available. Cannot use Docker isolation.")
             raise ExecutionError("Docker is not available for script isolation")
             
+        # Warm containers keep whatever a script changes, so only read-only scripts share them
+        pool = self.get_pool()
+        if pool is not None and is_idempotent_script(script_content):
+            return await self._execute_pooled(pool, script_content, on_output)
+            
         # Create a temporary directory for the script
         with tempfile.TemporaryDirectory() as temp_dir:
             # Write the script to the temporary directory
@@ -236,7 +425,7 @@ class DockerIsolation(IsolationStrategy):
             container_name = f"workflow-agent-{parameters.get('execution_id', 'unknown')}"
             
             docker_cmd = (
-                f"docker run --rm --name {container_name} "
+                f"{self.docker_command} run --rm --name {container_name} "
                 f"--memory={self.memory_limit} --cpus={self.cpu_limit} "
                 f"-v {script_path}:/script.sh:ro "
                 f"{self.image} /script.sh"
@@ -254,39 +443,22 @@ class DockerIsolation(IsolationStrategy):
                     cwd=working_dir
                 )
                 
+                capture = self._create_capture(on_output)
                 try:
-                    stdout, stderr = await asyncio.wait_for(
-                        process.communicate(),
-                        timeout=self.config.execution_timeout
-                    )
+                    await stream_process_output(process, capture, self.config.execution_timeout)
                 except asyncio.TimeoutError:
                     # Kill the container if it's still running
-                    await asyncio.create_subprocess_shell(
-                        f"docker kill {container_name}",
-                        stdout=asyncio.subprocess.DEVNULL,
-                        stderr=asyncio.subprocess.DEVNULL
-                    )
-                    
-                    return OutputData(
-                        stdout="",
-                        stderr="Docker execution timed out",
-                        exit_code=124,
-                        duration=time.time() - start_time
-                    )
-                
-                # Convert stdout and stderr to strings
-                stdout_str = stdout.decode() if stdout else ""
-                stderr_str = stderr.decode() if stderr else ""
+                    await self._kill_container(container_name)
+                    return self._output_data(capture, 124, time.time() - start_time, "Docker execution timed out")
+                except BaseException:
+                    # Cancelled by the caller: the container must not keep running the script
+                    await self._kill_container(container_name)
+                    raise
                 
                 duration = time.time() - start_time
                 
                 # Create output data
-                output = OutputData(
-                    stdout=stdout_str,
-                    stderr=stderr_str,
-                    exit_code=process.returncode or 0,
-                    duration=duration
-                )
+                output = self._output_data(capture, process.returncode or 0, duration)
                 
                 # Log result
                 if process.returncode == 0:
@@ -305,19 +477,63 @@ class DockerIsolation(IsolationStrategy):
                     duration=time.time() - start_time
                 )
     
-    async def _is_docker_available(self) -> bool:
-        """Check if Docker is available."""
+    async def _kill_container(self, container_name: str) -> None:
+        """
+        Kill a running container and wait for the kill command to finish.
+        
+        Args:
+            container_name: Name of the container
+        """
+        process = await asyncio.create_subprocess_shell(
+            f"{self.docker_command} kill {container_name}",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        await process.wait()
+    
+    async def _execute_pooled(self, pool, script_content: str, on_output: Optional[OutputCallback]) -> OutputData:
+        """
+        Execute a script in a warm container from the pool.
+        
+        Args:
+            pool: Container pool
+            script_content: Content of the script to execute
+            on_output: Callback receiving (stream name, line) as output arrives
+            
+        Returns:
+            Output data with stdout, stderr, exit code
+        """
+        import time
+        start_time = time.time()
+        capture = self._create_capture(on_output)
         try:
-            process = await asyncio.create_subprocess_shell(
-                "docker --version",
+            exit_code = await pool.execute(script_content, capture, self.config.execution_timeout, read_only=True)
+        except asyncio.TimeoutError:
+            return self._output_data(capture, 124, time.time() - start_time, "Docker execution timed out")
+        except Exception as e:
+            logger.error(f"Error executing script in pooled container: {e}")
+            return self._output_data(capture, 1, time.time() - start_time, f"Error executing Docker command: {str(e)}")
+            
+        duration = time.time() - start_time
+        if exit_code == 0:
+            logger.info(f"Docker script executed successfully in {duration:.2f}s")
+        else:
+            logger.error(f"Docker script execution failed with exit code {exit_code}")
+        return self._output_data(capture, exit_code or 0, duration)
+    
+    async def _is_docker_available(self) -> bool:
+        """Check if Docker is available, reusing the process-wide probe result."""
+        async def probe() -> bool:
+            process = await asyncio.create_subprocess_exec(
+                self.docker_command, "--version",
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
             stdout, _ = await process.communicate()
-            return process.returncode == 0 and stdout
-        except Exception:
-            return False
+            return process.returncode == 0 and bool(stdout)
+            
+        return await get_capability_registry().check_async(f"docker:{self.docker_command}", probe)
             
     def get_name(self) -> str:
         """Get isolation name."""
@@ -345,6 +561,8 @@ class IsolationFactory:
             return DockerIsolation(config)
         elif isolation_method.lower() == "direct":
             return DirectIsolation(config)
+        elif isolation_method.lower() == "worker":
+            return ShellWorkerIsolation(config)
         else:
             logger.error(f"Unsupported isolation method: {isolation_method}")
             raise ExecutionError(f"Unsupported isolation method: {isolation_method}")
@@ -0,0 +1,139 @@
+"""
+Short-lived cache of results of idempotent, read-only scripts.
+"""
+import functools
+import hashlib
+import json
+import logging
+import platform
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.state import OutputData
+
+logger = logging.getLogger(__name__)
+
+# Scripts opt in with a header comment such as "# workflow-agent: read-only"
+_IDEMPOTENT_RE = re.compile(r"^#\s*workflow-agent:\s*(?:idempotent|read-only)\s*$", re.MULTILINE | re.IGNORECASE)
+# Only the start of a script is searched for the marker
+_MARKER_SEARCH_SIZE = 1024
+
+def is_idempotent_script(script: str) -> bool:
+    """
+    Check whether a script is marked idempotent or read-only.
+
+    Args:
+        script: Script content
+
+    Returns:
+        True if the script carries the marker comment near its start
+    """
+    return _IDEMPOTENT_RE.search(script[:_MARKER_SEARCH_SIZE]) is not None
+
+@functools.lru_cache(maxsize=1)
+def host_fingerprint() -> str:
+    """Fingerprint of the host and boot; results from before a reboot are never reused."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip()
+    except OSError:
+        boot_id = ""
+    return hashlib.sha256(f"{platform.node()}|{platform.platform()}|{boot_id}".encode()).hexdigest()[:16]
+
+class ScriptResultCache:
+    """
+    LRU cache of successful script results keyed by script, parameters and host.
+
+    Entries expire after the TTL given when they are stored. Failed results are
+    never cached so polling verification keeps re-checking until it passes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, OutputData]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def make_key(self, script: str, parameters: Dict[str, Any], scope: str) -> str:
+        """
+        Build the cache key of a script execution.
+
+        Args:
+            script: Script content
+            parameters: Script parameters
+            scope: Where the script runs, e.g. the isolation method and image
+
+        Returns:
+            Cache key
+        """
+        payload = json.dumps(
+            {"script": script, "parameters": parameters, "scope": scope, "host": host_fingerprint()},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[OutputData]:
+        """
+        Get a cached result.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached output, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: str, output: OutputData, ttl: float) -> None:
+        """
+        Cache a result if it succeeded.
+
+        Args:
+            key: Cache key
+            output: Script output
+            ttl: Seconds the result may be reused
+        """
+        if output.exit_code != 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, output)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Forget every cached result, e.g. after a script changed the system."""
+        with self._lock:
+            if self._entries:
+                logger.debug(f"Invalidating {len(self._entries)} cached script results")
+            self._entries.clear()
+
+_cache = ScriptResultCache()
+
+def get_result_cache() -> ScriptResultCache:
+    """
+    Get the cache shared by the whole process.
+
+    Returns:
+        Shared script result cache
+    """
+    return _cache
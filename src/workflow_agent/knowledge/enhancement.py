@@ -1,7 +1,9 @@
 """Enhanced workflow state knowledge integration with platform-aware filtering."""
+import copy
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
 from pydantic import BaseModel, Field, ValidationError
 from ..documentation.parser import DocumentationParser, DocumentationFetchError
 from ..error.exceptions import KnowledgeEnhancementError
@@ -50,22 +52,74 @@ class IntegrationContext(BaseModel):
                 return family
         return dist_lower
 
+_WORD_RE = re.compile(r"\w+")
+
+@lru_cache(maxsize=256)
+def _platform_pattern(value: str) -> Pattern:
+    """Compile the word-boundary pattern for a platform value once."""
+    return re.compile(f"\\b{re.escape(value)}\\b", re.IGNORECASE)
+
+class PlatformCompatibilityIndex:
+    """Maps platform values to the ids of compatible documentation items."""
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self._universal: Set[int] = set()
+        self._platforms: Dict[int, List[str]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._lookups: Dict[Tuple[str, str, str], List[Dict]] = {}
+
+        for item_id, item in enumerate(items):
+            platforms = item.get('platforms', [])
+            if not platforms:
+                self._universal.add(item_id)
+                continue
+            self._platforms[item_id] = platforms
+            for platform in platforms:
+                for token in _WORD_RE.findall(platform.lower()):
+                    self._tokens.setdefault(token, set()).add(item_id)
+
+    def _matching_ids(self, value: str) -> Set[int]:
+        if not value:
+            return set()
+        if _WORD_RE.fullmatch(value):
+            return self._tokens.get(value.lower(), set())
+        # Values spanning several tokens fall back to the compiled pattern
+        pattern = _platform_pattern(value)
+        return {
+            item_id for item_id, platforms in self._platforms.items()
+            if any(pattern.search(platform) for platform in platforms)
+        }
+
+    def lookup(self, ctx: IntegrationContext) -> List[Dict]:
+        """Return copies of the items compatible with a platform context, in document order."""
+        key = (ctx.system, ctx.distribution, ctx.architecture)
+        if key not in self._lookups:
+            item_ids = set(self._universal)
+            for value in key:
+                item_ids |= self._matching_ids(value)
+            self._lookups[key] = [self.items[item_id] for item_id in sorted(item_ids)]
+        # Results end up in workflow state; callers must not alias the cached items
+        return copy.deepcopy(self._lookups[key])
+
 class DocumentationEnhancer:
     """Enhanced documentation processor with platform-aware filtering."""
     
     def __init__(self, parser: DocumentationParser):
         self.parser = parser
         self.cache: Dict[str, Dict] = {}
+        self.indexes: Dict[str, Dict[str, PlatformCompatibilityIndex]] = {}
 
     async def enhance_state(self, state: Any) -> Any:
         """Enhance workflow state with validated documentation data."""
         try:
             ctx = self._extract_context(state)
             docs = await self._get_documentation(state.integration_type)
+            indexes = self.indexes[state.integration_type]
             
             filtered_docs = {
-                'prerequisites': self._filter_items(docs.get('prerequisites', []), ctx),
-                'installation_methods': self._filter_installation_methods(docs.get('installation_methods', []), ctx),
+                'prerequisites': indexes['prerequisites'].lookup(ctx),
+                'installation_methods': indexes['installation_methods'].lookup(ctx),
                 'configuration': docs.get('configuration', {}),
                 'verification': docs.get('verification', [])
             }
@@ -94,45 +148,24 @@ class DocumentationEnhancer:
         if integration_type in self.cache:
             return self.cache[integration_type]
             
-        docs = await self.parser.fetch_integration_docs(integration_type)
+        async with self.parser:
+            docs = await self.parser.fetch_integration_docs(integration_type)
         self._validate_documentation(docs)
         self.cache[integration_type] = docs
+        self.indexes[integration_type] = self._build_indexes(docs)
         return docs
 
+    def _build_indexes(self, docs: Dict) -> Dict[str, PlatformCompatibilityIndex]:
+        """Build the platform compatibility indexes for a documentation load."""
+        methods = sorted(docs.get('installation_methods', []), key=lambda m: m.get('priority', 0), reverse=True)
+        return {
+            'prerequisites': PlatformCompatibilityIndex(docs.get('prerequisites', [])),
+            'installation_methods': PlatformCompatibilityIndex(methods)
+        }
+
     def _validate_documentation(self, docs: Dict) -> None:
         """Validate documentation structure."""
         required_sections = ['prerequisites', 'installation_methods']
         for section in required_sections:
             if section not in docs:
                 raise KnowledgeEnhancementError(f"Missing documentation section: {section}")
-
-    def _filter_items(self, items: List[Dict], ctx: IntegrationContext) -> List[Dict]:
-        """Filter items based on platform compatibility."""
-        return [item for item in items if self._is_compatible(item.get('platforms', []), ctx)]
-
-    def _filter_installation_methods(self, methods: List[Dict], ctx: IntegrationContext) -> List[Dict]:
-        """Filter and prioritize installation methods."""
-        compatible_methods = [m for m in methods if self._is_compatible(m.get('platforms', []), ctx)]
-        return sorted(compatible_methods, key=lambda m: m.get('priority', 0), reverse=True)
-
-    def _is_compatible(self, platforms: List[str], ctx: IntegrationContext) -> bool:
-        """Check compatibility with platform context."""
-        if not platforms:
-            return True
-            
-        platform_patterns = [
-            self._create_pattern(ctx.system),
-            self._create_pattern(ctx.distribution),
-            self._create_pattern(ctx.architecture)
-        ]
-        
-        return any(
-            re.search(pattern, platform, re.IGNORECASE)
-            for platform in platforms
-            for pattern in platform_patterns
-            if pattern
-        )
-
-    def _create_pattern(self, value: str) -> str:
-        """Create regex pattern for platform matching."""
-        return f"\\b{re.escape(value)}\\b" if value else "" 
\ No newline at end of file
@@ -9,7 +9,7 @@ import uuid
 import traceback
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Type, Union, Tuple
+from typing import Dict, Any, Optional, List, Type, Union, Tuple, AsyncIterator
 from pathlib import Path
 
 import typer
@@ -19,6 +19,7 @@ from pydantic import ValidationError
 from .core.state import WorkflowState, WorkflowStage, WorkflowStatus
 from .core.service_container import ServiceContainer
 from .verification.dynamic import DynamicVerificationBuilder
+from .execution.batch import BatchExecutor, BatchPolicy, BatchResult
 from .config.configuration import WorkflowConfiguration, ensure_workflow_config
 from .error.exceptions import (
     WorkflowError,
@@ -89,6 +90,20 @@ class WorkflowAgent:
         Execute workflow with enhanced monitoring, checkpointing, and recovery.
         Implements a more structured workflow with clear stages and better error handling.
         
+        Args:
+            state: Initial workflow state
+            
+        Returns:
+            Final workflow state after execution
+        """
+        state = await self._execute_workflow(state)
+        await self._record_execution(state)
+        return state
+        
+    async def _execute_workflow(self, state: WorkflowState) -> WorkflowState:
+        """
+        Run the stages of a workflow and handle its failures.
+        
         Args:
             state: Initial workflow state
             
@@ -152,6 +167,55 @@ class WorkflowAgent:
             workflow_logger.error("Unexpected error: %s", e, exc_info=True)
             return await self._handle_workflow_failure(state, e)
             
+    async def _record_execution(self, state: WorkflowState) -> None:
+        """
+        Record a finished workflow in the execution history.
+        
+        The recorded integration types seed knowledge prefetching on the next start.
+        
+        Args:
+            state: Final workflow state
+        """
+        try:
+            history = self.container.get("execution_history_manager")
+            duration = state.output.duration if state.output else state.metrics.duration
+            await history.save_execution(
+                target_name=state.target_name,
+                action=state.action,
+                success=not state.has_error,
+                execution_time=int(duration * 1000),
+                script=state.script or "",
+                error_message=state.error,
+                output=state.output.stdout if state.output else None,
+                transaction_id=state.transaction_id,
+                integration_type=state.integration_type
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record execution history: {e}")
+            
+    async def run_batch(
+        self, 
+        states: List[WorkflowState], 
+        policy: Optional[BatchPolicy] = None
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run workflows for many targets concurrently.
+        
+        Args:
+            states: Initial workflow states, one per target
+            policy: Concurrency, canary and failure policy
+            
+        Yields:
+            Per-target results as each workflow finishes
+        """
+        batch = BatchExecutor(self.config, policy=policy, runner=self.run_workflow)
+        async for result in batch.run(states):
+            yield result
+        logger.info(
+            f"Batch finished: {batch.stats['succeeded']} succeeded, "
+            f"{batch.stats['failed']} failed, {batch.stats['skipped']} skipped"
+        )
+            
     async def _validate_workflow_inputs(self, state: WorkflowState) -> WorkflowState:
         """
         Validate workflow inputs before execution.
@@ -231,7 +295,7 @@ class WorkflowAgent:
         # Execute the script
         script_executor = self.container.get("script_executor")
         execution_start_time = datetime.now()
-        state = await script_executor.execute(state)
+        state = await script_executor.execute(state, state_manager=self.container.get("state_manager"))
         execution_time = (datetime.now() - execution_start_time).total_seconds()
         logger.info(f"Script execution completed in {execution_time:.2f} seconds")
         
@@ -333,7 +397,7 @@ class WorkflowAgent:
         
         # Execute the script
         script_executor = self.container.get("script_executor")
-        state = await script_executor.execute(state)
+        state = await script_executor.execute(state, state_manager=self.container.get("state_manager"))
         if state.has_error:
             logger.error("Script execution failed: %s", state.error)
             return await self._handle_workflow_failure(state)
@@ -390,6 +454,9 @@ class WorkflowAgent:
         # Add error to state if not already set
         if not state.error:
             state = state.set_error(error_message)
+            
+        # Include changes journaled during execution that the state may have missed
+        state = self.container.get("state_manager").merge_recorded_changes(state)
         
         # Check if this is a retryable failure and retry count not exceeded
         should_retry = self._should_retry_workflow(state, error)
@@ -851,6 +918,29 @@ def remove(
         logger.error(f"Removal failed: {e}")
         sys.exit(1)
 
+@app.command("build-templates")
+def build_templates(
+    output_dir: str = typer.Option(
+        os.path.join("cache", "template_bundle"), help="Directory to write the template bundle to"
+    ),
+    template_dir: Optional[List[str]] = typer.Option(None, help="Template directory (repeatable)")
+):
+    """Precompile templates into a bundle loaded at start-up."""
+    try:
+        from .templates.bundle import DEFAULT_BUNDLE_DIR
+        from .templates.manager import TemplateManager
+
+        manager = TemplateManager(template_dirs=template_dir or None)
+        count = manager.build_bundle(output_dir)
+        logger.info(f"Compiled {count} templates into {output_dir}")
+        if os.path.abspath(output_dir) != os.path.abspath(DEFAULT_BUNDLE_DIR):
+            # Only the default directory is picked up without configuration
+            logger.info(f"Set WORKFLOW_TEMPLATE_BUNDLE_DIR={os.path.abspath(output_dir)} to load this bundle")
+
+    except Exception as e:
+        logger.error(f"Template bundle build failed: {e}")
+        sys.exit(1)
+
 def main():
     """Main entry point for the CLI."""
     try:
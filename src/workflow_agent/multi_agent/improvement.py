@@ -5,7 +5,7 @@ Implements the ImprovementAgentInterface from the multi-agent system.
 import logging
 import re
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set
 from pathlib import Path
 import os
 import asyncio
@@ -15,6 +15,7 @@ from .interfaces import ImprovementAgentInterface
 from ..core.message_bus import MessageBus
 from ..core.state import WorkflowState
 from ..storage.knowledge_base import KnowledgeBase
+from ..storage.document_store import DocumentStore
 from ..error.handler import handle_safely_async
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,8 @@ class ImprovementAgent(ImprovementAgentInterface):
         self.knowledge_base = knowledge_base or KnowledgeBase()
         self.learning_data = {}
         self.learning_path = None
+        self.learning_store: Optional[DocumentStore] = None
+        self._dirty_keys: Set[str] = set()
         
         # Register message handlers
         self.register_handler("analyze_failure", self._handle_analyze_failure)
@@ -41,39 +44,91 @@ class ImprovementAgent(ImprovementAgentInterface):
         try:
             storage_dir = os.path.join(os.path.dirname(__file__), "..", "storage")
             os.makedirs(storage_dir, exist_ok=True)
-            self.learning_path = Path(storage_dir) / "learning_data.json"
+            self.learning_path = Path(storage_dir) / "learning_data.db"
         except Exception as e:
             logger.error(f"Error setting up learning path: {e}")
-            self.learning_path = Path(tempfile.gettempdir()) / "workflow_learning_data.json"
+            self.learning_path = Path(tempfile.gettempdir()) / "workflow_learning_data.db"
             logger.warning(f"Using temporary learning path: {self.learning_path}")
             
         await self._load_learning_data()
         logger.info("ImprovementAgent initialization complete")
     
     async def _load_learning_data(self) -> None:
-        """Load existing learning data."""
-        if self.learning_path and self.learning_path.exists():
-            try:
-                with open(self.learning_path, "r") as f:
-                    self.learning_data = json.load(f)
-                logger.info(f"Loaded learning data with {len(self.learning_data)} entries")
-            except Exception as e:
-                logger.error(f"Error loading learning data: {e}")
-                self.learning_data = {}
-    
-    async def _save_learning_data(self) -> None:
-        """Save learning data to disk."""
+        """Open the learning data store; entries are loaded lazily per integration key."""
         if not self.learning_path:
-            logger.error("No learning path configured")
             return
+        try:
+            self.learning_store = DocumentStore(
+                db_path=str(self.learning_path),
+                namespace="learning",
+                legacy_json_path=str(self.learning_path.with_suffix(".json"))
+            )
+            await self.learning_store.initialize()
+            logger.info(f"Opened learning data store with {await self.learning_store.count()} entries")
+        except Exception as e:
+            logger.error(f"Error loading learning data: {e}")
+            self.learning_store = None
+        self.learning_data = {}
+        self._dirty_keys.clear()
+    
+    async def _get_learning_entry(self, integration_key: str, create: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get the learning entry for an integration key, loading it from the store on first use.
+        
+        Args:
+            integration_key: Integration key
+            create: Whether to create an empty entry if none exists
             
+        Returns:
+            Learning entry or None if not found and create is False
+        """
+        if integration_key not in self.learning_data:
+            entry = None
+            if self.learning_store:
+                try:
+                    entry = await self.learning_store.get(integration_key)
+                except Exception as e:
+                    logger.error(f"Error loading learning entry {integration_key}: {e}")
+            if entry is None:
+                if not create:
+                    return None
+                entry = {
+                    "failures": [],
+                    "successes": 0,
+                    "improvements": []
+                }
+            self.learning_data[integration_key] = entry
+        return self.learning_data[integration_key]
+    
+    async def _save_learning_data(self, integration_key: Optional[str] = None) -> None:
+        """
+        Persist learning entries, one record per integration key.
+        
+        Args:
+            integration_key: Entry to write; all modified entries are written if omitted
+        """
+        if integration_key:
+            self._dirty_keys.add(integration_key)
+        if not self._dirty_keys:
+            return
+        if not self.learning_store:
+            logger.error("No learning store configured")
+            return
+            
+        # Take the keys before awaiting so entries marked dirty during the write stay dirty
+        keys = set(self._dirty_keys)
+        self._dirty_keys -= keys
         try:
-            os.makedirs(self.learning_path.parent, exist_ok=True)
-            with open(self.learning_path, "w") as f:
-                json.dump(self.learning_data, f, indent=2)
-            logger.info(f"Saved learning data with {len(self.learning_data)} entries")
+            written = await self.learning_store.put_many(
+                (key, self.learning_data[key]) for key in keys if key in self.learning_data
+            )
+            logger.info(f"Saved {written} learning data entries")
         except Exception as e:
+            self._dirty_keys |= keys
             logger.error(f"Error saving learning data: {e}")
+        except BaseException:
+            self._dirty_keys |= keys
+            raise
     
     async def _handle_analyze_failure(self, message: Dict[str, Any]) -> None:
         workflow_id = message["workflow_id"]
@@ -83,13 +138,8 @@ class ImprovementAgent(ImprovementAgentInterface):
             state = WorkflowState(**state_dict)
             root_cause = await self._identify_root_cause(state, error)
             integration_key = f"{state.integration_type}_{state.target_name}_{state.action}"
-            if integration_key not in self.learning_data:
-                self.learning_data[integration_key] = {
-                    "failures": [],
-                    "successes": 0,
-                    "improvements": []
-                }
-            self.learning_data[integration_key]["failures"].append({
+            learning_entry = await self._get_learning_entry(integration_key)
+            learning_entry["failures"].append({
                 "error": error,
                 "root_cause": root_cause,
                 "timestamp": state.metrics.start_time if state.metrics else None,
@@ -97,13 +147,13 @@ class ImprovementAgent(ImprovementAgentInterface):
             })
             improvement = await self._generate_improvement(state, root_cause)
             if improvement:
-                self.learning_data[integration_key]["improvements"].append({
+                learning_entry["improvements"].append({
                     "root_cause": root_cause,
                     "improvement": improvement,
                     "timestamp": state.metrics.start_time if state.metrics else None
                 })
                 await self._apply_improvement(state, improvement)
-                await self._save_learning_data()
+                await self._save_learning_data(integration_key)
                 await self.publish("improvement_generated", {
                     "workflow_id": workflow_id,
                     "state": state.model_dump(),
@@ -115,7 +165,7 @@ class ImprovementAgent(ImprovementAgentInterface):
                     "workflow_id": workflow_id,
                     "root_cause": root_cause
                 })
-                await self._save_learning_data()
+                await self._save_learning_data(integration_key)
         except Exception as e:
             logger.error(f"Error analyzing failure: {e}")
             await self.publish("error", {
@@ -130,14 +180,9 @@ class ImprovementAgent(ImprovementAgentInterface):
             try:
                 state = WorkflowState(**state_dict)
                 integration_key = f"{state.integration_type}_{state.target_name}_{state.action}"
-                if integration_key not in self.learning_data:
-                    self.learning_data[integration_key] = {
-                        "failures": [],
-                        "successes": 0,
-                        "improvements": []
-                    }
-                self.learning_data[integration_key]["successes"] += 1
-                await self._save_learning_data()
+                learning_entry = await self._get_learning_entry(integration_key)
+                learning_entry["successes"] += 1
+                await self._save_learning_data(integration_key)
             except Exception as e:
                 logger.error(f"Error recording workflow completion: {e}")
     
@@ -400,9 +445,7 @@ retry_command() {
         integration_key = f"{integration_type}_{target_name}_{action}"
         
         # Get historical data if available
-        historical_data = {}
-        if integration_key in self.learning_data:
-            historical_data = self.learning_data[integration_key]
+        historical_data = await self._get_learning_entry(integration_key, create=False) or {}
             
         # Analyze performance against historical data
         analysis = {
@@ -577,23 +620,18 @@ retry_command() {
         integration_key = f"{integration_type}_{target_name}_{action}"
         
         # Initialize learning data for this integration if needed
-        if integration_key not in self.learning_data:
-            self.learning_data[integration_key] = {
-                "failures": [],
-                "successes": 0,
-                "improvements": [],
-                "execution_times": []
-            }
+        learning_entry = await self._get_learning_entry(integration_key)
+        learning_entry.setdefault("execution_times", [])
         
         # Record execution time if available
         if "metrics" in execution_data and "duration" in execution_data["metrics"]:
-            self.learning_data[integration_key]["execution_times"].append(
+            learning_entry["execution_times"].append(
                 execution_data["metrics"]["duration"]
             )
         
         # Update learning data based on success or failure
         if success:
-            self.learning_data[integration_key]["successes"] += 1
+            learning_entry["successes"] += 1
         else:
             # Record failure with root cause analysis
             root_cause = "unknown_error"
@@ -614,7 +652,7 @@ retry_command() {
                     logger.error(f"Error creating state for root cause analysis: {e}")
                     
             # Record the failure
-            self.learning_data[integration_key]["failures"].append({
+            learning_entry["failures"].append({
                 "error": error,
                 "root_cause": root_cause,
                 "timestamp": execution_data.get("timestamp"),
@@ -626,7 +664,7 @@ retry_command() {
                 try:
                     improvement = await self._generate_improvement(state, root_cause)
                     if improvement:
-                        self.learning_data[integration_key]["improvements"].append({
+                        learning_entry["improvements"].append({
                             "root_cause": root_cause,
                             "improvement": improvement,
                             "timestamp": execution_data.get("timestamp")
@@ -636,7 +674,7 @@ retry_command() {
                     logger.error(f"Error generating improvement: {e}")
         
         # Save learning data to disk
-        await self._save_learning_data()
+        await self._save_learning_data(integration_key)
         return True
     
     # Helper methods for analysis
@@ -707,5 +745,7 @@ retry_command() {
     async def cleanup(self) -> None:
         """Clean up resources and save learning data."""
         await self._save_learning_data()
+        if self.learning_store:
+            await self.learning_store.cleanup()
         await super().cleanup()
         logger.info("ImprovementAgent cleanup complete")
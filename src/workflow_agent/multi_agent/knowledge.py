@@ -12,11 +12,13 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Union
 import hashlib
 import time
+import copy
 
 from .interfaces import KnowledgeAgentInterface
 from ..core.message_bus import MessageBus
 from ..core.state import WorkflowState
 from ..storage.knowledge_base import KnowledgeBase
+from ..storage.knowledge_result_cache import KnowledgeResultCache
 from ..llm.service import LLMService, LLMProvider
 
 logger = logging.getLogger(__name__)
@@ -49,6 +51,13 @@ class KnowledgeAgent(KnowledgeAgentInterface):
         # Cache for parsed documentation
         self.parsed_docs_cache = {}
         
+        # Persistent cache for enhanced knowledge, shared by hosts in a rollout
+        self.knowledge_cache = KnowledgeResultCache(
+            cache_dir=self.config.get("knowledge_cache_dir"),
+            ttl=self.config.get("knowledge_cache_ttl", 86400),
+            enabled=self.config.get("knowledge_cache_enabled", True)
+        )
+        
         # Register message handlers
         self.register_handler("retrieve_knowledge", self._handle_retrieve_knowledge)
         self.register_handler("query_knowledge", self._handle_query_knowledge)
@@ -339,23 +348,49 @@ class KnowledgeAgent(KnowledgeAgentInterface):
                 action=state.action
             )
             
-            # 2. Check if we need to generate documentation with LLM
-            if not docs or not docs.get("definition"):
-                logger.info(f"No documentation found for {state.integration_type}/{state.target_name}. Generating with LLM.")
-                llm_docs = await self._generate_documentation_with_llm(state)
-                docs = {**docs, **llm_docs} if docs else llm_docs
+            # Identical integration/action/platform/parameter requests reuse earlier LLM results
+            docs_fingerprint = self.knowledge_cache.fingerprint_documents(docs)
+            cache_key = self.knowledge_cache.make_key(
+                integration_type=state.integration_type,
+                target_name=state.target_name,
+                action=state.action,
+                platform_family=self.knowledge_cache.platform_family(state.system_context),
+                parameters=state.parameters
+            )
+            cached = self.knowledge_cache.get(cache_key, docs_fingerprint)
             
-            # 3. Enhance documentation with LLM analysis
-            enhanced_docs = await self._enhance_documentation_with_llm(docs, state)
+            if cached:
+                logger.info(f"[KnowledgeAgent] Using cached enhanced knowledge for {state.integration_type}/{state.target_name}")
+                docs = cached.get("docs") or docs
+                enhanced_docs = cached["enhanced_docs"]
+                knowledge_reasoning = cached["knowledge_reasoning"]
+            else:
+                # Enhancement mutates the definition in place; keep knowledge base copies pristine
+                docs = copy.deepcopy(docs) if docs else docs
+                
+                # 2. Check if we need to generate documentation with LLM
+                if not docs or not docs.get("definition"):
+                    logger.info(f"No documentation found for {state.integration_type}/{state.target_name}. Generating with LLM.")
+                    llm_docs = await self._generate_documentation_with_llm(state)
+                    docs = {**docs, **llm_docs} if docs else llm_docs
+                
+                # 3. Enhance documentation with LLM analysis
+                enhanced_docs = await self._enhance_documentation_with_llm(docs, state)
+                
+                # 4. Generate reasoning about knowledge for the coordinator
+                knowledge_reasoning = await self._generate_knowledge_reasoning(state, enhanced_docs)
+                
+                self.knowledge_cache.set(cache_key, docs_fingerprint, {
+                    "docs": docs,
+                    "enhanced_docs": enhanced_docs,
+                    "knowledge_reasoning": knowledge_reasoning
+                })
             
-            # 4. Update state with enhanced documentation
+            # 5. Update state with enhanced documentation and reasoning
             state_dict = state.model_dump()
             state_dict["template_data"] = enhanced_docs.get("definition", {})
             state_dict["parameter_schema"] = enhanced_docs.get("parameters", {})
             state_dict["verification_data"] = enhanced_docs.get("verification", {})
-            
-            # 5. Add reasoning about knowledge for the coordinator
-            knowledge_reasoning = await self._generate_knowledge_reasoning(state, enhanced_docs)
             state_dict["knowledge_reasoning"] = knowledge_reasoning
             
             state = WorkflowState(**state_dict)
@@ -13,6 +13,7 @@ from pathlib import Path
 
 from ..config.configuration import WorkflowConfiguration, DANGEROUS_PATTERNS
 from ..error.exceptions import ValidationError
+from ..utils.capabilities import get_capability_registry
 
 logger = logging.getLogger(__name__)
 
@@ -31,30 +32,21 @@ class ScriptValidator:
         
     def _initialize_analyzers(self) -> None:
         """Initialize and verify availability of static analysis tools."""
+        tools = {"shell": "shellcheck", "powershell": "powershell", "python": "pylint"}
+        available = get_capability_registry().check_many(
+            f"command:{tool}" for name, tool in tools.items() if name != "powershell" or os.name == "nt"
+        )
         self.available_analyzers = {
-            "shell": self._check_tool_available("shellcheck"),
-            "powershell": self._check_tool_available("powershell"),
-            "python": self._check_tool_available("pylint")
+            name: available.get(f"command:{tool}", False) for name, tool in tools.items()
         }
         
         logger.info(f"Available static analyzers: {', '.join([k for k, v in self.available_analyzers.items() if v])}")
         
     def _check_tool_available(self, tool_name: str) -> bool:
         """Check if a tool is available in the PATH."""
-        try:
-            if tool_name == "powershell" and os.name != "nt":
-                return False
-                
-            cmd = "where" if os.name == "nt" else "which"
-            result = subprocess.run(
-                [cmd, tool_name], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                check=False
-            )
-            return result.returncode == 0
-        except Exception:
+        if tool_name == "powershell" and os.name != "nt":
             return False
+        return get_capability_registry().has_command(tool_name)
         
     def validate(self, script_content: str) -> Dict[str, Any]:
         """
@@ -4,10 +4,12 @@ Storage and knowledge management components with enhanced caching and retrieval.
 
 from .knowledge_base import KnowledgeBase
 from .knowledge_cache import EnhancedKnowledgeBase, KnowledgeCache, LRUCache
+from .knowledge_result_cache import KnowledgeResultCache
 
 __all__ = [
     'KnowledgeBase',
     'EnhancedKnowledgeBase',
     'KnowledgeCache',
     'LRUCache',
+    'KnowledgeResultCache',
 ]
@@ -0,0 +1,236 @@
+"""
+SQLite-backed record store for knowledge documents and learning data.
+
+Each record is stored as its own row, so updating one entry is a single
+transactional upsert instead of a rewrite of a monolithic JSON file. Records
+may carry the integration type they belong to, which is indexed so one
+integration's records are found by equality rather than by key prefix.
+"""
+import logging
+import json
+import asyncio
+import sqlite3
+import time
+import os
+from typing import Any, Optional, List, Tuple
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+class DocumentStore:
+    """
+    Namespaced key/value record store with per-record atomic writes.
+    """
+
+    def __init__(self, db_path: str, namespace: str, legacy_json_path: Optional[str] = None):
+        """
+        Initialize the document store.
+
+        Args:
+            db_path: Path of the SQLite database file
+            namespace: Namespace separating record sets sharing a database
+            legacy_json_path: Monolithic JSON file imported once when the namespace is empty
+        """
+        self.db_path = db_path
+        self.namespace = namespace
+        self.legacy_json_path = legacy_json_path
+        self.connection = None
+        self._lock = asyncio.Lock()
+        self._initialized = False
+
+    async def initialize(self) -> None:
+        """Create the schema and import legacy JSON data if needed."""
+        if self._initialized:
+            return
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        async with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    integration_type TEXT,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if "integration_type" not in columns:
+                conn.execute("ALTER TABLE records ADD COLUMN integration_type TEXT")
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_records_integration_type
+                ON records (namespace, integration_type)
+            """)
+            conn.commit()
+        self._initialized = True
+        await self._import_legacy_json()
+
+    @asynccontextmanager
+    async def _get_connection(self):
+        async with self._lock:
+            if not self.connection:
+                self.connection = sqlite3.connect(self.db_path)
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            yield self.connection
+
+    async def _import_legacy_json(self) -> None:
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return
+        if await self.count() > 0:
+            return
+        try:
+            with open(self.legacy_json_path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading legacy data from {self.legacy_json_path}: {e}")
+            return
+        if isinstance(data, dict) and data:
+            await self.put_many(data.items())
+            logger.info(f"Imported {len(data)} records from {self.legacy_json_path} into '{self.namespace}'")
+
+    async def cleanup(self) -> None:
+        async with self._lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+        self._initialized = False
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Load a single record.
+
+        Args:
+            key: Record key
+
+        Returns:
+            Decoded record value or None if not found
+        """
+        await self.initialize()
+        async with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM records WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def put(self, key: str, value: Any, integration_type: Optional[str] = None) -> None:
+        """
+        Insert or replace a single record atomically.
+
+        Args:
+            key: Record key
+            value: JSON-serializable record value
+            integration_type: Integration type the record belongs to
+        """
+        await self.put_many([(key, value)], integration_type)
+
+    async def put_many(self, items, integration_type: Optional[str] = None) -> int:
+        """
+        Insert or replace several records in one transaction.
+
+        Args:
+            items: Iterable of (key, value) pairs
+            integration_type: Integration type all records belong to
+
+        Returns:
+            Number of records written
+        """
+        await self.initialize()
+        now = time.time()
+        rows = [
+            (self.namespace, key, json.dumps(value, default=str), now, integration_type)
+            for key, value in items
+        ]
+        if not rows:
+            return 0
+        async with self._get_connection() as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (namespace, key, value, updated_at, integration_type) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete a single record.
+
+        Args:
+            key: Record key
+
+        Returns:
+            True if a record was deleted
+        """
+        await self.initialize()
+        async with self._get_connection() as conn:
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM records WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+        return cursor.rowcount > 0
+
+    async def keys(self, prefix: Optional[str] = None, integration_type: Optional[str] = None) -> List[str]:
+        """
+        List record keys without loading their values.
+
+        Args:
+            prefix: Optional key prefix to filter by
+            integration_type: Optional integration type to filter by
+
+        Returns:
+            Sorted list of keys
+        """
+        await self.initialize()
+        query, params = self._filter_query("SELECT key FROM records", prefix, integration_type)
+        async with self._get_connection() as conn:
+            return [row[0] for row in conn.execute(query, params).fetchall()]
+
+    async def items(self,
+                    prefix: Optional[str] = None,
+                    integration_type: Optional[str] = None,
+                    untyped: bool = False) -> List[Tuple[str, Any]]:
+        """
+        Load records, optionally restricted to a key prefix or an integration type.
+
+        Args:
+            prefix: Optional key prefix to filter by
+            integration_type: Optional integration type to filter by
+            untyped: Only load records stored without an integration type
+
+        Returns:
+            List of (key, value) pairs sorted by key
+        """
+        await self.initialize()
+        query, params = self._filter_query("SELECT key, value FROM records", prefix, integration_type, untyped)
+        async with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    async def count(self) -> int:
+        """Return the number of records in the namespace."""
+        await self.initialize()
+        async with self._get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM records WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def _filter_query(self,
+                      select: str,
+                      prefix: Optional[str],
+                      integration_type: Optional[str],
+                      untyped: bool = False) -> Tuple[str, tuple]:
+        conditions, params = ["namespace = ?"], [self.namespace]
+        if integration_type is not None:
+            conditions.append("integration_type = ?")
+            params.append(integration_type)
+        elif untyped:
+            conditions.append("integration_type IS NULL")
+        if prefix:
+            # Range scan on the primary key instead of LIKE, which treats "_" as a wildcard
+            conditions.append("key >= ? AND key < ?")
+            params.extend([prefix, prefix + "\uffff"])
+        return f"{select} WHERE {' AND '.join(conditions)} ORDER BY key", tuple(params)
@@ -4,15 +4,17 @@ import asyncio
 import sqlite3
 import time
 import os
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DB_PATH = "workflow_history.db"
+
 class ExecutionHistoryManager:
     def __init__(self, db_path: Optional[str] = None):
-        self.db_path = db_path or "workflow_history.db"
+        self.db_path = db_path or DEFAULT_DB_PATH
         self.connection = None
         self._lock = asyncio.Lock()
 
@@ -38,9 +40,13 @@ class ExecutionHistoryManager:
                     parameters TEXT,
                     transaction_id TEXT,
                     user_id TEXT,
-                    timestamp INTEGER NOT NULL
+                    timestamp INTEGER NOT NULL,
+                    integration_type TEXT
                 )
             """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(execution_history)")}
+            if "integration_type" not in columns:
+                conn.execute("ALTER TABLE execution_history ADD COLUMN integration_type TEXT")
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_execution_history_target_action
                 ON execution_history (target_name, action)
@@ -75,7 +81,8 @@ class ExecutionHistoryManager:
         output: Optional[Union[str, Dict[str, Any]]] = None,
         parameters: Optional[Dict[str, Any]] = None,
         transaction_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        integration_type: Optional[str] = None
     ) -> int:
         if isinstance(output, dict):
             output = json.dumps(output)
@@ -87,8 +94,8 @@ class ExecutionHistoryManager:
             cursor.execute("""
                 INSERT INTO execution_history
                 (target_name, action, success, execution_time, error_message, script, output,
-                 parameters, transaction_id, user_id, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 parameters, transaction_id, user_id, timestamp, integration_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 target_name,
                 action,
@@ -100,11 +107,32 @@ class ExecutionHistoryManager:
                 parameters,
                 transaction_id,
                 user_id,
-                timestamp
+                timestamp,
+                integration_type
             ))
             conn.commit()
             return cursor.lastrowid
 
+    async def recent_integrations(self, limit: int = 200) -> List[str]:
+        """
+        Get the integration types of the most recent executions.
+
+        Args:
+            limit: Maximum number of executions to return
+
+        Returns:
+            Integration types, oldest first; executions recorded without one are skipped
+        """
+        async with self._get_connection() as conn:
+            rows = conn.execute("""
+                SELECT integration_type
+                FROM execution_history
+                WHERE integration_type IS NOT NULL
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        return [row["integration_type"] for row in reversed(rows)]
+
     async def auto_prune_history(self, days: int) -> int:
         if days <= 0:
             return 0
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional, Union
 import asyncio
 from pathlib import Path
 
+from .history import ExecutionHistoryManager
 from .knowledge_cache import EnhancedKnowledgeBase
 
 logger = logging.getLogger(__name__)
@@ -18,24 +19,49 @@ class KnowledgeBase:
     """
     Knowledge base with enhanced caching, search, and real-time updates.
     Provides backward compatibility with older code while adding enhanced features.
+    Integrations are loaded on first request and held in a memory-bounded cache.
     """
     
-    def __init__(self, storage_dir: Optional[str] = None, cache_enabled: bool = True):
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        cache_enabled: bool = True,
+        max_cache_bytes: Optional[int] = 64 * 1024 * 1024,
+        prefetch_count: int = 2,
+        recent_integrations: Optional[List[str]] = None,
+        history: Optional[ExecutionHistoryManager] = None
+    ):
         """
         Initialize knowledge base.
         
         Args:
             storage_dir: Directory for knowledge storage
             cache_enabled: Whether to enable caching
-        """
-        self.enhanced_kb = EnhancedKnowledgeBase(storage_dir, cache_enabled)
+            max_cache_bytes: Memory budget for cached knowledge in bytes
+            prefetch_count: Number of likely-next integrations to prefetch in the background
+            recent_integrations: Integration types from recent workflows, oldest first
+            history: Execution history to read recent integrations from when none are given
+        """
+        self.enhanced_kb = EnhancedKnowledgeBase(
+            storage_dir,
+            cache_enabled,
+            max_cache_bytes=max_cache_bytes,
+            prefetch_count=prefetch_count,
+            recent_integrations=recent_integrations,
+            history=history
+        )
         self._initialized = False
         
     async def initialize(self) -> None:
-        """Initialize the knowledge base."""
+        """Initialize the knowledge base. No integration knowledge is loaded until requested."""
         if not self._initialized:
             await self.enhanced_kb.initialize()
             self._initialized = True
+            
+    async def cleanup(self) -> None:
+        """Cancel background prefetches and release storage."""
+        await self.enhanced_kb.cleanup()
+        self._initialized = False
         
     async def retrieve_documents(self, 
                                 integration_type: str, 
@@ -134,13 +160,9 @@ class KnowledgeBase:
         if not self._initialized:
             await self.initialize()
             
-        # Try to get from cache
-        knowledge = await self.enhanced_kb.cache.get_integration_knowledge(integration_type)
-        if knowledge:
-            return knowledge
-            
-        # Retrieve from storage
-        return await self.retrieve_documents(integration_type)
+        # Loads the integration into the cache on first use
+        docs = await self.retrieve_documents(integration_type)
+        return docs or None
         
     async def preload_integration(self, integration_type: str) -> bool:
         """
@@ -155,19 +177,21 @@ class KnowledgeBase:
         if not self._initialized:
             await self.initialize()
             
-        # Retrieve documents
-        docs = await self.retrieve_documents(integration_type)
+        records = await self.enhanced_kb.load_integration(integration_type)
+        return bool(records) and self.enhanced_kb.cache is not None
         
-        # Preload into cache
-        if docs and self.enhanced_kb.cache:
-            await self.enhanced_kb.cache.preload_knowledge(integration_type, docs)
-            return True
-            
-        return False
+    def get_memory_usage(self) -> Dict[str, int]:
+        """
+        Get the approximate memory used by each loaded integration.
+        
+        Returns:
+            Mapping of integration type to cached size in bytes
+        """
+        return self.enhanced_kb.memory_usage()
         
     async def clear_cache(self) -> None:
         """Clear all caches."""
-        if self._initialized and self.enhanced_kb.cache:
+        if self.enhanced_kb.cache:
             await self.enhanced_kb.cache.clear()
             
     async def invalidate_cache_for_integration(self, integration_type: str) -> None:
@@ -177,7 +201,7 @@ class KnowledgeBase:
         Args:
             integration_type: Integration type
         """
-        if self._initialized and self.enhanced_kb.cache:
+        if self.enhanced_kb.cache:
             await self.enhanced_kb.cache.invalidate_for_integration(integration_type)
             
     async def get_all_integration_types(self) -> List[str]:
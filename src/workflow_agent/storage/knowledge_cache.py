@@ -0,0 +1,445 @@
+"""
+Knowledge caching and retrieval backed by the per-record document store.
+"""
+import logging
+import os
+import copy
+import json
+import time
+import asyncio
+from collections import OrderedDict, Counter, deque
+from typing import Dict, Any, List, Optional, Iterable, Set
+
+from .document_store import DocumentStore
+from .history import DEFAULT_DB_PATH as DEFAULT_HISTORY_DB_PATH, ExecutionHistoryManager
+
+logger = logging.getLogger(__name__)
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a JSON-like value in bytes.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Size of the value's JSON encoding in bytes
+    """
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+class LRUCache:
+    """
+    Least-recently-used cache with time-based expiry and an optional byte budget.
+    """
+
+    def __init__(self, max_size: int = 100, ttl: Optional[int] = 3600, max_bytes: Optional[int] = None):
+        """
+        Initialize LRU cache.
+
+        Args:
+            max_size: Maximum number of entries in cache
+            ttl: Time to live in seconds for cache entries (None disables expiry)
+            max_bytes: Maximum total size of cached values in bytes (None disables the limit)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value by key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found/expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at, _ = entry
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        """
+        Add a value to the cache, evicting least recently used entries over budget.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Size of the value in bytes (estimated if omitted)
+        """
+        self.delete(key)
+        size = estimate_size(value) if size is None else size
+        self._entries[key] = (value, time.time(), size)
+        self.total_bytes += size
+        while len(self._entries) > self.max_size or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            evicted_key, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            logger.debug(f"Evicted '{evicted_key}' ({evicted_size} bytes) from cache")
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def sizes(self) -> Dict[str, int]:
+        """Return the size in bytes of every cached entry."""
+        return {key: entry[2] for key, entry in self._entries.items()}
+
+    def keys(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class KnowledgeCache:
+    """
+    Memory-bounded cache holding the stored records of each loaded integration.
+    """
+
+    def __init__(self, max_integrations: int = 100, ttl: Optional[int] = 3600, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        """
+        Initialize knowledge cache.
+
+        Args:
+            max_integrations: Maximum number of integrations held in memory
+            ttl: Time to live in seconds for cache entries
+            max_bytes: Memory budget for cached knowledge in bytes
+        """
+        self.integrations = LRUCache(max_integrations, ttl, max_bytes)
+
+    async def get_integration_knowledge(self, integration_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached records for an integration type.
+
+        Args:
+            integration_type: Integration type
+
+        Returns:
+            Records keyed by "<target>_<doc_type>" or None if not loaded
+        """
+        return self.integrations.get(integration_type)
+
+    async def preload_knowledge(self, integration_type: str, knowledge: Dict[str, Any]) -> None:
+        """
+        Store the records of an integration type.
+
+        Args:
+            integration_type: Integration type
+            knowledge: Records keyed by "<target>_<doc_type>"
+        """
+        self.integrations.set(integration_type, knowledge)
+
+    async def invalidate_for_integration(self, integration_type: str) -> None:
+        """
+        Drop the cached records of an integration type.
+
+        Args:
+            integration_type: Integration type
+        """
+        self.integrations.delete(integration_type)
+
+    def is_loaded(self, integration_type: str) -> bool:
+        return integration_type in self.integrations
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Return the approximate memory used per loaded integration in bytes."""
+        return self.integrations.sizes()
+
+    async def clear(self) -> None:
+        self.integrations.clear()
+
+class EnhancedKnowledgeBase:
+    """
+    Knowledge base storing one record per document, loading integrations on demand.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        cache_enabled: bool = True,
+        max_cache_bytes: Optional[int] = 64 * 1024 * 1024,
+        prefetch_count: int = 2,
+        recent_integrations: Optional[Iterable[str]] = None,
+        history: Optional[ExecutionHistoryManager] = None
+    ):
+        """
+        Initialize enhanced knowledge base.
+
+        Args:
+            storage_dir: Directory for knowledge storage
+            cache_enabled: Whether to enable caching
+            max_cache_bytes: Memory budget for cached knowledge in bytes
+            prefetch_count: Number of likely-next integrations to prefetch after each request
+            recent_integrations: Recently used integration types, oldest first, to seed prefetching
+            history: Execution history seeding prefetching when recent_integrations is not
+                given (defaults to the history database in the working directory, if any)
+        """
+        self.storage_dir = storage_dir or os.path.join(os.path.dirname(__file__), "knowledge")
+        self.store = DocumentStore(
+            db_path=os.path.join(self.storage_dir, "knowledge.db"),
+            namespace="documents",
+            legacy_json_path=os.path.join(self.storage_dir, "documents.json")
+        )
+        self.cache = KnowledgeCache(max_bytes=max_cache_bytes) if cache_enabled else None
+        self.prefetch_count = prefetch_count
+        self.history = history
+        self._history = deque(recent_integrations or [], maxlen=200)
+        self._prefetch_tasks: Set[asyncio.Task] = set()
+
+    async def initialize(self) -> None:
+        """Open the underlying document store and seed prefetching without loading any integration."""
+        await self.store.initialize()
+        if not self._history:
+            await self._seed_history()
+
+    async def _seed_history(self) -> None:
+        """Seed the access history from the integrations of recent executions."""
+        history = self.history
+        if history is None:
+            if not os.path.exists(DEFAULT_HISTORY_DB_PATH):
+                return
+            history = ExecutionHistoryManager(DEFAULT_HISTORY_DB_PATH)
+        try:
+            await history.initialize()
+            self._history.extend(await history.recent_integrations(self._history.maxlen))
+            logger.debug(f"Seeded prefetching with {len(self._history)} recent integrations")
+        except Exception as e:
+            logger.warning(f"Failed to read execution history for prefetching: {e}")
+        finally:
+            if history is not self.history:
+                await history.cleanup()
+
+    async def cleanup(self) -> None:
+        """Cancel pending prefetches and close the document store."""
+        for task in list(self._prefetch_tasks):
+            task.cancel()
+        if self._prefetch_tasks:
+            await asyncio.gather(*self._prefetch_tasks, return_exceptions=True)
+        await self.store.cleanup()
+
+    @staticmethod
+    def _document_key(integration_type: str, target_name: str, doc_type: str) -> str:
+        return f"{integration_type}_{target_name}_{doc_type}"
+
+    async def load_integration(self, integration_type: str) -> Dict[str, Any]:
+        """
+        Load all records of an integration type, from cache when available.
+
+        Args:
+            integration_type: Integration type
+
+        Returns:
+            Records keyed by "<target>_<doc_type>"
+        """
+        if self.cache:
+            cached = await self.cache.get_integration_knowledge(integration_type)
+            if cached is not None:
+                return cached
+
+        prefix = f"{integration_type}_"
+        rows = await self.store.items(integration_type=integration_type)
+        # Records imported from the legacy JSON file carry no integration type
+        rows += await self.store.items(prefix, untyped=True)
+        records = {key[len(prefix):]: value for key, value in rows}
+
+        if self.cache:
+            await self.cache.preload_knowledge(integration_type, records)
+        logger.debug(f"Loaded {len(records)} knowledge records for {integration_type}")
+        return records
+
+    def record_access(self, integration_type: str) -> None:
+        """
+        Record that an integration was requested and prefetch likely successors.
+
+        Args:
+            integration_type: Integration type
+        """
+        self._history.append(integration_type)
+        if not self.cache or self.prefetch_count <= 0:
+            return
+
+        candidates = [
+            candidate for candidate in self.predict_next(integration_type)
+            if not self.cache.is_loaded(candidate)
+        ][:self.prefetch_count]
+        if not candidates:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._prefetch(candidates))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    def predict_next(self, integration_type: str) -> List[str]:
+        """
+        Predict the integrations most likely to be requested after one, based on history.
+
+        Args:
+            integration_type: Integration type just requested
+
+        Returns:
+            Integration types ordered by how often they followed it
+        """
+        history = list(self._history)
+        successors = Counter(
+            history[i + 1] for i in range(len(history) - 1)
+            if history[i] == integration_type and history[i + 1] != integration_type
+        )
+        return [candidate for candidate, _ in successors.most_common()]
+
+    async def _prefetch(self, integration_types: List[str]) -> None:
+        for integration_type in integration_types:
+            try:
+                await self.load_integration(integration_type)
+            except Exception as e:
+                logger.debug(f"Prefetch of {integration_type} failed: {e}")
+
+    async def retrieve_documents(self,
+                                 integration_type: str,
+                                 target_name: Optional[str] = None,
+                                 action: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retrieve documents for an integration, keyed by document type.
+
+        Args:
+            integration_type: Integration type
+            target_name: Optional target name (defaults to the integration type)
+            action: Optional action (documents are not filtered by action)
+
+        Returns:
+            Dictionary of documents
+        """
+        records = await self.load_integration(integration_type)
+        self.record_access(integration_type)
+
+        prefix = f"{target_name or integration_type}_"
+        return {
+            key[len(prefix):]: copy.deepcopy(value)
+            for key, value in records.items() if key.startswith(prefix)
+        }
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Return the approximate memory used per loaded integration in bytes."""
+        return self.cache.memory_usage() if self.cache else {}
+
+    async def add_document(self,
+                           integration_type: str,
+                           target_name: str,
+                           doc_type: str,
+                           content: Dict[str, Any],
+                           source: Optional[str] = None) -> bool:
+        """
+        Add or replace a single document.
+
+        Args:
+            integration_type: Integration type
+            target_name: Target name
+            doc_type: Document type (definition, installation, etc.)
+            content: Document content
+            source: Optional source information
+
+        Returns:
+            True if document was added
+        """
+        try:
+            await self.store.put(self._document_key(integration_type, target_name, doc_type), content, integration_type)
+        except Exception as e:
+            logger.error(f"Error adding document {integration_type}/{target_name}/{doc_type}: {e}")
+            return False
+        if self.cache:
+            await self.cache.invalidate_for_integration(integration_type)
+        if source:
+            logger.debug(f"Added {doc_type} document for {integration_type}/{target_name} from {source}")
+        return True
+
+    async def update_knowledge(self,
+                               integration_type: str,
+                               knowledge_update: Dict[str, Any],
+                               source: Optional[str] = None) -> bool:
+        """
+        Update knowledge for an integration type, one record per document type.
+
+        Args:
+            integration_type: Integration type
+            knowledge_update: Mapping of document type to content
+            source: Optional source information
+
+        Returns:
+            True if update was successful
+        """
+        try:
+            await self.store.put_many(
+                (
+                    (self._document_key(integration_type, integration_type, doc_type), content)
+                    for doc_type, content in knowledge_update.items()
+                ),
+                integration_type
+            )
+        except Exception as e:
+            logger.error(f"Error updating knowledge for {integration_type}: {e}")
+            return False
+        if self.cache:
+            await self.cache.invalidate_for_integration(integration_type)
+        return True
+
+    async def retrieve_knowledge(self,
+                                 query: str,
+                                 context: Optional[Dict[str, Any]] = None,
+                                 max_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search stored documents for query terms.
+
+        Args:
+            query: Search query
+            context: Optional context; an integration_type narrows the search
+            max_results: Maximum number of results
+
+        Returns:
+            List of matching documents ordered by relevance
+        """
+        terms = [term for term in query.lower().split() if term]
+        if not terms:
+            return []
+
+        integration_type = (context or {}).get("integration_type")
+        if integration_type:
+            records = [
+                (f"{integration_type}_{key}", value)
+                for key, value in (await self.load_integration(integration_type)).items()
+            ]
+        else:
+            records = await self.store.items()
+
+        results = []
+        for key, value in records:
+            text = str(value).lower()
+            score = sum(text.count(term) for term in terms)
+            if score:
+                results.append({"key": key, "content": copy.deepcopy(value), "score": score})
+
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return results[:max_results]
@@ -0,0 +1,223 @@
+"""
+Persistent cache for LLM-enhanced knowledge results.
+
+Entries are keyed by integration, action, target, platform family and parameters
+and carry a fingerprint of the documentation they were derived from, so a change
+in the underlying docs invalidates the entry on the next lookup.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Package managers that determine the shape of install/remove instructions
+_PACKAGE_MANAGER_FAMILIES = ["apt", "yum", "dnf", "zypper", "apk", "brew", "choco", "winget"]
+
+class KnowledgeResultCache:
+    """
+    Two-level (memory + disk) cache for enhanced knowledge results.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = 86400, enabled: bool = True):
+        """
+        Initialize the knowledge result cache.
+
+        Args:
+            cache_dir: Directory where cache entries are persisted
+            ttl: Time to live in seconds for cache entries (None disables expiry)
+            enabled: Whether caching is enabled
+        """
+        self.cache_dir = Path(cache_dir or os.path.join("cache", "knowledge"))
+        self.ttl = ttl
+        self.enabled = enabled
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint_documents(docs: Optional[Dict[str, Any]]) -> str:
+        """
+        Compute a stable fingerprint of documentation content.
+
+        Args:
+            docs: Documentation dictionary
+
+        Returns:
+            Hex digest identifying the documentation content
+        """
+        serialized = json.dumps(docs or {}, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def platform_family(system_context: Optional[Dict[str, Any]]) -> str:
+        """
+        Reduce a system context to the platform family that affects generated knowledge.
+
+        Args:
+            system_context: System context from the workflow state
+
+        Returns:
+            Platform family string such as "windows", "linux-apt" or "darwin-brew"
+        """
+        context = system_context or {}
+        if context.get("is_windows", False):
+            return "windows"
+
+        platform_info = context.get("platform")
+        if isinstance(platform_info, dict):
+            system = platform_info.get("system") or context.get("os") or "unknown"
+        else:
+            system = context.get("os") or "unknown"
+        family = str(system).lower()
+
+        package_managers = context.get("package_managers") or {}
+        for manager in _PACKAGE_MANAGER_FAMILIES:
+            if package_managers.get(manager):
+                return f"{family}-{manager}"
+        return family
+
+    def make_key(
+        self,
+        integration_type: str,
+        target_name: str,
+        action: str,
+        platform_family: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build a cache key for an enhanced knowledge result.
+
+        Parameter values are embedded in the LLM prompts, so they are part of the
+        key: a result is only reused for the same values, never handed to a host
+        that provided different ones. Only a digest of them is stored.
+
+        Args:
+            integration_type: Integration type
+            target_name: Target name
+            action: Workflow action
+            platform_family: Platform family from platform_family()
+            parameters: Parameters provided to the workflow
+
+        Returns:
+            Cache key
+        """
+        parts = [
+            integration_type or "",
+            target_name or "",
+            (action or "").lower(),
+            platform_family or "",
+            json.dumps(parameters or {}, sort_keys=True, default=str)
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _is_valid(self, entry: Dict[str, Any], docs_fingerprint: str) -> bool:
+        if entry.get("docs_fingerprint") != docs_fingerprint:
+            return False
+        if self.ttl is not None and time.time() - entry.get("created_at", 0) > self.ttl:
+            return False
+        return True
+
+    def get(self, key: str, docs_fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result if it was derived from the same documentation.
+
+        Args:
+            key: Cache key from make_key()
+            docs_fingerprint: Fingerprint of the current documentation
+
+        Returns:
+            Copy of the cached value or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._memory.get(key)
+        if entry is None:
+            path = self._entry_path(key)
+            if path.exists():
+                try:
+                    with open(path, "r") as f:
+                        entry = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Error reading knowledge cache entry {path}: {e}")
+                    entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if not self._is_valid(entry, docs_fingerprint):
+            # Documentation changed or entry expired
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self._memory[key] = entry
+        self.hits += 1
+        return copy.deepcopy(entry["value"])
+
+    def set(self, key: str, docs_fingerprint: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in the cache.
+
+        Args:
+            key: Cache key from make_key()
+            docs_fingerprint: Fingerprint of the documentation the value was derived from
+            value: JSON-serializable value to store
+        """
+        if not self.enabled:
+            return
+
+        entry = {
+            "docs_fingerprint": docs_fingerprint,
+            "created_at": time.time(),
+            "value": copy.deepcopy(value)
+        }
+        self._memory[key] = entry
+
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_dir), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception as e:
+            logger.warning(f"Error persisting knowledge cache entry {key}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Invalidate one cache entry or the whole cache.
+
+        Args:
+            key: Cache key to invalidate, or None to clear everything
+        """
+        if key is not None:
+            self._memory.pop(key, None)
+            paths = [self._entry_path(key)]
+        else:
+            self._memory.clear()
+            paths = list(self.cache_dir.glob("*.json")) if self.cache_dir.exists() else []
+
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Error removing knowledge cache entry {path}: {e}")
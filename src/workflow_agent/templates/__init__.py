@@ -5,10 +5,12 @@ Improved template system with inheritance, caching, and conditional rendering.
 from .manager import TemplateManager, TemplateCache
 from .validator import TemplateValidator
 from .conditional import ConditionalTemplateRenderer
+from .batch import BatchRenderResult
 
 __all__ = [
     'TemplateManager',
     'TemplateCache',
     'TemplateValidator',
     'ConditionalTemplateRenderer',
+    'BatchRenderResult',
 ]
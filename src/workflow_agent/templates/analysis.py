@@ -0,0 +1,210 @@
+"""
+Shared template analysis: one parse per template source, reused by all validators.
+"""
+import logging
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, List, Mapping, Optional, Tuple
+
+import yaml
+from jinja2 import Environment, TemplateSyntaxError, meta, nodes
+
+from .compiled_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+DANGEROUS_PATTERNS = [
+    r'rm\s+-rf\s+[/~]',               # Dangerous rm commands
+    r'sudo\s+rm',                      # sudo rm commands
+    r'chmod\s+777',                    # chmod 777 (too permissive)
+    r'find\s+.*\s+-delete',            # find with delete
+    r'dd\s+.*\s+of=/dev/',             # dd to devices
+    r';\s*rm\s',                       # rm after semicolon
+    r'mkfs',                           # filesystem formatting
+    r'wget.*\|\s*sh',                  # piping wget to shell
+    r'curl.*\|\s*sh',                  # piping curl to shell
+    r'eval.*\$\(',                     # eval of command substitution
+    r'>\s*/etc/passwd',                # overwriting passwd
+    r'>\s*/etc/shadow',                # overwriting shadow
+    r'mv\s+.*\s+/etc/',                # moving to /etc
+    r'\|\s*xargs\s+rm',                # piping to xargs rm
+]
+
+_META_RE = re.compile(r'{#\s*META\s*(.*?)\s*#}', re.DOTALL)
+_EVAL_RE = re.compile(r'eval\s*\(')
+_EXEC_RE = re.compile(r'exec\s*\(')
+_PARAMS_USE_RE = re.compile(r'\{\{\s*params\..*\s*\}\}')
+_PARAMS_CHECK_RE = re.compile(r'if\s+params\.')
+
+@dataclass
+class TemplateAnalysis:
+    """
+    Everything validators and the template registry need to know about a template source.
+
+    Analyses are cached and shared, so collections are immutable; callers copy
+    what they want to modify. meta is a read-only view whose nested values must
+    be deep-copied before use.
+    """
+    content_hash: str
+    ast: Optional[nodes.Template] = None
+    syntax_error: Optional[TemplateSyntaxError] = None
+    undeclared_variables: FrozenSet[str] = frozenset()
+    referenced_templates: Tuple[Optional[str], ...] = ()
+    extends: Optional[str] = None
+    blocks: Tuple[str, ...] = ()
+    meta: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    meta_error: Optional[str] = None
+    security_findings: Tuple[Dict[str, Any], ...] = ()
+
+    @property
+    def valid(self) -> bool:
+        return self.syntax_error is None
+
+    def raise_syntax_error(self) -> None:
+        """Raise a new copy of the syntax error, if any; re-raising the cached one would grow its traceback."""
+        e = self.syntax_error
+        if e is not None:
+            raise TemplateSyntaxError(e.message, e.lineno, e.name, e.filename)
+
+class TemplateAnalyzer:
+    """
+    Parses template sources once per environment and caches the analysis by content hash.
+    """
+
+    def __init__(self, env: Environment, max_size: int = 512, dangerous_patterns: Optional[List[str]] = None):
+        """
+        Initialize the analyzer.
+
+        Args:
+            env: Environment used to parse templates
+            max_size: Maximum number of analyses kept in memory
+            dangerous_patterns: Regex patterns reported as security findings
+        """
+        self.env = env
+        self.max_size = max_size
+        self.dangerous_patterns = dangerous_patterns or DANGEROUS_PATTERNS
+        self._compiled_patterns = [
+            (pattern, re.compile(pattern, re.IGNORECASE | re.MULTILINE)) for pattern in self.dangerous_patterns
+        ]
+        self.parses = 0
+        self._analyses: "OrderedDict[str, TemplateAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, source: str) -> TemplateAnalysis:
+        """
+        Get the analysis of a template source, parsing it at most once.
+
+        Args:
+            source: Template source
+
+        Returns:
+            Template analysis
+        """
+        key = content_hash(source)
+        with self._lock:
+            analysis = self._analyses.get(key)
+            if analysis is not None:
+                self._analyses.move_to_end(key)
+                return analysis
+
+        analysis = self._analyze(key, source)
+
+        with self._lock:
+            self._analyses[key] = analysis
+            while len(self._analyses) > self.max_size:
+                self._analyses.popitem(last=False)
+        return analysis
+
+    def _analyze(self, key: str, source: str) -> TemplateAnalysis:
+        analysis = TemplateAnalysis(content_hash=key)
+        self.parses += 1
+        try:
+            analysis.ast = self.env.parse(source)
+        except TemplateSyntaxError as e:
+            # Cached for the life of the analysis; the parser frames are not needed
+            analysis.syntax_error = e.with_traceback(None)
+
+        if analysis.ast is not None:
+            ast = analysis.ast
+            analysis.undeclared_variables = frozenset(meta.find_undeclared_variables(ast))
+            analysis.referenced_templates = tuple(meta.find_referenced_templates(ast))
+            analysis.blocks = tuple(block.name for block in ast.find_all(nodes.Block))
+            extends = ast.find(nodes.Extends)
+            if extends is not None and isinstance(extends.template, nodes.Const):
+                analysis.extends = extends.template.value
+
+        meta_match = _META_RE.search(source)
+        if meta_match:
+            try:
+                meta_data = yaml.safe_load(meta_match.group(1).strip())
+                if isinstance(meta_data, dict):
+                    analysis.meta = MappingProxyType(meta_data)
+            except Exception as e:
+                analysis.meta_error = str(e)
+
+        analysis.security_findings = tuple(self._find_security_issues(source))
+        return analysis
+
+    def _find_security_issues(self, source: str) -> List[Dict[str, Any]]:
+        findings = []
+
+        for pattern, regex in self._compiled_patterns:
+            for match in regex.finditer(source):
+                start_line = source.count('\n', 0, match.start()) + 1
+                context = source[max(0, match.start() - 20):min(len(source), match.end() + 20)]
+
+                findings.append({
+                    "line": start_line,
+                    "pattern": pattern,
+                    "match": match.group(0),
+                    "context": context.strip(),
+                    "severity": "high",
+                    "message": f"Potentially dangerous pattern found: {match.group(0)}"
+                })
+
+        if _EVAL_RE.search(source):
+            findings.append({
+                "pattern": "eval",
+                "severity": "medium",
+                "message": "Use of eval() is discouraged for security reasons"
+            })
+
+        if _EXEC_RE.search(source):
+            findings.append({
+                "pattern": "exec",
+                "severity": "medium",
+                "message": "Use of exec() is discouraged for security reasons"
+            })
+
+        if _PARAMS_USE_RE.search(source) and not _PARAMS_CHECK_RE.search(source):
+            findings.append({
+                "pattern": "unvalidated_params",
+                "severity": "low",
+                "message": "Template uses parameters without validation"
+            })
+
+        return findings
+
+_analyzers: "weakref.WeakKeyDictionary[Environment, TemplateAnalyzer]" = weakref.WeakKeyDictionary()
+_analyzers_lock = threading.Lock()
+
+def get_template_analyzer(env: Environment) -> TemplateAnalyzer:
+    """
+    Get the analyzer shared by everything using an environment.
+
+    Args:
+        env: Jinja2 environment
+
+    Returns:
+        Shared template analyzer
+    """
+    with _analyzers_lock:
+        analyzer = _analyzers.get(env)
+        if analyzer is None:
+            analyzer = TemplateAnalyzer(env)
+            _analyzers[env] = analyzer
+        return analyzer
@@ -0,0 +1,77 @@
+"""
+Batch rendering of one template against many contexts.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Iterable, AsyncIterator
+
+from pydantic import BaseModel
+
+from .compiled_cache import stable_hash
+
+logger = logging.getLogger(__name__)
+
+class BatchRenderResult(BaseModel):
+    """Result of rendering one distinct context of a batch."""
+    indexes: List[int]
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+async def render_batch(
+    render: Callable[[Dict[str, Any]], str],
+    contexts: Iterable[Dict[str, Any]],
+    max_workers: Optional[int] = None
+) -> AsyncIterator[BatchRenderResult]:
+    """
+    Render distinct contexts in a thread pool and yield results as they finish.
+
+    Identical contexts are rendered once; the result lists the positions of
+    every input context it applies to.
+
+    Args:
+        render: Synchronous function rendering one context
+        contexts: Contexts to render
+        max_workers: Number of worker threads (defaults to the executor default)
+
+    Yields:
+        One result per distinct context, in completion order
+    """
+    groups: Dict[str, List[int]] = {}
+    unique: List[Dict[str, Any]] = []
+    for index, context in enumerate(contexts):
+        key = stable_hash(context)
+        if key not in groups:
+            groups[key] = []
+            unique.append(context)
+        groups[key].append(index)
+    if not unique:
+        return
+
+    def run(indexes: List[int], context: Dict[str, Any]) -> BatchRenderResult:
+        try:
+            return BatchRenderResult(indexes=indexes, content=render(context))
+        except Exception as e:
+            return BatchRenderResult(indexes=indexes, error=str(e))
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="template-batch")
+    futures: List[asyncio.Future] = []
+    try:
+        futures = [
+            loop.run_in_executor(executor, run, indexes, context)
+            for indexes, context in zip(groups.values(), unique)
+        ]
+        logger.debug(f"Rendering {len(unique)} distinct contexts out of {sum(map(len, groups.values()))}")
+        for future in asyncio.as_completed(futures):
+            yield await future
+    finally:
+        # Renders that have not started are dropped when the consumer stops early;
+        # cancelling the wrapping futures cancels the queued work items
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
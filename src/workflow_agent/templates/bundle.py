@@ -0,0 +1,192 @@
+"""
+Precompiled template bundles for fast TemplateManager start-up.
+
+A bundle is a directory holding the templates compiled to Python modules
+(Jinja2 ModuleLoader format) plus a manifest with the extracted template
+registry, the inheritance map and the size/mtime of every source it was
+built from. TemplateManager loads a fresh bundle instead of reading, scanning
+and parsing every template.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
+
+import jinja2
+from jinja2 import BaseLoader, Environment, ModuleLoader, TemplateNotFound
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 2
+# Written by `build-templates` and loaded when no other bundle directory is configured
+DEFAULT_BUNDLE_DIR = os.path.join("cache", "template_bundle")
+MANIFEST_NAME = "manifest.json"
+MODULES_DIR = "modules"
+TEMPLATE_EXTENSIONS = ('.j2', '.jinja', '.jinja2', '.tpl')
+
+def environment_fingerprint(env: Environment) -> Dict[str, Any]:
+    """
+    Describe the environment options that affect compiled template code.
+
+    Args:
+        env: Jinja2 environment
+
+    Returns:
+        JSON-serializable description of the environment
+    """
+    return {
+        "jinja2": jinja2.__version__,
+        "extensions": sorted(env.extensions.keys()),
+        "trim_blocks": env.trim_blocks,
+        "lstrip_blocks": env.lstrip_blocks,
+        "keep_trailing_newline": env.keep_trailing_newline,
+        "delimiters": [env.block_start_string, env.block_end_string,
+                       env.variable_start_string, env.variable_end_string,
+                       env.comment_start_string, env.comment_end_string],
+    }
+
+def snapshot_sources(template_dirs: List[str]) -> Dict[str, List[int]]:
+    """
+    Record the mtime and size of every template under the given directories.
+
+    Args:
+        template_dirs: Template directories
+
+    Returns:
+        Mapping of absolute template path to [mtime_ns, size]
+    """
+    sources: Dict[str, List[int]] = {}
+    pending = [os.path.abspath(d) for d in template_dirs if os.path.isdir(d)]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(TEMPLATE_EXTENSIONS):
+                    stat = entry.stat()
+                    sources[entry.path] = [stat.st_mtime_ns, stat.st_size]
+    return sources
+
+class BundledLoader(BaseLoader):
+    """
+    Loads precompiled templates from a bundle, falling back to template sources.
+    """
+
+    def __init__(self, modules_dir: str, source_loader: BaseLoader):
+        self.module_loader = ModuleLoader(modules_dir)
+        self.source_loader = source_loader
+
+    def get_source(self, environment: Environment, template: str) -> Tuple[str, Optional[str], Any]:
+        return self.source_loader.get_source(environment, template)
+
+    def list_templates(self) -> List[str]:
+        return self.source_loader.list_templates()
+
+    def load(self, environment: Environment, name: str, globals=None):
+        try:
+            return self.module_loader.load(environment, name, globals)
+        except TemplateNotFound:
+            return self.source_loader.load(environment, name, globals)
+
+class TemplateBundle:
+    """
+    Reads and writes a precompiled template bundle directory.
+    """
+
+    def __init__(self, bundle_dir: str):
+        """
+        Initialize the bundle.
+
+        Args:
+            bundle_dir: Bundle directory
+        """
+        self.bundle_dir = bundle_dir
+        self.manifest_path = os.path.join(bundle_dir, MANIFEST_NAME)
+        self.modules_dir = os.path.join(bundle_dir, MODULES_DIR)
+
+    def build(
+        self,
+        env: Environment,
+        template_dirs: List[str],
+        registry: Dict[str, Dict[str, Any]],
+        inheritance_map: Dict[str, List[str]]
+    ) -> int:
+        """
+        Compile the registered templates and write the manifest.
+
+        Args:
+            env: Environment used to render the templates
+            template_dirs: Template directories the registry was built from
+            registry: Template registry
+            inheritance_map: Template inheritance map
+
+        Returns:
+            Number of compiled templates
+        """
+        os.makedirs(self.bundle_dir, exist_ok=True)
+        # Drop the manifest first so a partially written bundle is never considered fresh
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        if os.path.exists(self.modules_dir):
+            shutil.rmtree(self.modules_dir)
+
+        sources = snapshot_sources(template_dirs)
+        compiled: List[str] = []
+        env.compile_templates(
+            self.modules_dir,
+            filter_func=lambda name: name in registry,
+            zip=None,
+            log_function=compiled.append,
+            ignore_errors=True
+        )
+
+        manifest = {
+            "version": BUNDLE_FORMAT_VERSION,
+            "environment": environment_fingerprint(env),
+            "template_dirs": [os.path.abspath(d) for d in template_dirs],
+            "sources": sources,
+            "registry": registry,
+            "inheritance_map": inheritance_map,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.bundle_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+        count = sum(1 for line in compiled if line.startswith("Compiled"))
+        logger.info(f"Built template bundle with {count} templates in {self.bundle_dir}")
+        return count
+
+    def load_if_fresh(self, env: Environment, template_dirs: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Load the manifest if the bundle matches the environment and template sources.
+
+        Args:
+            env: Environment the templates will be rendered with
+            template_dirs: Template directories in use
+
+        Returns:
+            Manifest dictionary, or None if the bundle is missing or stale
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable template bundle {self.manifest_path}: {e}")
+            return None
+
+        if manifest.get("version") != BUNDLE_FORMAT_VERSION:
+            return None
+        if manifest.get("environment") != environment_fingerprint(env):
+            return None
+        if manifest.get("template_dirs") != [os.path.abspath(d) for d in template_dirs]:
+            return None
+        if manifest.get("sources") != snapshot_sources(template_dirs):
+            logger.info("Template bundle is stale, templates changed since it was built")
+            return None
+        return manifest
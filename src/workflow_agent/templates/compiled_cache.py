@@ -0,0 +1,172 @@
+"""
+Compiled template caching shared by the template pipeline and TemplateManager.
+
+Two levels are used: an in-process LRU of compiled Template objects keyed by a
+hash of the template source, and an on-disk Jinja2 bytecode cache so that other
+processes (later CLI runs, parallel workers) skip compilation as well.
+"""
+import dataclasses
+import enum
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time
+from pathlib import PurePath
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, Template
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BYTECODE_CACHE_DIR = os.path.join("cache", "templates")
+
+_bytecode_caches: Dict[str, FileSystemBytecodeCache] = {}
+_bytecode_caches_lock = threading.Lock()
+
+def get_bytecode_cache(directory: Optional[str] = None) -> Optional[FileSystemBytecodeCache]:
+    """
+    Get the process-wide bytecode cache for a directory.
+
+    Args:
+        directory: Cache directory (defaults to $WORKFLOW_TEMPLATE_CACHE_DIR or cache/templates)
+
+    Returns:
+        Shared bytecode cache, or None if the directory cannot be created
+    """
+    directory = os.path.abspath(
+        directory or os.environ.get("WORKFLOW_TEMPLATE_CACHE_DIR", DEFAULT_BYTECODE_CACHE_DIR)
+    )
+    with _bytecode_caches_lock:
+        if directory not in _bytecode_caches:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Template bytecode cache disabled, cannot create {directory}: {e}")
+                return None
+            _bytecode_caches[directory] = FileSystemBytecodeCache(directory)
+        return _bytecode_caches[directory]
+
+def content_hash(source: str) -> str:
+    """Return the hash identifying a template source."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def _canonical(value: Any) -> Any:
+    """Convert a value to a JSON-serializable form that is equal for equal values."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        items = [[json.dumps(_canonical(k), sort_keys=True), _canonical(v)] for k, v in value.items()]
+        return ["dict", sorted(items, key=lambda item: item[0])]
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__, [_canonical(item) for item in value]]
+    if isinstance(value, (set, frozenset)):
+        return ["set", sorted(json.dumps(_canonical(item), sort_keys=True) for item in value)]
+    if isinstance(value, (datetime, date, time)):
+        return [type(value).__name__, value.isoformat()]
+    if isinstance(value, PurePath):
+        return ["path", str(value)]
+    if isinstance(value, bytes):
+        return ["bytes", value.hex()]
+    if isinstance(value, enum.Enum):
+        return [type(value).__name__, _canonical(value.value)]
+    if hasattr(value, "model_dump"):
+        return [type(value).__name__, _canonical(value.model_dump())]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return [type(value).__name__, _canonical(dataclasses.asdict(value))]
+    return [type(value).__name__, repr(value)]
+
+def stable_hash(value: Any) -> str:
+    """
+    Hash an arbitrary Python value consistently across runs.
+
+    Dictionaries and sets hash independently of ordering; datetimes, paths,
+    enums, pydantic models and dataclasses are hashed by their contents and
+    anything else by its repr.
+
+    Args:
+        value: Value to hash
+
+    Returns:
+        Hex digest of the value
+    """
+    encoded = json.dumps(_canonical(value), separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class CompiledTemplateCache:
+    """
+    Bounded LRU cache of compiled templates keyed by source hash.
+    """
+
+    def __init__(self, env: Environment, max_size: int = 256, name_prefix: str = "string"):
+        """
+        Initialize compiled template cache.
+
+        Args:
+            env: Environment templates are compiled for
+            max_size: Maximum number of compiled templates kept in memory
+            name_prefix: Prefix of the template names used as bytecode cache keys
+        """
+        self.env = env
+        self.max_size = max_size
+        self.name_prefix = name_prefix
+        self.compilations = 0
+        self._templates: "OrderedDict[str, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._compile_lock = threading.Lock()
+
+    def get_template(self, source: str) -> Template:
+        """
+        Get the compiled template for a source, compiling it at most once.
+
+        Args:
+            source: Template source
+
+        Returns:
+            Compiled template
+        """
+        key = content_hash(source)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+
+        # Compilations are serialized so concurrent renders of a new template compile it once
+        with self._compile_lock:
+            with self._lock:
+                template = self._templates.get(key)
+            if template is None:
+                template = self._load(key, source)
+
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+    def _load(self, key: str, source: str) -> Template:
+        name = f"{self.name_prefix}:{key}"
+        bcc = self.env.bytecode_cache
+        bucket = None
+        code = None
+        if bcc is not None:
+            bucket = bcc.get_bucket(self.env, name, None, source)
+            code = bucket.code
+        if code is None:
+            code = self.env.compile(source, name)
+            self.compilations += 1
+            if bucket is not None:
+                bucket.code = code
+                bcc.set_bucket(bucket)
+        return self.env.template_class.from_code(self.env, code, self.env.make_globals(None), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self) -> int:
+        return len(self._templates)
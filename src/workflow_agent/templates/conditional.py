@@ -2,16 +2,99 @@
 Conditional template renderer for dynamic template selection based on context.
 """
 import logging
+import operator
 import re
 import os
-from typing import Dict, Any, List, Optional, Tuple, Union
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 import json
 
 from .manager import TemplateManager
 from .validator import TemplateValidator
+from .compiled_cache import content_hash
 
 logger = logging.getLogger(__name__)
 
+# Format: <!-- BEGIN:IF condition --> content <!-- END:IF -->
+_BLOCK_RE = re.compile(r'<!-- BEGIN:IF (.*?) -->(.*?)<!-- END:IF -->', re.DOTALL)
+_LOGICAL_RE = re.compile(r'\s+(AND|OR)\s+')
+
+# Comparison operators in the order conditions are matched against them
+_COMPARISONS = [
+    ("==", operator.eq),
+    ("!=", operator.ne),
+    (">", operator.gt),
+    ("<", operator.lt),
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("contains", lambda left, right: right in left),
+    ("not contains", lambda left, right: right not in left),
+]
+
+Predicate = Callable[[Dict[str, Any]], Any]
+
+_NOT_LITERAL = object()
+
+class ConditionalPlan:
+    """
+    Content with conditional blocks compiled into literal segments and condition predicates.
+    """
+    
+    def __init__(self, segments: List[Union[str, Tuple[str, Predicate, str]]]):
+        """
+        Initialize the plan.
+        
+        Args:
+            segments: Literal text or (condition, predicate, block content) tuples
+        """
+        self.segments = segments
+        
+    def render(self, context: Dict[str, Any]) -> str:
+        """
+        Render the content for a context.
+        
+        Args:
+            context: Rendering context
+            
+        Returns:
+            Content with conditional blocks processed
+        """
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            condition, predicate, block_content = segment
+            try:
+                condition_met = predicate(context)
+            except Exception as e:
+                logger.warning(f"Error evaluating condition '{condition}': {e}")
+                # Keep the block content in case of error
+                condition_met = True
+            if condition_met:
+                parts.append(block_content)
+        return "".join(parts)
+
+class NestedRenderPlan:
+    """
+    Resolved include graph of a template.
+    """
+    
+    def __init__(self, template_path: str, includes: List[str], missing: List[str], dynamic: bool):
+        """
+        Initialize the plan.
+        
+        Args:
+            template_path: Path to primary template
+            includes: Templates extended, included or imported, directly or transitively
+            missing: Referenced templates that do not exist
+            dynamic: Whether some references are only known at render time
+        """
+        self.template_path = template_path
+        self.includes = includes
+        self.missing = missing
+        self.dynamic = dynamic
+
 class ConditionalTemplateRenderer:
     """
     Conditional template renderer that selects templates based on context.
@@ -27,6 +110,9 @@ class ConditionalTemplateRenderer:
         """
         self.template_manager = template_manager
         self.validator = TemplateValidator(template_manager)
+        self.max_plans = 256
+        self._conditional_plans: "OrderedDict[str, ConditionalPlan]" = OrderedDict()
+        self._nested_plans: Dict[str, Tuple[int, NestedRenderPlan]] = {}
         
     async def render_template(self, 
                              action: str, 
@@ -243,6 +329,15 @@ class ConditionalTemplateRenderer:
             for i, path in enumerate(include_paths):
                 context["includes"][f"path_{i}"] = path
                 
+        plan = self.get_nested_plan(template_path)
+        if plan.missing:
+            logger.warning(f"Missing templates referenced by {template_path}: {plan.missing}")
+            return {
+                "success": False,
+                "error": f"Missing included templates: {', '.join(plan.missing)}",
+                "template_path": template_path
+            }
+            
         # Validate parameters
         validation = await self.validator.validate_parameters(template_path, context)
         if not validation["valid"]:
@@ -261,7 +356,8 @@ class ConditionalTemplateRenderer:
             return {
                 "success": True,
                 "rendered": rendered,
-                "template_path": template_path
+                "template_path": template_path,
+                "includes": plan.includes
             }
         except Exception as e:
             logger.error(f"Error rendering template {template_path}: {e}")
@@ -271,6 +367,51 @@ class ConditionalTemplateRenderer:
                 "template_path": template_path
             }
             
+    def get_nested_plan(self, template_path: str) -> NestedRenderPlan:
+        """
+        Get the include graph of a template, resolving it once per registry generation.
+        
+        Args:
+            template_path: Path to primary template
+            
+        Returns:
+            Nested render plan
+        """
+        generation = self.template_manager.registry_generation
+        cached = self._nested_plans.get(template_path)
+        if cached and cached[0] == generation:
+            return cached[1]
+            
+        registry = self.template_manager.template_registry
+        includes: List[str] = []
+        missing: List[str] = []
+        dynamic = template_path not in registry
+        visited = {template_path}
+        pending = list(registry.get(template_path, {}).get('references', []))
+        while pending:
+            reference = pending.pop(0)
+            if reference is None:
+                dynamic = True
+                continue
+            if reference in visited:
+                continue
+            visited.add(reference)
+            
+            template_info = registry.get(reference)
+            if template_info is not None:
+                includes.append(reference)
+                pending.extend(template_info.get('references', []))
+            elif self.template_manager._template_exists(reference):
+                # Exists but unregistered, so its own references are unknown
+                includes.append(reference)
+                dynamic = True
+            else:
+                missing.append(reference)
+                
+        plan = NestedRenderPlan(template_path, includes, missing, dynamic)
+        self._nested_plans[template_path] = (generation, plan)
+        return plan
+        
     async def render_conditional_blocks(self, content: str, context: Dict[str, Any]) -> str:
         """
         Render conditional blocks in content string.
@@ -282,146 +423,129 @@ class ConditionalTemplateRenderer:
         Returns:
             Rendered content with conditional blocks processed
         """
-        # Define conditional block regex
-        # Format: <!-- BEGIN:IF condition --> content <!-- END:IF -->
-        block_pattern = r'<!-- BEGIN:IF (.*?) -->(.*?)<!-- END:IF -->'
+        return self.compile_conditional_blocks(content).render(context)
         
-        # Find all conditional blocks
-        matches = re.finditer(block_pattern, content, re.DOTALL)
+    def compile_conditional_blocks(self, content: str) -> ConditionalPlan:
+        """
+        Compile content with conditional blocks into a plan cached by content hash.
         
-        # Process each block
-        result = content
-        for match in matches:
-            condition = match.group(1).strip()
-            block_content = match.group(2)
+        Args:
+            content: String with conditional blocks
             
-            # Evaluate condition
-            try:
-                # Parse condition
-                condition_parts = re.split(r'\s+(AND|OR)\s+', condition)
-                if len(condition_parts) == 1:
-                    # Single condition
-                    condition_met = self._evaluate_simple_condition(condition_parts[0], context)
-                else:
-                    # Multiple conditions
-                    conditions = []
-                    operators = []
-                    
-                    for i, part in enumerate(condition_parts):
-                        if i % 2 == 0:
-                            # Condition
-                            conditions.append(self._evaluate_simple_condition(part, context))
-                        else:
-                            # Operator
-                            operators.append(part)
-                            
-                    # Evaluate the combined condition
-                    condition_met = conditions[0]
-                    for i, op in enumerate(operators):
-                        if op == "AND":
-                            condition_met = condition_met and conditions[i + 1]
-                        elif op == "OR":
-                            condition_met = condition_met or conditions[i + 1]
-                
-                # Replace block with content if condition is met, otherwise empty string
-                if condition_met:
-                    result = result.replace(match.group(0), block_content)
-                else:
-                    result = result.replace(match.group(0), "")
-                    
-            except Exception as e:
-                logger.warning(f"Error evaluating condition '{condition}': {e}")
-                # Replace with original content in case of error
-                result = result.replace(match.group(0), block_content)
-                
-        return result
+        Returns:
+            Conditional render plan
+        """
+        key = content_hash(content)
+        plan = self._conditional_plans.get(key)
+        if plan is not None:
+            self._conditional_plans.move_to_end(key)
+            return plan
+            
+        segments: List[Union[str, Tuple[str, Predicate, str]]] = []
+        position = 0
+        for match in _BLOCK_RE.finditer(content):
+            if match.start() > position:
+                segments.append(content[position:match.start()])
+            condition = match.group(1).strip()
+            segments.append((condition, self._compile_condition(condition), match.group(2)))
+            position = match.end()
+        if position < len(content):
+            segments.append(content[position:])
+            
+        plan = ConditionalPlan(segments)
+        self._conditional_plans[key] = plan
+        while len(self._conditional_plans) > self.max_plans:
+            self._conditional_plans.popitem(last=False)
+        return plan
         
-    def _evaluate_simple_condition(self, condition: str, context: Dict[str, Any]) -> bool:
+    def _compile_condition(self, condition: str) -> Predicate:
         """
-        Evaluate a simple condition against context.
+        Compile a condition joined with AND/OR into a predicate.
+        
+        Conditions combine left to right and every part is evaluated.
         
         Args:
             condition: Condition string
-            context: Context to evaluate against
             
         Returns:
-            True if condition is met, False otherwise
+            Predicate over a context
+        """
+        condition_parts = _LOGICAL_RE.split(condition)
+        predicates = [self._compile_simple_condition(part) for part in condition_parts[0::2]]
+        operators = condition_parts[1::2]
+        if len(predicates) == 1:
+            return predicates[0]
+            
+        def evaluate(context: Dict[str, Any]) -> Any:
+            results = [predicate(context) for predicate in predicates]
+            condition_met = results[0]
+            for op, result in zip(operators, results[1:]):
+                if op == "AND":
+                    condition_met = condition_met and result
+                elif op == "OR":
+                    condition_met = condition_met or result
+            return condition_met
+        return evaluate
+        
+    def _compile_simple_condition(self, condition: str) -> Predicate:
         """
-        # Equality condition
-        if "==" in condition:
-            left, right = [s.strip() for s in condition.split("==", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value == right_value
-            
-        # Inequality condition
-        elif "!=" in condition:
-            left, right = [s.strip() for s in condition.split("!=", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value != right_value
-            
-        # Greater than
-        elif ">" in condition:
-            left, right = [s.strip() for s in condition.split(">", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value > right_value
-            
-        # Less than
-        elif "<" in condition:
-            left, right = [s.strip() for s in condition.split("<", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value < right_value
-            
-        # Greater than or equal
-        elif ">=" in condition:
-            left, right = [s.strip() for s in condition.split(">=", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value >= right_value
-            
-        # Less than or equal
-        elif "<=" in condition:
-            left, right = [s.strip() for s in condition.split("<=", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return left_value <= right_value
-            
-        # Contains
-        elif "contains" in condition:
-            left, right = [s.strip() for s in condition.split("contains", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return right_value in left_value
-            
-        # Not contains
-        elif "not contains" in condition:
-            left, right = [s.strip() for s in condition.split("not contains", 1)]
-            left_value = self._get_value_from_context(left, context)
-            right_value = self._get_value_from_context(right, context)
-            return right_value not in left_value
+        Compile a simple condition into a predicate.
+        
+        Args:
+            condition: Condition string
             
+        Returns:
+            Predicate over a context
+        """
+        for token, compare in _COMPARISONS:
+            if token in condition:
+                left, right = [s.strip() for s in condition.split(token, 1)]
+                left_value = self._compile_operand(left)
+                right_value = self._compile_operand(right)
+                return lambda context: compare(left_value(context), right_value(context))
+                
         # Boolean value
-        elif condition.lower() in ("true", "false"):
-            return condition.lower() == "true"
+        if condition.lower() in ("true", "false"):
+            result = condition.lower() == "true"
+            return lambda context: result
             
         # Variable existence
-        else:
-            return bool(self._get_value_from_context(condition, context))
-            
-    def _get_value_from_context(self, key: str, context: Dict[str, Any]) -> Any:
+        value = self._compile_operand(condition)
+        return lambda context: bool(value(context))
+        
+    def _compile_operand(self, key: str) -> Callable[[Dict[str, Any]], Any]:
         """
-        Get a value from context by key.
+        Compile an operand into a literal or a context lookup.
         
         Args:
-            key: Key to lookup
-            context: Context dictionary
+            key: Literal or context key
             
         Returns:
-            Value from context
+            Function returning the operand value for a context
         """
+        literal = self._parse_literal(key)
+        if literal is not _NOT_LITERAL:
+            return lambda context: literal
+            
+        # Nested key lookup
+        if '.' in key:
+            parts = key.split('.')
+            
+            def lookup(context: Dict[str, Any]) -> Any:
+                value = context
+                for part in parts:
+                    if isinstance(value, dict) and part in value:
+                        value = value[part]
+                    else:
+                        return None
+                return value
+            return lookup
+            
+        # Simple key lookup
+        return lambda context: context.get(key, None)
+        
+    @staticmethod
+    def _parse_literal(key: str) -> Any:
         # Handle quoted strings
         if (key.startswith('"') and key.endswith('"')) or (key.startswith("'") and key.endswith("'")):
             return key[1:-1]
@@ -440,16 +564,30 @@ class ConditionalTemplateRenderer:
         if key.lower() == "null" or key.lower() == "none":
             return None
             
-        # Nested key lookup
-        if '.' in key:
-            parts = key.split('.')
-            value = context
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return None
-            return value
+        return _NOT_LITERAL
+        
+    def _evaluate_simple_condition(self, condition: str, context: Dict[str, Any]) -> bool:
+        """
+        Evaluate a simple condition against context.
+        
+        Args:
+            condition: Condition string
+            context: Context to evaluate against
             
-        # Simple key lookup
-        return context.get(key, None)
\ No newline at end of file
+        Returns:
+            True if condition is met, False otherwise
+        """
+        return self._compile_simple_condition(condition)(context)
+            
+    def _get_value_from_context(self, key: str, context: Dict[str, Any]) -> Any:
+        """
+        Get a value from context by key.
+        
+        Args:
+            key: Key to lookup
+            context: Context dictionary
+            
+        Returns:
+            Value from context
+        """
+        return self._compile_operand(key)(context)
@@ -0,0 +1,137 @@
+"""
+Bounded edit-distance matching for parameter name suggestions.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> Optional[int]:
+    """
+    Calculate the Levenshtein distance between two strings if it is within a bound.
+
+    Only a band of width 2 * max_distance + 1 around the diagonal is computed
+    and the scan stops as soon as a whole row exceeds the bound.
+
+    Args:
+        s1: First string
+        s2: Second string
+        max_distance: Largest distance of interest
+
+    Returns:
+        Distance, or None if it exceeds max_distance
+    """
+    if abs(len(s1) - len(s2)) > max_distance:
+        return None
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if s1 == s2:
+        return 0
+
+    # Only cells within max_distance of the diagonal can stay within the bound
+    limit = max_distance + 1
+    len2 = len(s2)
+    previous_row = [j if j <= max_distance else limit for j in range(len2 + 1)]
+    for i, c1 in enumerate(s1, 1):
+        low = max(1, i - max_distance)
+        high = min(len2, i + max_distance)
+        current_row = [limit] * (len2 + 1)
+        current_row[0] = i if i <= max_distance else limit
+        row_min = current_row[0]
+        for j in range(low, high + 1):
+            value = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (c1 != s2[j - 1]),
+                limit
+            )
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous_row = current_row
+
+    distance = previous_row[len2]
+    return distance if distance <= max_distance else None
+
+class NGramIndex:
+    """
+    Bigram index over words for bounded edit-distance lookups.
+
+    Each edit changes at most two bigrams of the padded word, so a word within
+    distance k of the query shares at least max(len) + 1 - 2k bigrams with it.
+    Only words passing that count filter are compared with bounded_levenshtein.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            words: Words to index
+        """
+        self._words: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        for word in words:
+            self.add(word)
+
+    @staticmethod
+    def _bigrams(word: str) -> Counter:
+        padded = f"\x00{word}\x01"
+        return Counter(padded[i:i + 2] for i in range(len(padded) - 1))
+
+    def add(self, word: str) -> None:
+        """
+        Add a word to the index.
+
+        Args:
+            word: Word to add
+        """
+        if word in self._ids:
+            return
+        word_id = len(self._words)
+        self._words.append(word)
+        self._ids[word] = word_id
+        self._by_length.setdefault(len(word), []).append(word_id)
+        for gram, count in self._bigrams(word).items():
+            self._postings.setdefault(gram, []).append((word_id, count))
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find words within an edit distance of a query.
+
+        Args:
+            query: Query word
+            max_distance: Maximum edit distance
+
+        Returns:
+            (distance, word) pairs ordered by distance, then word
+        """
+        shared: Dict[int, int] = {}
+        for gram, query_count in self._bigrams(query).items():
+            for word_id, count in self._postings.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + min(query_count, count)
+
+        # Words this short may match without sharing any bigram
+        if len(query) < 2 * max_distance:
+            for length in range(2 * max_distance):
+                for word_id in self._by_length.get(length, ()):
+                    shared.setdefault(word_id, 0)
+
+        results = []
+        for word_id, common in shared.items():
+            word = self._words[word_id]
+            if abs(len(word) - len(query)) > max_distance:
+                continue
+            if common < max(len(word), len(query)) + 1 - 2 * max_distance:
+                continue
+            distance = bounded_levenshtein(query, word, max_distance)
+            if distance is not None:
+                results.append((distance, word))
+
+        results.sort()
+        return results
+
+    def __len__(self) -> int:
+        return len(self._words)
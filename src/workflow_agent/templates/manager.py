@@ -9,33 +9,52 @@ import re
 import time
 import copy
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set, Tuple, Union
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple, Union, Iterable, AsyncIterator
 from base64 import b64encode, b64decode
 from datetime import datetime
 import uuid
 import hashlib
+import threading
+from collections import OrderedDict
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound, meta
 
+from .compiled_cache import get_bytecode_cache, stable_hash
+from .bundle import DEFAULT_BUNDLE_DIR, TemplateBundle, BundledLoader
+from .batch import BatchRenderResult, render_batch
+from .analysis import TemplateAnalyzer, get_template_analyzer
+
 logger = logging.getLogger(__name__)
 
 class TemplateCache:
     """
-    Cache for rendered templates with time-based invalidation.
+    LRU cache for rendered templates with a byte budget and time-based invalidation.
+    
+    Keys have the form "<template_path>:<context_hash>"; entries are indexed by
+    template path so invalidation only looks at templates, not every rendering.
     """
     
-    def __init__(self, max_size: int = 100, ttl: int = 3600):
+    def __init__(self, max_size: int = 100, ttl: int = 3600, max_bytes: Optional[int] = 32 * 1024 * 1024):
         """
         Initialize template cache.
         
         Args:
             max_size: Maximum number of templates in cache
-            ttl: Time to live in seconds for cache entries
+            ttl: Time to live in seconds since last access for cache entries
+            max_bytes: Maximum total size of cached renderings in bytes (None disables the limit)
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
         self.max_size = max_size
         self.ttl = ttl
-        self.access_times: Dict[str, float] = {}
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # key -> (value, last access time, size); ordered from least to most recently used
+        self.cache: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self.key_index: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        
+    @staticmethod
+    def _template_of(key: str) -> str:
+        return key.rsplit(':', 1)[0]
         
     def get(self, key: str) -> Optional[str]:
         """
@@ -47,85 +66,206 @@ class TemplateCache:
         Returns:
             Cached template content or None if not found/expired
         """
-        if key not in self.cache:
-            return None
-            
-        # Check if expired
-        current_time = time.time()
-        if current_time - self.access_times[key] > self.ttl:
-            # Expired, remove from cache
-            del self.cache[key]
-            del self.access_times[key]
-            return None
-            
-        # Update access time
-        self.access_times[key] = current_time
-        return self.cache[key]
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+                
+            value, accessed_at, size = entry
+            current_time = time.time()
+            if current_time - accessed_at > self.ttl:
+                self._remove(key)
+                return None
+                
+            self.cache[key] = (value, current_time, size)
+            self.cache.move_to_end(key)
+            return value
         
     def set(self, key: str, value: str) -> None:
         """
-        Add a template to the cache.
+        Add a template to the cache, evicting least recently used entries over budget.
         
         Args:
             key: Cache key
             value: Template content
         """
-        # Check if cache is full
-        if len(self.cache) >= self.max_size and key not in self.cache:
-            # Remove least recently used item
-            lru_key = min(self.access_times, key=self.access_times.get)
-            del self.cache[lru_key]
-            del self.access_times[lru_key]
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                logger.debug(f"Not caching {key}, {size} bytes exceeds cache budget")
+                return
+                
+            current_time = time.time()
+            self.cache[key] = (value, current_time, size)
+            self.total_bytes += size
+            self.key_index.setdefault(self._template_of(key), set()).add(key)
+            
+            # Expired entries sit at the LRU end, drop them before evicting live ones
+            while self.cache:
+                oldest_key, (_, accessed_at, _) = next(iter(self.cache.items()))
+                if current_time - accessed_at <= self.ttl:
+                    break
+                self._remove(oldest_key)
+                
+            while len(self.cache) > self.max_size or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self.cache)))
+            
+    def _remove(self, key: str) -> None:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[2]
+        template = self._template_of(key)
+        keys = self.key_index.get(template)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.key_index[template]
+                
+    def invalidate_template(self, template_path: str) -> int:
+        """
+        Invalidate all cached renderings of a template.
+        
+        Args:
+            template_path: Template path
             
-        # Add to cache
-        current_time = time.time()
-        self.cache[key] = value
-        self.access_times[key] = current_time
+        Returns:
+            Number of invalidated entries
+        """
+        with self._lock:
+            keys = list(self.key_index.get(template_path, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
         
     def invalidate(self, pattern: str = None) -> None:
         """
-        Invalidate cache entries matching a pattern.
+        Invalidate cache entries whose template path matches a pattern.
         
         Args:
-            pattern: Regex pattern to match against keys
+            pattern: Regex pattern to match against template paths
         """
         if pattern:
-            # Compile regex
             regex = re.compile(pattern)
             
-            # Find keys to invalidate
-            keys_to_remove = [key for key in self.cache if regex.search(key)]
-            
-            # Remove matching keys
-            for key in keys_to_remove:
-                del self.cache[key]
-                del self.access_times[key]
-                
-            logger.debug(f"Invalidated {len(keys_to_remove)} cache entries matching pattern '{pattern}'")
+            removed = 0
+            with self._lock:
+                for template_path in [t for t in self.key_index if regex.search(t)]:
+                    removed += self.invalidate_template(template_path)
+                    
+            logger.debug(f"Invalidated {removed} cache entries matching pattern '{pattern}'")
         else:
             # Invalidate all
-            self.cache.clear()
-            self.access_times.clear()
+            with self._lock:
+                self.cache.clear()
+                self.key_index.clear()
+                self.total_bytes = 0
             logger.debug("Invalidated entire template cache")
 
+class TemplatePathIndex:
+    """
+    Character trie over template paths for prefix lookups independent of registry size.
+    """
+    
+    def __init__(self):
+        # Each node maps a character to its child node; "" holds the paths stored under the node
+        self._root: Dict[str, Any] = {"": set()}
+        
+    def add(self, path: str) -> None:
+        """
+        Add a template path.
+        
+        Args:
+            path: Template path
+        """
+        node = self._root
+        node[""].add(path)
+        for char in path:
+            node = node.setdefault(char, {"": set()})
+            node[""].add(path)
+            
+    def remove(self, path: str) -> None:
+        """
+        Remove a template path.
+        
+        Args:
+            path: Template path
+        """
+        if path not in self._root[""]:
+            return
+        node = self._root
+        node[""].discard(path)
+        for char in path:
+            child = node[char]
+            child[""].discard(path)
+            if not child[""]:
+                del node[char]
+                return
+            node = child
+            
+    def find_prefix(self, prefix: str) -> List[str]:
+        """
+        Find template paths starting with a prefix.
+        
+        Args:
+            prefix: Path prefix
+            
+        Returns:
+            Sorted list of matching template paths
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return sorted(node[""])
+        
+    def clear(self) -> None:
+        self._root = {"": set()}
+        
+    def __contains__(self, path: str) -> bool:
+        return path in self._root[""]
+        
 class TemplateManager:
     """
     Enhanced template manager with inheritance, caching, and conditional rendering.
     """
     
-    def __init__(self, template_dirs: Optional[List[str]] = None, cache_enabled: bool = True):
+    def __init__(
+        self,
+        template_dirs: Optional[List[str]] = None,
+        cache_enabled: bool = True,
+        bytecode_cache_dir: Optional[str] = None,
+        bundle_dir: Optional[str] = None
+    ):
         """
         Initialize template manager.
         
         Args:
             template_dirs: List of template directories to search
             cache_enabled: Whether to enable template caching
+            bytecode_cache_dir: Directory of the on-disk bytecode cache shared with the template pipeline
+            bundle_dir: Directory of a precompiled template bundle (defaults to
+                $WORKFLOW_TEMPLATE_BUNDLE_DIR, else cache/template_bundle if it exists)
         """
         self.template_dirs = template_dirs or ["templates"]
         self.cache = TemplateCache() if cache_enabled else None
+        self.bytecode_cache = get_bytecode_cache(bytecode_cache_dir) if cache_enabled else None
+        bundle_dir = bundle_dir or os.environ.get("WORKFLOW_TEMPLATE_BUNDLE_DIR")
+        if not bundle_dir and os.path.isdir(DEFAULT_BUNDLE_DIR):
+            bundle_dir = DEFAULT_BUNDLE_DIR
+        self.bundle = TemplateBundle(bundle_dir) if bundle_dir else None
+        self.bundle_loaded = False
         self.env = self._create_environment()
         self.template_registry: Dict[str, Dict[str, Any]] = {}
+        self.template_index = TemplatePathIndex()
         self.inheritance_map: Dict[str, List[str]] = {}
+        self._referenced_variables: Dict[str, Optional[FrozenSet[str]]] = {}
+        # Incremented whenever the registry is rebuilt, so derived plans can be invalidated
+        self.registry_generation = 0
         
         # Initialize template registry
         self._init_template_registry()
@@ -143,7 +283,8 @@ class TemplateManager:
             extensions=['jinja2.ext.do', 'jinja2.ext.loopcontrols'],
             trim_blocks=True,
             lstrip_blocks=True,
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=self.bytecode_cache
         )
         
         # Add custom filters
@@ -181,6 +322,11 @@ class TemplateManager:
         
         return env
         
+    @property
+    def analyzer(self) -> TemplateAnalyzer:
+        """Shared analyzer for templates parsed with this manager's environment."""
+        return get_template_analyzer(self.env)
+        
     def _include_file(self, filename: str) -> str:
         """
         Include a file's contents directly.
@@ -203,7 +349,11 @@ class TemplateManager:
         return f"# File not found: {filename}"
         
     def _init_template_registry(self) -> None:
-        """Initialize the template registry by scanning template directories."""
+        """Initialize the template registry from a fresh bundle or by scanning template directories."""
+        self.registry_generation += 1
+        if self._load_bundle():
+            return
+            
         for template_dir in self.template_dirs:
             self._scan_templates(template_dir)
             
@@ -212,6 +362,45 @@ class TemplateManager:
         
         logger.info(f"Initialized template registry with {len(self.template_registry)} templates")
         
+    def _load_bundle(self) -> bool:
+        """
+        Load the registry and compiled templates from the bundle if it is fresh.
+        
+        Returns:
+            True if the bundle was loaded
+        """
+        self.bundle_loaded = False
+        if not self.bundle:
+            return False
+            
+        manifest = self.bundle.load_if_fresh(self.env, self.template_dirs)
+        if manifest is None:
+            return False
+            
+        for rel_path, template_info in manifest["registry"].items():
+            self._register_template(rel_path, template_info)
+        self.inheritance_map = manifest["inheritance_map"]
+        self.env.loader = BundledLoader(self.bundle.modules_dir, self.env.loader)
+        self.bundle_loaded = True
+        
+        logger.info(f"Loaded template registry with {len(self.template_registry)} templates from bundle {self.bundle.bundle_dir}")
+        return True
+        
+    def build_bundle(self, bundle_dir: Optional[str] = None) -> int:
+        """
+        Write a precompiled bundle of the registered templates.
+        
+        Args:
+            bundle_dir: Output directory (defaults to the configured bundle directory)
+            
+        Returns:
+            Number of compiled templates
+        """
+        bundle = TemplateBundle(bundle_dir) if bundle_dir else self.bundle
+        if bundle is None:
+            raise ValueError("No bundle directory configured")
+        return bundle.build(self.env, self.template_dirs, self.template_registry, self.inheritance_map)
+        
     def _scan_templates(self, template_dir: str) -> None:
         """
         Scan a template directory for templates and build registry.
@@ -236,22 +425,34 @@ class TemplateManager:
                         metadata = self._extract_template_metadata(template_source, rel_path)
                         
                         # Add to registry
-                        self.template_registry[rel_path] = {
+                        self._register_template(rel_path, {
                             'path': rel_path,
                             'full_path': os.path.join(root, file),
                             'extends': metadata.get('extends'),
                             'blocks': metadata.get('blocks', []),
                             'requires': metadata.get('requires', []),
+                            'references': metadata.get('references', []),
                             'tags': metadata.get('tags', []),
                             'platform': metadata.get('platform'),
                             'description': metadata.get('description', ''),
                             'version': metadata.get('version', '1.0'),
                             'last_modified': os.path.getmtime(os.path.join(root, file))
-                        }
+                        })
                         
                     except Exception as e:
                         logger.warning(f"Error loading template {rel_path}: {e}")
                         
+    def _register_template(self, rel_path: str, template_info: Dict[str, Any]) -> None:
+        """
+        Add a template to the registry and lookup index.
+        
+        Args:
+            rel_path: Template path relative to its template directory
+            template_info: Template metadata
+        """
+        self.template_registry[rel_path] = template_info
+        self.template_index.add(rel_path)
+        
     def _extract_template_metadata(self, source: str, rel_path: str) -> Dict[str, Any]:
         """
         Extract metadata from template source.
@@ -269,31 +470,21 @@ class TemplateManager:
             'tags': [],
         }
         
-        # Check for extends
-        extends_match = re.search(r'{%\s*extends\s+[\'"]([^\'"]+)[\'"]', source)
-        if extends_match:
-            metadata['extends'] = extends_match.group(1)
-            
-        # Extract blocks
-        for block_match in re.finditer(r'{%\s*block\s+([^\s%]+)[^%]*%}', source):
-            metadata['blocks'].append(block_match.group(1))
-            
-        # Look for metadata block
-        meta_match = re.search(r'{#\s*META\s*(.*?)\s*#}', source, re.DOTALL)
-        if meta_match:
-            try:
-                meta_content = meta_match.group(1).strip()
-                # Try to parse as YAML
-                meta_data = yaml.safe_load(meta_content)
-                if isinstance(meta_data, dict):
-                    metadata.update(meta_data)
-            except Exception as e:
-                logger.warning(f"Error parsing metadata for {rel_path}: {e}")
-                
-        # Extract required parameters
-        ast = self.env.parse(source)
-        required_params = meta.find_undeclared_variables(ast)
-        metadata['requires'] = list(required_params)
+        analysis = self.analyzer.analyze(source)
+        analysis.raise_syntax_error()
+            
+        if analysis.extends:
+            metadata['extends'] = analysis.extends
+        metadata['blocks'] = list(analysis.blocks)
+        
+        # Metadata block
+        if analysis.meta_error:
+            logger.warning(f"Error parsing metadata for {rel_path}: {analysis.meta_error}")
+        metadata.update(copy.deepcopy(dict(analysis.meta)))
+        
+        # Required parameters and extended, included and imported templates (None for dynamic names)
+        metadata['requires'] = list(analysis.undeclared_variables)
+        metadata['references'] = list(analysis.referenced_templates)
         
         # Extract platform from path
         if 'windows' in rel_path.lower() or 'win' in rel_path.lower():
@@ -370,8 +561,7 @@ class TemplateManager:
         # Create cache key
         cache_key = None
         if use_cache and self.cache:
-            context_hash = hashlib.md5(json.dumps(context, sort_keys=True).encode()).hexdigest()
-            cache_key = f"{template_path}:{context_hash}"
+            cache_key = f"{template_path}:{self._context_fingerprint(template_path, context)}"
             
             # Check cache
             cached = self.cache.get(cache_key)
@@ -399,13 +589,115 @@ class TemplateManager:
             logger.error(f"Error rendering template {template_path}: {e}")
             raise
             
+    async def render_batch(
+        self,
+        template_path: str,
+        contexts: Iterable[Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[BatchRenderResult]:
+        """
+        Render one template for many contexts, streaming results as they finish.
+        
+        The template is loaded once, identical contexts are rendered once and
+        renderings are served from and stored in the template cache.
+        
+        Args:
+            template_path: Path to template
+            contexts: Template rendering contexts, e.g. one per host
+            max_workers: Number of rendering threads
+            use_cache: Whether to use template cache
+            
+        Yields:
+            One result per distinct context with the positions of the contexts it applies to
+        """
+        if not self._template_exists(template_path):
+            raise TemplateNotFound(f"Template not found: {template_path}")
+            
+        template = self.env.get_template(template_path)
+        cache = self.cache if use_cache else None
+        
+        def render(context: Dict[str, Any]) -> str:
+            cache_key = None
+            if cache:
+                cache_key = f"{template_path}:{self._context_fingerprint(template_path, context)}"
+                cached = cache.get(cache_key)
+                if cached:
+                    return cached
+            self._validate_context(template_path, context)
+            rendered = template.render(**context)
+            if cache_key:
+                cache.set(cache_key, rendered)
+            return rendered
+            
+        async for result in render_batch(render, contexts, max_workers):
+            if result.error:
+                logger.error(f"Error rendering template {template_path} for contexts {result.indexes}: {result.error}")
+            yield result
+            
+    def _context_fingerprint(self, template_path: str, context: Dict[str, Any]) -> str:
+        """
+        Hash the part of a context that can affect a template's output.
+        
+        Args:
+            template_path: Path to template
+            context: Template rendering context
+            
+        Returns:
+            Context fingerprint
+        """
+        names = self._get_referenced_variables(template_path)
+        if names is None:
+            return stable_hash(context)
+        return stable_hash({name: context[name] for name in names if name in context})
+        
+    def _get_referenced_variables(self, template_path: str) -> Optional[FrozenSet[str]]:
+        """
+        Get the variables referenced by a template and everything it extends, includes or imports.
+        
+        Args:
+            template_path: Path to template
+            
+        Returns:
+            Set of variable names, or None if a referenced template cannot be resolved statically
+        """
+        if template_path in self._referenced_variables:
+            return self._referenced_variables[template_path]
+            
+        names: Optional[Set[str]] = set()
+        pending = [template_path]
+        visited: Set[str] = set()
+        while pending:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            
+            template_info = self.template_registry.get(name)
+            if template_info is None or 'references' not in template_info:
+                names = None
+                break
+            references = template_info['references']
+            if None in references:
+                names = None
+                break
+            names.update(template_info.get('requires', []))
+            pending.extend(references)
+            
+        if names is not None:
+            names = frozenset(names)
+        self._referenced_variables[template_path] = names
+        return names
+        
     def _template_exists(self, template_path: str) -> bool:
-        """Check if a template exists."""
-        try:
-            self.env.get_template(template_path)
+        """Check if a template exists without loading it."""
+        if template_path in self.template_index:
             return True
-        except TemplateNotFound:
-            return False
+        # Unregistered files (e.g. non-template extensions) can still be loaded by path
+        return any(
+            os.path.isfile(os.path.join(template_dir, template_path))
+            for template_dir in self.template_dirs
+        )
             
     def _validate_context(self, template_path: str, context: Dict[str, Any]) -> None:
         """
@@ -585,24 +877,25 @@ class TemplateManager:
         matches = []
         
         for pattern in patterns:
-            for template_path, template_info in self.template_registry.items():
-                if template_path.startswith(pattern):
-                    # Check platform compatibility
-                    template_platform = template_info.get('platform')
-                    if template_platform and template_platform != platform:
-                        continue
-                        
-                    # Check file extension
-                    if not template_path.endswith(('.j2', '.jinja', '.jinja2', '.tpl')):
-                        continue
-                        
-                    # Add to matches
-                    matches.append({
-                        "path": template_path,
-                        "metadata": template_info,
-                        "pattern_match": pattern,
-                        "score": len(pattern)  # Longer pattern = more specific = higher score
-                    })
+            for template_path in self.template_index.find_prefix(pattern):
+                template_info = self.template_registry[template_path]
+                
+                # Check platform compatibility
+                template_platform = template_info.get('platform')
+                if template_platform and template_platform != platform:
+                    continue
+                    
+                # Check file extension
+                if not template_path.endswith(('.j2', '.jinja', '.jinja2', '.tpl')):
+                    continue
+                    
+                # Add to matches
+                matches.append({
+                    "path": template_path,
+                    "metadata": template_info,
+                    "pattern_match": pattern,
+                    "score": len(pattern)  # Longer pattern = more specific = higher score
+                })
                     
         # Sort by score (descending)
         matches.sort(key=lambda m: m["score"], reverse=True)
@@ -624,11 +917,12 @@ class TemplateManager:
         if template_info:
             return template_info.get('requires', [])
             
-        # Template not in registry, parse it directly
+        # Template not in registry, analyze it directly
         try:
             template_source = self.env.loader.get_source(self.env, template_path)[0]
-            ast = self.env.parse(template_source)
-            return list(meta.find_undeclared_variables(ast))
+            analysis = self.analyzer.analyze(template_source)
+            analysis.raise_syntax_error()
+            return list(analysis.undeclared_variables)
         except Exception as e:
             logger.warning(f"Error getting required parameters for {template_path}: {e}")
             return []
@@ -644,7 +938,9 @@ class TemplateManager:
         
         # Clear registry
         self.template_registry.clear()
+        self.template_index.clear()
         self.inheritance_map.clear()
+        self._referenced_variables.clear()
         
         # Rebuild registry
         self._init_template_registry()
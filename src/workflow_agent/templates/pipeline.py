@@ -1,10 +1,11 @@
 """
 Template pipeline for processing templates through multiple stages.
 """
+import asyncio
 import logging
 import os
 import re
-from typing import Dict, Any, Optional, List, Union, Callable, Protocol, runtime_checkable
+from typing import Dict, Any, Optional, List, Union, Callable, Protocol, Iterable, AsyncIterator, runtime_checkable
 from pathlib import Path
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -14,6 +15,9 @@ from pydantic import BaseModel
 
 from ..error.exceptions import TemplateError
 from ..error.handler import ErrorHandler, handle_safely_async
+from .compiled_cache import CompiledTemplateCache, get_bytecode_cache
+from .batch import BatchRenderResult, render_batch
+from .analysis import get_template_analyzer
 
 logger = logging.getLogger(__name__)
 
@@ -166,14 +170,22 @@ class CacheResolver:
 class Jinja2Renderer:
     """Renders templates using Jinja2."""
     
-    def __init__(self):
-        """Initialize the renderer."""
+    def __init__(self, cache_size: int = 256, bytecode_cache_dir: Optional[str] = None, use_bytecode_cache: bool = True):
+        """
+        Initialize the renderer.
+        
+        Args:
+            cache_size: Maximum number of compiled templates kept in memory
+            bytecode_cache_dir: Directory of the on-disk bytecode cache shared with TemplateManager
+            use_bytecode_cache: Whether to persist compiled templates across processes
+        """
         try:
             import jinja2
             self.env = jinja2.Environment(
                 keep_trailing_newline=True,
                 trim_blocks=True,
-                lstrip_blocks=True
+                lstrip_blocks=True,
+                bytecode_cache=get_bytecode_cache(bytecode_cache_dir) if use_bytecode_cache else None
             )
             
             # Add custom filters
@@ -181,10 +193,15 @@ class Jinja2Renderer:
             self.env.filters["basename"] = lambda p: os.path.basename(p) if p else ""
             self.env.filters["dirname"] = lambda p: os.path.dirname(p) if p else ""
             
+            # Standard context variables that do not change between renders
+            self.env.globals["env"] = os.environ
+            
         except ImportError:
             logger.error("Jinja2 not available")
             raise TemplateError("Jinja2 not available")
             
+        self.compiled_templates = CompiledTemplateCache(self.env, max_size=cache_size, name_prefix="pipeline")
+            
     async def render(self, template_content: str, context: Dict[str, Any]) -> str:
         """
         Render a template with context using Jinja2.
@@ -196,16 +213,22 @@ class Jinja2Renderer:
         Returns:
             Rendered content
         """
-        try:
-            # Add standard context variables
-            full_context = {
-                "env": os.environ,
-                "now": datetime.now(),
-                **context
-            }
+        return self.render_sync(template_content, context)
+        
+    def render_sync(self, template_content: str, context: Dict[str, Any]) -> str:
+        """
+        Render a template with context without awaiting, for use from worker threads.
+        
+        Args:
+            template_content: Template content
+            context: Rendering context
             
-            template = self.env.from_string(template_content)
-            return template.render(**full_context)
+        Returns:
+            Rendered content
+        """
+        try:
+            template = self.compiled_templates.get_template(template_content)
+            return template.render({"now": datetime.now(), **context})
             
         except Exception as e:
             logger.error(f"Template rendering error: {e}")
@@ -214,14 +237,21 @@ class Jinja2Renderer:
 class SyntaxValidator:
     """Validates template syntax."""
     
-    def __init__(self):
-        """Initialize the validator."""
+    def __init__(self, env=None):
+        """
+        Initialize the validator.
+        
+        Args:
+            env: Jinja2 environment to parse with; sharing the renderer's environment
+                 shares its parsed template analyses
+        """
         try:
             import jinja2
-            self.env = jinja2.Environment()
+            self.env = env or jinja2.Environment()
         except ImportError:
             logger.error("Jinja2 not available")
             raise TemplateError("Jinja2 not available")
+        self.analyzer = get_template_analyzer(self.env)
             
     async def validate(self, template_content: str) -> ValidationResult:
         """
@@ -237,10 +267,9 @@ class SyntaxValidator:
         warnings = []
         
         # Check for syntax errors
-        try:
-            self.env.parse(template_content)
-        except Exception as e:
-            errors.append(f"Syntax error: {e}")
+        analysis = self.analyzer.analyze(template_content)
+        if analysis.syntax_error is not None:
+            errors.append(f"Syntax error: {analysis.syntax_error}")
             
         # Check for common mistakes
         if "{{" in template_content and "}}" not in template_content:
@@ -386,6 +415,62 @@ class TemplatePipeline:
         
         return rendered_content
         
+    async def process_batch(
+        self,
+        template_key: str,
+        contexts: Iterable[Dict[str, Any]],
+        validate: bool = True,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[BatchRenderResult]:
+        """
+        Process one template for many contexts, streaming results as they finish.
+        
+        The template is resolved and validated once and identical contexts are
+        rendered once.
+        
+        Args:
+            template_key: Template key
+            contexts: Template contexts, e.g. one per host
+            validate: Whether to validate the template
+            max_workers: Number of rendering threads
+            
+        Yields:
+            One result per distinct context with the positions of the contexts it applies to
+            
+        Raises:
+            TemplateError: If the template cannot be resolved or fails validation
+        """
+        template_content = await self._resolve(template_key)
+        if not template_content:
+            raise TemplateError(f"Template not found: {template_key}")
+            
+        if validate:
+            await self._validate(template_content)
+            
+        async for result in render_batch(self._sync_render_function(template_content), contexts, max_workers):
+            yield result
+            
+    def _sync_render_function(self, template_content: str) -> Callable[[Dict[str, Any]], str]:
+        """
+        Build a function rendering a template through all renderers from a worker thread.
+        
+        Args:
+            template_content: Template content
+            
+        Returns:
+            Function rendering one context
+        """
+        if all(hasattr(renderer, "render_sync") for renderer in self.renderers):
+            def render(context: Dict[str, Any]) -> str:
+                content = template_content
+                for renderer in self.renderers:
+                    content = renderer.render_sync(content, context)
+                return content
+            return render
+            
+        # Renderers without a synchronous path run on a private event loop per call
+        return lambda context: asyncio.run(self._render(template_content, context))
+        
     async def _resolve(self, template_key: str) -> Optional[str]:
         """
         Resolve a template using all resolvers.
@@ -495,10 +580,11 @@ def create_default_pipeline(
         pipeline.add_resolver(fs_resolver)
         
     # Add Jinja2 renderer
-    pipeline.add_renderer(Jinja2Renderer())
+    renderer = Jinja2Renderer()
+    pipeline.add_renderer(renderer)
     
     # Add validators
-    pipeline.add_validator(SyntaxValidator())
+    pipeline.add_validator(SyntaxValidator(renderer.env))
     pipeline.add_validator(ScriptValidator())
     
     return pipeline
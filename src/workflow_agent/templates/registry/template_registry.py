@@ -4,13 +4,21 @@ Unified template registry for centralized template management.
 import logging
 import os
 import json
-from typing import Dict, Any, Optional, List, Set
+import tempfile
+import threading
+from typing import Dict, Any, Optional, List, Set, Iterable, Callable
 from pathlib import Path
 import time
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_EXTENSIONS = ('.j2', '.jinja', '.tmpl')
+
+# Directories modified this recently may still change within the same mtime tick,
+# so their listing is not trusted on the next scan
+RACY_DIRECTORY_WINDOW_NS = 2_000_000_000
+
 class TemplateInfo:
     """Information about a template."""
     
@@ -23,7 +31,8 @@ class TemplateInfo:
         actions: Optional[List[str]] = None,
         platform: Optional[str] = None,
         description: Optional[str] = None,
-        variables: Optional[List[str]] = None
+        variables: Optional[List[str]] = None,
+        stat: Optional[os.stat_result] = None
     ):
         self.template_id = template_id
         self.template_path = template_path
@@ -33,9 +42,23 @@ class TemplateInfo:
         self.platform = platform
         self.description = description
         self.variables = variables or []
-        self.last_modified = os.path.getmtime(template_path) if os.path.exists(template_path) else 0
+        self.last_modified = 0
+        self.mtime_ns: Optional[int] = None
+        self.size: Optional[int] = None
+        self._update_stat(stat)
         self.content_hash = self._compute_hash()
         
+    def _update_stat(self, stat: Optional[os.stat_result] = None) -> None:
+        """Record the modification time and size of the template file."""
+        if stat is None:
+            try:
+                stat = os.stat(self.template_path)
+            except OSError:
+                return
+        self.last_modified = stat.st_mtime
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        
     def _compute_hash(self) -> str:
         """Compute a hash of the template content."""
         if not os.path.exists(self.template_path):
@@ -45,19 +68,34 @@ class TemplateInfo:
             content = f.read()
             return hashlib.md5(content).hexdigest()
             
-    def is_modified(self) -> bool:
-        """Check if the template file has been modified."""
-        if not os.path.exists(self.template_path):
-            return False
+    def is_modified(self, stat: Optional[os.stat_result] = None) -> bool:
+        """
+        Check if the template file has been modified.
+        
+        The content is only hashed when the file's size or mtime differ from
+        the recorded ones.
+        
+        Args:
+            stat: Current stat result of the template file, if already known
             
-        current_mtime = os.path.getmtime(self.template_path)
-        if current_mtime > self.last_modified:
-            current_hash = self._compute_hash()
-            if current_hash != self.content_hash:
-                self.last_modified = current_mtime
-                self.content_hash = current_hash
-                return True
+        Returns:
+            True if the template content changed
+        """
+        if stat is None:
+            try:
+                stat = os.stat(self.template_path)
+            except OSError:
+                return False
                 
+        if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size:
+            return False
+            
+        current_hash = self._compute_hash()
+        self._update_stat(stat)
+        if current_hash != self.content_hash:
+            self.content_hash = current_hash
+            return True
+            
         return False
         
     def to_dict(self) -> Dict[str, Any]:
@@ -72,47 +110,59 @@ class TemplateInfo:
             "description": self.description,
             "variables": self.variables,
             "last_modified": self.last_modified,
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
             "content_hash": self.content_hash
         }
         
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TemplateInfo':
-        """Create from dictionary."""
-        template_info = cls(
-            template_id=data["template_id"],
-            template_path=data["template_path"],
-            template_type=data["template_type"],
-            integration_type=data.get("integration_type"),
-            actions=data.get("actions"),
-            platform=data.get("platform"),
-            description=data.get("description"),
-            variables=data.get("variables")
-        )
+        """Create from dictionary without touching the template file."""
+        template_info = cls.__new__(cls)
+        template_info.template_id = data["template_id"]
+        template_info.template_path = data["template_path"]
+        template_info.template_type = data["template_type"]
+        template_info.integration_type = data.get("integration_type")
+        template_info.actions = data.get("actions") or []
+        template_info.platform = data.get("platform")
+        template_info.description = data.get("description")
+        template_info.variables = data.get("variables") or []
         template_info.last_modified = data.get("last_modified", 0)
+        template_info.mtime_ns = data.get("mtime_ns")
+        template_info.size = data.get("size")
         template_info.content_hash = data.get("content_hash", "")
         return template_info
 
 class TemplateRegistry:
     """Centralized registry for templates."""
     
-    def __init__(self, template_dirs: Optional[List[str]] = None):
+    def __init__(self, template_dirs: Optional[List[str]] = None, index_path: Optional[str] = None):
         """
         Initialize the template registry.
         
         Args:
             template_dirs: Directories to scan for templates
+            index_path: Path of the persisted template index
         """
         self.template_dirs = template_dirs or []
         self.templates: Dict[str, TemplateInfo] = {}
         self.integration_templates: Dict[str, Dict[str, List[str]]] = {}
-        self.index_path = "templates/registry/index.json"
+        self.index_path = index_path or "templates/registry/index.json"
+        self.journal_path = os.path.splitext(self.index_path)[0] + ".journal"
         self.metadata_cache: Dict[str, Dict[str, Any]] = {}
         
+        # Directory listings keyed by path: {"mtime_ns", "files", "dirs"}
+        self.directories: Dict[str, Dict[str, Any]] = {}
+        self._dirty_templates: Set[str] = set()
+        self._dirty_directories: Set[str] = set()
+        self._journal_entries = 0
+        self._path_ids: Dict[str, str] = {}
+        
         # Load existing index if available
         self._load_index()
         
     def _load_index(self) -> None:
-        """Load template index from disk."""
+        """Load template index from disk, replaying the change journal."""
         if os.path.exists(self.index_path):
             try:
                 with open(self.index_path, 'r') as f:
@@ -123,72 +173,276 @@ class TemplateRegistry:
                         self.templates[template_info.template_id] = template_info
                         
                     self.integration_templates = data.get("integration_templates", {})
+                    self.directories = data.get("directories", {})
                     
                 logger.info(f"Loaded {len(self.templates)} templates from index")
             except Exception as e:
                 logger.error(f"Failed to load template index: {e}")
-        
+                
+        if os.path.exists(self.journal_path):
+            try:
+                with open(self.journal_path, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Torn write at the end of the journal
+                            break
+                        self._apply_journal_entry(entry)
+                        self._journal_entries += 1
+                if self._journal_entries:
+                    self._rebuild_integration_index()
+            except Exception as e:
+                logger.error(f"Failed to replay template index journal: {e}")
+                
+    def _apply_journal_entry(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "put":
+            template_info = TemplateInfo.from_dict(entry["template"])
+            self.templates[template_info.template_id] = template_info
+        elif entry["op"] == "delete":
+            self.templates.pop(entry["template_id"], None)
+        elif entry["op"] == "dir":
+            self.directories[entry["path"]] = entry["listing"]
+        elif entry["op"] == "rmdir":
+            self.directories.pop(entry["path"], None)
+            
     def _save_index(self) -> None:
-        """Save template index to disk."""
-        try:
-            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        """
+        Persist changes to the template index.
+        
+        Changed records are appended to a journal; the journal is folded into a
+        compact snapshot once it grows past half the size of the index.
+        """
+        if not self._dirty_templates and not self._dirty_directories:
+            return
             
-            data = {
-                "templates": [template.to_dict() for template in self.templates.values()],
-                "integration_templates": self.integration_templates
-            }
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
             
-            with open(self.index_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            pending = len(self._dirty_templates) + len(self._dirty_directories)
+            threshold = max(100, (len(self.templates) + len(self.directories)) // 2)
+            if not os.path.exists(self.index_path) or self._journal_entries + pending > threshold:
+                self._write_snapshot()
+            else:
+                self._append_journal()
                 
+            self._dirty_templates.clear()
+            self._dirty_directories.clear()
             logger.debug("Saved template index")
         except Exception as e:
             logger.error(f"Failed to save template index: {e}")
+            
+    def _write_snapshot(self) -> None:
+        data = {
+            "templates": [template.to_dict() for template in self.templates.values()],
+            "integration_templates": self.integration_templates,
+            "directories": self.directories
+        }
+        
+        directory = os.path.dirname(self.index_path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_entries = 0
+        
+    def _append_journal(self) -> None:
+        lines = []
+        for template_id in sorted(self._dirty_templates):
+            template_info = self.templates.get(template_id)
+            if template_info:
+                lines.append({"op": "put", "template": template_info.to_dict()})
+            else:
+                lines.append({"op": "delete", "template_id": template_id})
+        for path in sorted(self._dirty_directories):
+            if path in self.directories:
+                lines.append({"op": "dir", "path": path, "listing": self.directories[path]})
+            else:
+                lines.append({"op": "rmdir", "path": path})
+                
+        with open(self.journal_path, 'a') as f:
+            f.write("".join(json.dumps(line, separators=(',', ':')) + "\n" for line in lines))
+        self._journal_entries += len(lines)
     
-    def scan_templates(self) -> None:
-        """Scan template directories and update registry."""
-        # Track new and modified templates
-        new_templates = []
-        modified_templates = []
+    def scan_templates(self) -> Set[str]:
+        """
+        Scan template directories and update registry.
         
-        # Check existing templates for modifications
-        for template_id, template_info in list(self.templates.items()):
-            if template_info.is_modified():
-                logger.debug(f"Template modified: {template_id}")
-                modified_templates.append(template_id)
-            elif not os.path.exists(template_info.template_path):
-                logger.debug(f"Template removed: {template_id}")
-                self._remove_template(template_id)
+        Directories whose mtime is unchanged reuse their recorded listing, so
+        only files are stat'ed; template contents are hashed only when a file's
+        size or mtime changed.
+        
+        Returns:
+            IDs of new, modified and removed templates
+        """
+        new_templates: List[str] = []
+        modified_templates: List[str] = []
+        removed_templates: List[str] = []
+        seen_paths: Set[str] = set()
+        seen_dirs: Set[str] = set()
+        self._path_ids = {info.template_path: template_id for template_id, info in self.templates.items()}
         
-        # Scan directories for new templates
         for template_dir in self.template_dirs:
             if not os.path.exists(template_dir):
                 logger.warning(f"Template directory not found: {template_dir}")
                 continue
                 
-            for root, _, files in os.walk(template_dir):
-                for filename in files:
-                    # Skip non-template files
-                    if not (filename.endswith('.j2') or filename.endswith('.jinja') or filename.endswith('.tmpl')):
-                        continue
-                        
-                    template_path = os.path.join(root, filename)
-                    template_id = self._generate_template_id(template_path)
+            pending = [template_dir]
+            while pending:
+                directory = pending.pop()
+                try:
+                    dir_stat = os.stat(directory)
+                except OSError:
+                    continue
+                seen_dirs.add(directory)
+                
+                listing = self.directories.get(directory)
+                if listing and listing["mtime_ns"] == dir_stat.st_mtime_ns:
+                    for filename in listing["files"]:
+                        template_path = os.path.join(directory, filename)
+                        try:
+                            stat = os.stat(template_path)
+                        except OSError:
+                            continue
+                        self._check_template(template_path, stat, new_templates, modified_templates)
+                        seen_paths.add(template_path)
+                    subdirs = listing["dirs"]
+                else:
+                    files: List[str] = []
+                    subdirs = []
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                            elif entry.name.endswith(TEMPLATE_EXTENSIONS):
+                                files.append(entry.name)
+                                self._check_template(entry.path, entry.stat(), new_templates, modified_templates)
+                                seen_paths.add(entry.path)
+                                
+                    mtime_ns = dir_stat.st_mtime_ns
+                    if time.time_ns() - mtime_ns < RACY_DIRECTORY_WINDOW_NS:
+                        mtime_ns = -1
+                    self.directories[directory] = {"mtime_ns": mtime_ns, "files": sorted(files), "dirs": sorted(subdirs)}
+                    self._dirty_directories.add(directory)
                     
-                    if template_id not in self.templates:
-                        logger.debug(f"New template found: {template_id}")
-                        template_info = self._parse_template_metadata(template_path)
-                        if template_info:
-                            self.templates[template_id] = template_info
-                            new_templates.append(template_id)
-        
-        # Rebuild integration templates index
-        self._rebuild_integration_index()
-        
-        # Save index if there were changes
-        if new_templates or modified_templates:
-            logger.info(f"Template scan: {len(new_templates)} new, {len(modified_templates)} modified")
-            self._save_index()
+                pending.extend(os.path.join(directory, name) for name in subdirs)
+                
+        # Forget directories that disappeared
+        for directory in [d for d in self.directories if d not in seen_dirs]:
+            del self.directories[directory]
+            self._dirty_directories.add(directory)
+            
+        # Templates not seen in this scan were removed, unless registered from elsewhere
+        for template_id, template_info in list(self.templates.items()):
+            if template_info.template_path not in seen_paths and not os.path.exists(template_info.template_path):
+                logger.debug(f"Template removed: {template_id}")
+                self._remove_template(template_id)
+                removed_templates.append(template_id)
+        
+        changed = set(new_templates) | set(modified_templates) | set(removed_templates)
+        if changed:
+            logger.info(
+                f"Template scan: {len(new_templates)} new, {len(modified_templates)} modified, "
+                f"{len(removed_templates)} removed"
+            )
+            self._rebuild_integration_index()
+            
+        self._save_index()
+        return changed
+        
+    def _check_template(
+        self,
+        template_path: str,
+        stat: os.stat_result,
+        new_templates: List[str],
+        modified_templates: List[str]
+    ) -> None:
+        """Register a new template or refresh an existing one from its stat data."""
+        template_id = self._path_ids.get(template_path) or self._generate_template_id(template_path)
+        template_info = self.templates.get(template_id)
+        
+        if template_info is None:
+            logger.debug(f"New template found: {template_id}")
+            template_info = self._parse_template_metadata(template_path, stat)
+            if template_info:
+                self.templates[template_id] = template_info
+                self._dirty_templates.add(template_id)
+                new_templates.append(template_id)
+            return
+            
+        recorded = (template_info.mtime_ns, template_info.size)
+        if template_info.is_modified(stat):
+            logger.debug(f"Template modified: {template_id}")
+            template_info = self._parse_template_metadata(template_path, stat) or template_info
+            self.templates[template_id] = template_info
+            self._dirty_templates.add(template_id)
+            modified_templates.append(template_id)
+        elif recorded != (template_info.mtime_ns, template_info.size):
+            # Touched without content change; keep the new stat to avoid rehashing
+            self._dirty_templates.add(template_id)
+            
+    def refresh_paths(self, paths: Iterable[str]) -> Set[str]:
+        """
+        Update the registry for specific changed files without scanning directories.
+        
+        Args:
+            paths: Paths of created, modified or deleted template files
+            
+        Returns:
+            IDs of new, modified and removed templates
+        """
+        new_templates: List[str] = []
+        modified_templates: List[str] = []
+        removed_templates: List[str] = []
+        
+        for template_path in paths:
+            if not template_path.endswith(TEMPLATE_EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(template_path)
+            except OSError:
+                template_id = self._generate_template_id(template_path)
+                if template_id in self.templates:
+                    self._remove_template(template_id)
+                    removed_templates.append(template_id)
+                continue
+            self._check_template(template_path, stat, new_templates, modified_templates)
+            
+        changed = set(new_templates) | set(modified_templates) | set(removed_templates)
+        if changed:
+            self._rebuild_integration_index()
+        self._save_index()
+        return changed
+        
+    def watch(
+        self,
+        callback: Optional[Callable[[Set[str]], None]] = None,
+        interval: float = 1.0,
+        stop_event: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Poll template directories and process changed templates until stopped.
+        
+        Each poll is an incremental scan, so an unchanged tree costs one stat per
+        directory and file.
+        
+        Args:
+            callback: Called with the IDs of changed templates after each poll with changes
+            interval: Seconds between polls
+            stop_event: Event that stops watching when set
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.wait(interval):
+            try:
+                changed = self.scan_templates()
+            except Exception as e:
+                logger.error(f"Template watch scan failed: {e}")
+                continue
+            if changed and callback:
+                callback(changed)
     
     def _generate_template_id(self, template_path: str) -> str:
         """Generate a unique template ID from path."""
@@ -201,7 +455,7 @@ class TemplateRegistry:
         # Fallback to filename
         return os.path.basename(template_path)
     
-    def _parse_template_metadata(self, template_path: str) -> Optional[TemplateInfo]:
+    def _parse_template_metadata(self, template_path: str, stat: Optional[os.stat_result] = None) -> Optional[TemplateInfo]:
         """Parse template metadata from file."""
         try:
             # Attempt to extract metadata from template content
@@ -238,7 +492,8 @@ class TemplateRegistry:
                 actions=actions,
                 platform=platform,
                 description=None,
-                variables=variables
+                variables=variables,
+                stat=stat
             )
         except Exception as e:
             logger.error(f"Failed to parse template metadata for {template_path}: {e}")
@@ -276,6 +531,7 @@ class TemplateRegistry:
         """Remove a template from the registry."""
         if template_id in self.templates:
             del self.templates[template_id]
+            self._dirty_templates.add(template_id)
             
             # Remove from integration templates index
             for integration, actions in list(self.integration_templates.items()):
@@ -408,6 +664,7 @@ class TemplateRegistry:
         
         if template_info:
             self.templates[template_id] = template_info
+            self._dirty_templates.add(template_id)
             self._rebuild_integration_index()
             self._save_index()
             logger.info(f"Added template: {template_id}")
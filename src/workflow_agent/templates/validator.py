@@ -6,9 +6,12 @@ import re
 from typing import Dict, Any, List, Optional, Tuple, Union, Set
 import json
 import yaml
+from collections import OrderedDict
 
 from jinja2 import Environment, TemplateSyntaxError, meta
 from .manager import TemplateManager
+from .analysis import DANGEROUS_PATTERNS, TemplateAnalysis
+from .fuzzy import NGramIndex
 
 logger = logging.getLogger(__name__)
 
@@ -25,22 +28,11 @@ class TemplateValidator:
             template_manager: Optional template manager to use
         """
         self.template_manager = template_manager
-        self.dangerous_patterns = [
-            r'rm\s+-rf\s+[/~]',               # Dangerous rm commands
-            r'sudo\s+rm',                      # sudo rm commands
-            r'chmod\s+777',                    # chmod 777 (too permissive)
-            r'find\s+.*\s+-delete',            # find with delete
-            r'dd\s+.*\s+of=/dev/',             # dd to devices
-            r';\s*rm\s',                       # rm after semicolon
-            r'mkfs',                           # filesystem formatting
-            r'wget.*\|\s*sh',                  # piping wget to shell
-            r'curl.*\|\s*sh',                  # piping curl to shell
-            r'eval.*\$\(',                     # eval of command substitution
-            r'>\s*/etc/passwd',                # overwriting passwd
-            r'>\s*/etc/shadow',                # overwriting shadow
-            r'mv\s+.*\s+/etc/',                # moving to /etc
-            r'\|\s*xargs\s+rm',                # piping to xargs rm
-        ]
+        self.dangerous_patterns = DANGEROUS_PATTERNS
+        self.max_suggestion_distance = 2
+        # Parameter name indexes keyed by template path or content hash, least recently used first
+        self.max_parameter_indexes = 256
+        self._parameter_indexes: "OrderedDict[str, Tuple[frozenset, NGramIndex]]" = OrderedDict()
         
     async def validate_template(self, template_path: str) -> Dict[str, Any]:
         """
@@ -67,26 +59,24 @@ class TemplateValidator:
             return result
             
         try:
-            # First, check syntax by attempting to load the template
-            try:
-                template = self.template_manager.env.get_template(template_path)
-            except TemplateSyntaxError as e:
+            # Parse once; syntax, security and parameter checks share the analysis
+            source = self.template_manager.env.loader.get_source(self.template_manager.env, template_path)[0]
+            analysis = self.template_manager.analyzer.analyze(source)
+            
+            if analysis.syntax_error is not None:
                 result["syntax_errors"].append({
-                    "line": e.lineno,
-                    "message": str(e)
+                    "line": analysis.syntax_error.lineno,
+                    "message": str(analysis.syntax_error)
                 })
                 return result
                 
-            # Get template source
-            source = self.template_manager.env.loader.get_source(self.template_manager.env, template_path)[0]
-            
             # Check for security issues
-            security_warnings = await self._check_security_issues(source)
+            security_warnings = [dict(finding) for finding in analysis.security_findings]
             if security_warnings:
                 result["security_warnings"] = security_warnings
                 
             # Check for parameter issues
-            param_warnings = await self._check_parameter_issues(template_path, source)
+            param_warnings = await self._check_parameter_issues(template_path, analysis)
             if param_warnings:
                 result["parameter_warnings"] = param_warnings
                 
@@ -110,74 +100,29 @@ class TemplateValidator:
         Returns:
             List of security warnings
         """
-        warnings = []
+        return [dict(finding) for finding in self.template_manager.analyzer.analyze(source).security_findings]
         
-        # Check each dangerous pattern
-        for pattern in self.dangerous_patterns:
-            matches = re.finditer(pattern, source, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                start_line = source[:match.start()].count('\n') + 1
-                context = source[max(0, match.start() - 20):min(len(source), match.end() + 20)]
-                
-                warnings.append({
-                    "line": start_line,
-                    "pattern": pattern,
-                    "match": match.group(0),
-                    "context": context.strip(),
-                    "severity": "high",
-                    "message": f"Potentially dangerous pattern found: {match.group(0)}"
-                })
-                
-        # Additional security checks
-        if re.search(r'eval\s*\(', source):
-            warnings.append({
-                "pattern": "eval",
-                "severity": "medium",
-                "message": "Use of eval() is discouraged for security reasons"
-            })
-            
-        if re.search(r'exec\s*\(', source):
-            warnings.append({
-                "pattern": "exec",
-                "severity": "medium",
-                "message": "Use of exec() is discouraged for security reasons"
-            })
-            
-        # Check for unvalidated input usage
-        if re.search(r'\{\{\s*params\..*\s*\}\}', source):
-            if not re.search(r'if\s+params\.', source):
-                warnings.append({
-                    "pattern": "unvalidated_params",
-                    "severity": "low",
-                    "message": "Template uses parameters without validation"
-                })
-                
-        return warnings
-        
-    async def _check_parameter_issues(self, template_path: str, source: str) -> List[Dict[str, Any]]:
+    async def _check_parameter_issues(self, template_path: str, analysis: TemplateAnalysis) -> List[Dict[str, Any]]:
         """
         Check template for parameter issues.
         
         Args:
             template_path: Path to template
-            source: Template source
+            analysis: Template analysis
             
         Returns:
             List of parameter warnings
         """
         warnings = []
         
-        # Parse template to get required variables
         try:
-            ast = self.template_manager.env.parse(source)
-            required_vars = meta.find_undeclared_variables(ast)
+            required_vars = analysis.undeclared_variables
             
             # Check for common typos in variable names
-            var_names = list(required_vars)
-            for i, var1 in enumerate(var_names):
-                for var2 in var_names[i+1:]:
-                    # Check for similar variable names using Levenshtein distance
-                    if var1 != var2 and self._levenshtein_distance(var1, var2) <= 2:
+            index = self._get_parameter_index(analysis.content_hash, required_vars)
+            for var1 in sorted(required_vars):
+                for _, var2 in index.search(var1, self.max_suggestion_distance):
+                    if var1 < var2:
                         warnings.append({
                             "param1": var1,
                             "param2": var2,
@@ -186,14 +131,12 @@ class TemplateValidator:
                         })
                         
             # Check for unused blocks in extension templates
-            if '{% extends' in source:
-                defined_blocks = re.findall(r'{%\s*block\s+([^\s%]+)[^%]*%}', source)
-                if not defined_blocks:
-                    warnings.append({
-                        "pattern": "no_blocks",
-                        "severity": "low",
-                        "message": "Template extends another template but defines no blocks"
-                    })
+            if analysis.extends and not analysis.blocks:
+                warnings.append({
+                    "pattern": "no_blocks",
+                    "severity": "low",
+                    "message": "Template extends another template but defines no blocks"
+                })
                     
             # Check for inconsistent variable naming
             camel_case = sum(1 for v in required_vars if re.match(r'^[a-z]+([A-Z][a-z]+)+$', v))
@@ -285,11 +228,23 @@ class TemplateValidator:
                     value = value.get(parts[i])
                     
             # Check for unexpected parameters
+            required_roots = {req.split('.')[0] for req in required_params}
             provided_params = list(parameters.keys())
             for param in provided_params:
-                if param not in required_params and not any(req.startswith(f"{param}.") for req in required_params):
+                if param not in required_params and param not in required_roots:
                     result["unexpected_parameters"].append(param)
                     
+            # Suggest required names for unexpected ones that look like typos
+            if result["unexpected_parameters"]:
+                index = self._get_parameter_index(template_path, required_roots)
+                suggestions = {}
+                for param in result["unexpected_parameters"]:
+                    matches = [name for _, name in index.search(param, self.max_suggestion_distance)]
+                    if matches:
+                        suggestions[param] = matches
+                if suggestions:
+                    result["suggestions"] = suggestions
+                    
             # Template is valid if there are no missing parameters
             result["valid"] = len(result["missing_parameters"]) == 0
             
@@ -300,31 +255,25 @@ class TemplateValidator:
             result["error"] = str(e)
             return result
             
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
+    def _get_parameter_index(self, key: str, names: Set[str]) -> NGramIndex:
         """
-        Calculate Levenshtein distance between two strings.
+        Get the fuzzy-match index of a template's parameter names, rebuilding it if they changed.
         
         Args:
-            s1: First string
-            s2: Second string
+            key: Template path or content hash
+            names: Parameter names
             
         Returns:
-            Levenshtein distance
+            Bigram index over the names
         """
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-            
-        if len(s2) == 0:
-            return len(s1)
-            
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-            
-        return previous_row[-1]
\ No newline at end of file
+        names = frozenset(names)
+        cached = self._parameter_indexes.get(key)
+        if cached is not None and cached[0] == names:
+            self._parameter_indexes.move_to_end(key)
+            return cached[1]
+        cached = (names, NGramIndex(sorted(names)))
+        self._parameter_indexes[key] = cached
+        self._parameter_indexes.move_to_end(key)
+        while len(self._parameter_indexes) > self.max_parameter_indexes:
+            self._parameter_indexes.popitem(last=False)
+        return cached[1]
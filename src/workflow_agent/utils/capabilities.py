@@ -0,0 +1,323 @@
+"""
+Process-wide registry of cached capability probes (tools, package managers, runtimes).
+"""
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+CACHE_FORMAT_VERSION = 1
+
+SyncProbe = Callable[[], bool]
+AsyncProbe = Callable[[], Awaitable[bool]]
+
+def _probe_command(command: str) -> bool:
+    return shutil.which(command) is not None
+
+def _probe_module(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Probes resolved from the capability name prefix, e.g. "command:shellcheck"
+BUILTIN_PROBES: Dict[str, Callable[[str], bool]] = {
+    "command": _probe_command,
+    "module": _probe_module,
+}
+
+def _environment_fingerprint() -> str:
+    """Fingerprint of what command lookups depend on; persisted results from another PATH are ignored."""
+    return hashlib.sha256(os.environ.get("PATH", "").encode()).hexdigest()[:16]
+
+class _InFlight:
+    """A running probe that threads and coroutines can wait for."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def wait(self) -> None:
+        self._event.wait()
+
+    async def wait_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._event.is_set():
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        await future
+
+    def set(self) -> None:
+        with self._lock:
+            self._event.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class CapabilityRegistry:
+    """
+    Caches whether capabilities are available, probing each at most once per TTL.
+
+    Names of the form "command:<name>" and "module:<name>" are probed with
+    shutil.which and importlib; other names need a probe passed on first use.
+    Concurrent checks of the same name share one probe.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, cache_path: Optional[str] = None, max_workers: int = 8):
+        """
+        Initialize the registry.
+
+        Args:
+            ttl: Seconds a probe result is trusted
+            cache_path: JSON file results are persisted to, None to keep them in memory only
+            max_workers: Threads used to run probes in parallel
+        """
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.probes = 0
+        self._results: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._fingerprint = _environment_fingerprint()
+        if cache_path:
+            self._load()
+
+    def _fresh(self, name: str) -> Optional[bool]:
+        entry = self._results.get(name)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def _resolve_probe(self, name: str, probe: Optional[SyncProbe]) -> SyncProbe:
+        if probe is not None:
+            return probe
+        kind, _, argument = name.partition(":")
+        builtin = BUILTIN_PROBES.get(kind)
+        if builtin is None or not argument:
+            raise ValueError(f"No probe for capability {name}")
+        return lambda: builtin(argument)
+
+    def _store(self, name: str, available: bool) -> None:
+        with self._lock:
+            self._results[name] = (available, time.time())
+            self.probes += 1
+        if self.cache_path:
+            self._save()
+
+    def check(self, name: str, probe: Optional[SyncProbe] = None) -> bool:
+        """
+        Check whether a capability is available.
+
+        Args:
+            name: Capability name
+            probe: Probe used when the name has no built-in probe
+
+        Returns:
+            True if the capability is available
+        """
+        while True:
+            cached, in_flight, owner = self._claim(name)
+            if cached is not None:
+                return cached
+            if not owner:
+                # Another thread is probing; use its result
+                in_flight.wait()
+                continue
+
+            try:
+                probe = self._resolve_probe(name, probe)
+                try:
+                    available = bool(probe())
+                except Exception as e:
+                    logger.debug(f"Capability probe {name} failed: {e}")
+                    available = False
+                self._store(name, available)
+                return available
+            finally:
+                self._release(name, in_flight)
+
+    def _claim(self, name: str) -> Tuple[Optional[bool], Optional[_InFlight], bool]:
+        """Get a fresh result, or the running probe of a name and whether the caller must run it."""
+        with self._lock:
+            cached = self._fresh(name)
+            if cached is not None:
+                return cached, None, False
+            in_flight = self._in_flight.get(name)
+            if in_flight is not None:
+                return None, in_flight, False
+            in_flight = self._in_flight[name] = _InFlight()
+            return None, in_flight, True
+
+    def _release(self, name: str, in_flight: _InFlight) -> None:
+        with self._lock:
+            self._in_flight.pop(name, None)
+        in_flight.set()
+
+    def check_many(self, names: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check several capabilities, probing uncached ones in parallel.
+
+        Args:
+            names: Capability names with built-in probes
+
+        Returns:
+            Dictionary mapping names to availability
+        """
+        names = list(dict.fromkeys(names))
+        with self._lock:
+            missing = [name for name in names if self._fresh(name) is None]
+        if len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                list(pool.map(self.check, missing))
+        return {name: self.check(name) for name in names}
+
+    async def check_async(self, name: str, probe: Optional[Union[SyncProbe, AsyncProbe]] = None) -> bool:
+        """
+        Check a capability without blocking the event loop.
+
+        Args:
+            name: Capability name
+            probe: Sync or async probe used when the name has no built-in probe
+
+        Returns:
+            True if the capability is available
+        """
+        if probe is None or not asyncio.iscoroutinefunction(probe):
+            with self._lock:
+                cached = self._fresh(name)
+            if cached is not None:
+                return cached
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(self.check, name, probe))
+
+        while True:
+            cached, in_flight, owner = self._claim(name)
+            if cached is not None:
+                return cached
+            if not owner:
+                # Another thread or task is probing; use its result
+                await in_flight.wait_async()
+                continue
+
+            try:
+                try:
+                    available = bool(await probe())
+                except Exception as e:
+                    logger.debug(f"Capability probe {name} failed: {e}")
+                    available = False
+                self._store(name, available)
+                return available
+            finally:
+                self._release(name, in_flight)
+
+    async def check_many_async(self, names: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check several capabilities concurrently without blocking the event loop.
+
+        Args:
+            names: Capability names with built-in probes
+
+        Returns:
+            Dictionary mapping names to availability
+        """
+        names = list(dict.fromkeys(names))
+        results = await asyncio.gather(*(self.check_async(name) for name in names))
+        return dict(zip(names, results))
+
+    def has_command(self, command: str) -> bool:
+        """
+        Check whether a command is on the PATH.
+
+        Args:
+            command: Command name
+
+        Returns:
+            True if the command is available
+        """
+        return self.check(f"command:{command}")
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Forget cached results.
+
+        Args:
+            name: Capability to forget, None for all
+        """
+        with self._lock:
+            if name is None:
+                self._results.clear()
+            else:
+                self._results.pop(name, None)
+        if self.cache_path:
+            self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable capability cache {self.cache_path}: {e}")
+            return
+        if data.get("version") != CACHE_FORMAT_VERSION or data.get("fingerprint") != self._fingerprint:
+            return
+        for name, entry in data.get("results", {}).items():
+            self._results[name] = (bool(entry["available"]), float(entry["checked_at"]))
+
+    def _save(self) -> None:
+        with self._lock:
+            data = {
+                "version": CACHE_FORMAT_VERSION,
+                "fingerprint": self._fingerprint,
+                "results": {
+                    name: {"available": available, "checked_at": checked_at}
+                    for name, (available, checked_at) in self._results.items()
+                }
+            }
+        try:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist capability cache {self.cache_path}: {e}")
+
+_registry: Optional[CapabilityRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_capability_registry() -> CapabilityRegistry:
+    """
+    Get the registry shared by the whole process.
+
+    Results are persisted to $WORKFLOW_CAPABILITY_CACHE when it is set.
+
+    Returns:
+        Shared capability registry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CapabilityRegistry(cache_path=os.environ.get("WORKFLOW_CAPABILITY_CACHE"))
+        return _registry
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Union
 from enum import Enum
 from ..error.exceptions import PlatformError, ErrorContext
+from .capabilities import get_capability_registry
 
 class PlatformType(Enum):
     """Supported platform types."""
@@ -214,13 +215,14 @@ class PlatformManager:
             "winget": False
         }
         
+        available = get_capability_registry().check_many(f"command:{pm}" for pm in package_managers)
         for pm in package_managers:
-            package_managers[pm] = shutil.which(pm) is not None
+            package_managers[pm] = available[f"command:{pm}"]
             
         # Special case for Windows package managers
         if self._platform_type == PlatformType.WINDOWS:
             package_managers["choco"] = os.path.exists("C:\\ProgramData\\chocolatey\\choco.exe")
-            package_managers["winget"] = shutil.which("winget.exe") is not None
+            package_managers["winget"] = get_capability_registry().has_command("winget.exe")
         
         return package_managers
 
@@ -0,0 +1,277 @@
+"""
+Persistent bash coprocess for running many short commands without a new shell each.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import re
+import signal
+import threading
+import uuid
+from typing import List, Optional, Set, Tuple
+
+from .subprocess_utils import DEFAULT_OUTPUT_HEAD_SIZE, DEFAULT_OUTPUT_TAIL_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMAND_TIMEOUT = 30
+# Workers per pool; matches the default batch concurrency
+DEFAULT_POOL_SIZE = 4
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Requests are "<token>\n<command lines>\n<token>\n". Each command runs in a
+# subshell with stdin from /dev/null, then the token is printed on stderr and
+# "<token> <exit code>" on stdout, each after a newline that is not output.
+_WORKER_LOOP = r"""
+while IFS= read -r __wa_token; do
+  __wa_cmd=
+  while IFS= read -r __wa_line; do
+    [ "$__wa_line" = "$__wa_token" ] && break
+    __wa_cmd+="$__wa_line"$'\n'
+  done
+  ( eval "$__wa_cmd" ) </dev/null
+  __wa_rc=$?
+  printf '\n%s\n' "$__wa_token" >&2
+  printf '\n%s %d\n' "$__wa_token" "$__wa_rc"
+done
+"""
+
+class ShellWorker:
+    """
+    Long-lived bash process that runs short commands one at a time.
+
+    Commands see a fresh subshell, so `exit`, `cd` and variables do not leak
+    between them, but no process is exec'd and no shell initialized per
+    command. A command that times out kills the worker's process group; the
+    next command starts a new worker.
+    """
+
+    def __init__(self,
+                shell: str = "bash",
+                default_timeout: float = DEFAULT_COMMAND_TIMEOUT,
+                head_size: int = DEFAULT_OUTPUT_HEAD_SIZE,
+                tail_size: int = DEFAULT_OUTPUT_TAIL_SIZE):
+        """
+        Initialize the worker; the shell is started on first use.
+
+        Args:
+            shell: Bash executable
+            default_timeout: Timeout in seconds for commands that do not give one
+            head_size: Bytes kept from the start of each output stream of a command
+            tail_size: Bytes kept from the end of each output stream of a command
+        """
+        self.shell = shell
+        self.default_timeout = default_timeout
+        self.head_size = head_size
+        self.tail_size = max(tail_size, 1024)
+        self.busy = False
+        self.commands = 0
+        self.starts = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Workers outlive event loops; asyncio primitives and transports must not
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            if self._process is not None:
+                self._kill()
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        if self._process is not None and self._process.returncode is None:
+            return self._process
+        self._process = await asyncio.create_subprocess_exec(
+            self.shell, "--noprofile", "--norc", "-c", _WORKER_LOOP,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        _live_workers.add(self._process.pid)
+        self.starts += 1
+        logger.debug(f"Started shell worker {self._process.pid}")
+        return self._process
+
+    def _kill(self) -> None:
+        """Kill the worker and any command it is running."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        _live_workers.discard(process.pid)
+        if process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    async def _read_frame(self, stream: asyncio.StreamReader, end: "re.Pattern") -> Tuple[bytes, "re.Match"]:
+        """Read a stream up to its end marker, keeping a bounded head and tail of the output."""
+        head: Optional[bytes] = None
+        buffer = bytearray()
+        dropped = 0
+        while True:
+            chunk = await stream.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("shell worker exited")
+            buffer += chunk
+            match = end.search(buffer, max(0, len(buffer) - 128))
+            if match:
+                body = bytes(buffer[:match.start()])
+                if head is None:
+                    return body, match
+                marker = f"\n... [{dropped} bytes truncated] ...\n".encode() if dropped else b""
+                return head + marker + body, match
+            if head is None and len(buffer) > self.head_size + self.tail_size:
+                head = bytes(buffer[:self.head_size])
+                del buffer[:self.head_size]
+            # Trimming only past twice the tail keeps the copying linear
+            if head is not None and len(buffer) > 2 * self.tail_size:
+                excess = len(buffer) - self.tail_size
+                del buffer[:excess]
+                dropped += excess
+
+    async def run(self, command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """
+        Run a command in the worker.
+
+        Args:
+            command: Shell command or script
+            timeout: Timeout in seconds, None for the default timeout
+
+        Returns:
+            Tuple of (exit_code, stdout, stderr); exit code 124 if the command timed out
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        self.busy = True
+        try:
+            return await self._run(command, timeout)
+        finally:
+            self.busy = False
+
+    async def _run(self, command: str, timeout: float) -> Tuple[int, str, str]:
+        async with self._get_lock():
+            process = await self._ensure_started()
+            token = f"__wa_{uuid.uuid4().hex}"
+            stdout_end = re.compile(rb"\n" + token.encode() + rb" (\d+)\n$")
+            stderr_end = re.compile(rb"\n" + token.encode() + rb"\n$")
+            try:
+                process.stdin.write(f"{token}\n{command}\n{token}\n".encode())
+                await process.stdin.drain()
+                (stdout, match), (stderr, _) = await asyncio.wait_for(
+                    asyncio.gather(
+                        self._read_frame(process.stdout, stdout_end),
+                        self._read_frame(process.stderr, stderr_end)
+                    ),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Command timed out after {timeout} seconds in shell worker; restarting it")
+                self._kill()
+                return 124, "", f"Command timed out after {timeout} seconds"
+            except (EOFError, ConnectionError) as e:
+                self._kill()
+                return 1, "", f"Shell worker failed: {e}"
+            except BaseException:
+                # Cancelled mid-frame: the rest of the frame would leak into the next command
+                self._kill()
+                raise
+            self.commands += 1
+            return (
+                int(match.group(1)),
+                stdout.decode(errors="replace"),
+                stderr.decode(errors="replace")
+            )
+
+    async def close(self) -> None:
+        """Stop the worker."""
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None and process.stdin is not None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except (asyncio.TimeoutError, RuntimeError):
+                pass
+        self._kill()
+
+class ShellWorkerPool:
+    """
+    Fixed set of shell workers so concurrent checks do not queue behind one shell.
+
+    Each command runs in an idle worker; workers start on first use and a
+    command that times out only restarts its own worker.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, **worker_options):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of workers
+            worker_options: ShellWorker settings
+        """
+        self.workers: List[ShellWorker] = [ShellWorker(**worker_options) for _ in range(max(1, size))]
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(len(self.workers))
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, command: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """
+        Run a command in an idle worker, waiting for one if all are busy.
+
+        Args:
+            command: Shell command or script
+            timeout: Timeout in seconds, None for the default timeout
+
+        Returns:
+            Tuple of (exit_code, stdout, stderr); exit code 124 if the command timed out
+        """
+        async with self._get_semaphore():
+            # Started workers first, so idle shells are reused before new ones start
+            idle = [worker for worker in self.workers if not worker.busy]
+            worker = next((w for w in idle if w._process is not None), idle[0])
+            return await worker.run(command, timeout)
+
+    async def close(self) -> None:
+        """Stop every worker."""
+        for worker in self.workers:
+            await worker.close()
+
+_pool: Optional[ShellWorkerPool] = None
+_pool_lock = threading.Lock()
+_live_workers: Set[int] = set()
+
+def get_shell_pool() -> ShellWorkerPool:
+    """
+    Get the worker pool shared by the whole process.
+
+    Returns:
+        Shared shell worker pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShellWorkerPool()
+        return _pool
+
+@atexit.register
+def _kill_live_workers() -> None:
+    """Kill shell workers left running when the process exits."""
+    for pid in list(_live_workers):
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    _live_workers.clear()
@@ -7,10 +7,442 @@ import subprocess
 import shlex
 import platform
 import asyncio
-from typing import Dict, Any, Optional, List, Union, Tuple
+import codecs
+import gzip
+import json
+import signal
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Union, Tuple, Callable
 
 logger = logging.getLogger(__name__)
 
+# Output kept in memory per stream: a head from the start and a tail from the end
+DEFAULT_OUTPUT_HEAD_SIZE = 256 * 1024
+DEFAULT_OUTPUT_TAIL_SIZE = 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+# Longest line kept whole; longer runs without a newline are added as fragments
+MAX_LINE_LENGTH = 256 * 1024
+# Fast compression; spill files are written while the process runs
+SPILL_COMPRESSLEVEL = 1
+SPILL_PREFIX = "workflow-output-"
+SPILL_SUFFIX = ".log.gz"
+# Full logs kept per directory; older ones are removed when a new log is started
+DEFAULT_SPILL_MAX_FILES = 100
+DEFAULT_SPILL_MAX_AGE = 7 * 24 * 3600
+
+OutputCallback = Callable[[str, str], None]
+
+class BoundedText:
+    """
+    Text kept as a bounded head and tail, dropping the middle once both are full.
+    """
+    
+    def __init__(self, head_size: int = DEFAULT_OUTPUT_HEAD_SIZE, tail_size: int = DEFAULT_OUTPUT_TAIL_SIZE):
+        """
+        Initialize the buffer.
+        
+        Args:
+            head_size: Characters kept from the start
+            tail_size: Characters kept from the end
+        """
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.size = 0
+        self.dropped = 0
+        self._head: List[str] = []
+        self._head_len = 0
+        self._tail: deque = deque()
+        self._tail_len = 0
+        
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+        
+    def append(self, text: str) -> None:
+        """
+        Append text.
+        
+        Args:
+            text: Text to append
+        """
+        self.size += len(text)
+        if not self._tail and self._head_len < self.head_size:
+            room = self.head_size - self._head_len
+            self._head.append(text[:room])
+            self._head_len += min(room, len(text))
+            text = text[room:]
+            if not text:
+                return
+                
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail_len > self.tail_size:
+            excess = self._tail_len - self.tail_size
+            first = self._tail[0]
+            if len(first) <= excess:
+                self._tail.popleft()
+                self._tail_len -= len(first)
+                self.dropped += len(first)
+            else:
+                self._tail[0] = first[excess:]
+                self._tail_len -= excess
+                self.dropped += excess
+                
+    def text(self, log_path: Optional[str] = None) -> str:
+        """
+        Get the kept text, marking where output was dropped.
+        
+        Args:
+            log_path: Path of the full log to mention in the marker
+            
+        Returns:
+            Head and tail text
+        """
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if not self.dropped:
+            return head + tail
+        marker = f"\n... [{self.dropped} characters truncated"
+        if log_path:
+            marker += f", full output in {log_path}"
+        return f"{head}{marker}] ...\n{tail}"
+
+def prune_output_logs(directory: str, max_files: int = DEFAULT_SPILL_MAX_FILES, max_age: Optional[float] = DEFAULT_SPILL_MAX_AGE) -> int:
+    """
+    Remove full output logs that are too old or beyond the newest max_files.
+    
+    Args:
+        directory: Directory holding the logs
+        max_files: Number of most recent logs to keep
+        max_age: Seconds a log is kept, None to keep logs regardless of age
+        
+    Returns:
+        Number of logs removed
+    """
+    try:
+        entries = [
+            entry for entry in os.scandir(directory)
+            if entry.name.startswith(SPILL_PREFIX) and entry.name.endswith(SPILL_SUFFIX) and entry.is_file()
+        ]
+    except OSError:
+        return 0
+    logs = []
+    for entry in entries:
+        try:
+            logs.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+    logs.sort(reverse=True)
+    cutoff = time.time() - max_age if max_age is not None else None
+    removed = 0
+    for index, (mtime, path) in enumerate(logs):
+        if index < max_files and (cutoff is None or mtime >= cutoff):
+            continue
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError as e:
+            logger.debug(f"Cannot remove output log {path}: {e}")
+    return removed
+
+class OutputCapture:
+    """
+    Bounded capture of a process's stdout and stderr.
+    
+    Lines are passed to an optional callback as they arrive. Once the output
+    outgrows what is kept in memory, the full interleaved log is written to a
+    gzip file, with stderr lines prefixed by "[stderr] ". Starting a log
+    prunes the spill directory down to the retention limits.
+    """
+    
+    def __init__(self, 
+                head_size: int = DEFAULT_OUTPUT_HEAD_SIZE, 
+                tail_size: int = DEFAULT_OUTPUT_TAIL_SIZE,
+                spill_dir: Optional[str] = None,
+                on_output: Optional[OutputCallback] = None,
+                spill_max_files: int = DEFAULT_SPILL_MAX_FILES,
+                spill_max_age: Optional[float] = DEFAULT_SPILL_MAX_AGE):
+        """
+        Initialize the capture.
+        
+        Args:
+            head_size: Characters kept from the start of each stream
+            tail_size: Characters kept from the end of each stream
+            spill_dir: Directory for the compressed full log, None to disable spilling
+            on_output: Callback receiving (stream name, line) for each line
+            spill_max_files: Earlier full logs kept in the spill directory
+            spill_max_age: Seconds earlier full logs are kept, None for no age limit
+        """
+        self.stdout = BoundedText(head_size, tail_size)
+        self.stderr = BoundedText(head_size, tail_size)
+        self.spill_dir = spill_dir
+        self.on_output = on_output
+        self.spill_max_files = spill_max_files
+        self.spill_max_age = spill_max_age
+        self.log_path: Optional[str] = None
+        self._spill = None
+        self._pending: List[str] = []
+        self._pending_len = 0
+        self._spill_threshold = head_size + tail_size
+        
+    @property
+    def truncated(self) -> bool:
+        return self.stdout.truncated or self.stderr.truncated
+        
+    def add(self, stream: str, line: str) -> None:
+        """
+        Add a line of output.
+        
+        Args:
+            stream: "stdout" or "stderr"
+            line: Line including its newline, if any
+        """
+        (self.stderr if stream == "stderr" else self.stdout).append(line)
+        if self.spill_dir is not None:
+            self._write_log(line if stream != "stderr" else f"[stderr] {line}")
+        if self.on_output is not None:
+            try:
+                self.on_output(stream, line)
+            except Exception as e:
+                logger.warning(f"Output callback failed: {e}")
+                
+    def _write_log(self, text: str) -> None:
+        if self._spill is not None:
+            self._spill.write(text)
+            return
+        self._pending.append(text)
+        self._pending_len += len(text)
+        if self._pending_len > self._spill_threshold:
+            self._open_spill()
+            
+    def _open_spill(self) -> None:
+        """Start the compressed full log with the output buffered so far."""
+        pending, self._pending, self._pending_len = self._pending, [], 0
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            prune_output_logs(self.spill_dir, self.spill_max_files, self.spill_max_age)
+            fd, self.log_path = tempfile.mkstemp(prefix=SPILL_PREFIX, suffix=SPILL_SUFFIX, dir=self.spill_dir)
+            os.close(fd)
+            self._spill = gzip.open(self.log_path, "wt", encoding="utf-8", compresslevel=SPILL_COMPRESSLEVEL)
+        except OSError as e:
+            logger.warning(f"Cannot write output log to {self.spill_dir}: {e}")
+            self.spill_dir = None
+            self.log_path = None
+            return
+        self._spill.writelines(pending)
+        
+    def close(self) -> None:
+        """Flush and close the full log, if one was written."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._pending = []
+        
+    def stdout_text(self) -> str:
+        return self.stdout.text(self.log_path)
+        
+    def stderr_text(self) -> str:
+        return self.stderr.text(self.log_path)
+
+async def _pump_stream(stream: asyncio.StreamReader, name: str, capture: OutputCapture) -> None:
+    """
+    Read a process stream in chunks and add it to a capture line by line.
+    
+    Lines longer than MAX_LINE_LENGTH are added in fragments, so memory and
+    time stay linear for output without newlines.
+    
+    Args:
+        stream: Process stdout or stderr
+        name: "stdout" or "stderr"
+        capture: Capture receiving the lines
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # Pieces of the unterminated last line, joined only once it ends or gets too long
+    partial: List[str] = []
+    partial_len = 0
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        end = text.rfind("\n")
+        if end == -1:
+            partial.append(text)
+            partial_len += len(text)
+            if partial_len >= MAX_LINE_LENGTH:
+                # Output without newlines (progress bars, binary data) is passed on in fragments
+                capture.add(name, "".join(partial))
+                partial, partial_len = [], 0
+            continue
+        partial.append(text[:end])
+        for line in "".join(partial).split("\n"):
+            capture.add(name, line + "\n")
+        rest = text[end + 1:]
+        partial, partial_len = ([rest], len(rest)) if rest else ([], 0)
+    partial.append(decoder.decode(b"", final=True))
+    rest = "".join(partial)
+    if rest:
+        capture.add(name, rest)
+
+async def stream_process_output(
+    process: asyncio.subprocess.Process,
+    capture: OutputCapture,
+    timeout: Optional[float] = None
+) -> int:
+    """
+    Consume stdout and stderr of a process concurrently until it exits.
+    
+    Args:
+        process: Process started with stdout and stderr pipes
+        capture: Capture receiving the output
+        timeout: Timeout in seconds
+        
+    Returns:
+        Process exit code
+        
+    Raises:
+        asyncio.TimeoutError: If the process does not finish in time; output
+            read so far stays in the capture
+    """
+    readers = []
+    if process.stdout is not None:
+        readers.append(_pump_stream(process.stdout, "stdout", capture))
+    if process.stderr is not None:
+        readers.append(_pump_stream(process.stderr, "stderr", capture))
+    try:
+        await asyncio.wait_for(asyncio.gather(*readers, process.wait()), timeout=timeout)
+    finally:
+        capture.close()
+    return process.returncode
+
+# Runs a command under resource limits and reports its wait4() resource usage.
+# Kept dependency-free so it starts quickly with `python -I -S`.
+_LIMITED_LAUNCHER = """
+import json, os, resource, subprocess, sys
+usage_path, limits = sys.argv[1], json.loads(sys.argv[2])
+def apply_limits():
+    for name, value in limits.items():
+        limit = getattr(resource, name)
+        hard = resource.getrlimit(limit)[1]
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(limit, (value, value))
+try:
+    child = subprocess.Popen(sys.argv[3:], preexec_fn=apply_limits)
+except OSError as e:
+    sys.stderr.write(f"{sys.argv[3]}: {e}\\n")
+    sys.exit(127)
+_, status, usage = os.wait4(child.pid, 0)
+with open(usage_path, "w") as f:
+    json.dump({"utime": usage.ru_utime, "stime": usage.ru_stime, "maxrss": usage.ru_maxrss}, f)
+sys.exit(128 + os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status))
+"""
+
+@dataclass
+class ResourceLimits:
+    """Per-process limits applied to a script and everything it starts; None leaves a limit unchanged."""
+    cpu_seconds: Optional[int] = None
+    memory_bytes: Optional[int] = None
+    open_files: Optional[int] = None
+    file_size_bytes: Optional[int] = None
+    
+    def as_rlimits(self) -> Dict[str, int]:
+        """
+        Get the limits as resource module constant names.
+        
+        Returns:
+            Dictionary mapping RLIMIT_* names to values
+        """
+        rlimits = {
+            "RLIMIT_CPU": self.cpu_seconds,
+            "RLIMIT_AS": self.memory_bytes,
+            "RLIMIT_NOFILE": self.open_files,
+            "RLIMIT_FSIZE": self.file_size_bytes
+        }
+        return {name: value for name, value in rlimits.items() if value is not None}
+
+@dataclass
+class ResourceUsage:
+    """Resources used by a finished process and the children it waited for."""
+    user_time: float
+    system_time: float
+    max_rss: int
+    
+    @property
+    def cpu_time(self) -> float:
+        return self.user_time + self.system_time
+
+def build_limited_command(argv: List[str], limits: Optional[ResourceLimits], usage_path: str) -> List[str]:
+    """
+    Wrap a command so it runs under resource limits and reports its resource usage.
+    
+    The wrapped command exits with the command's exit code (128 + signal number
+    if it was killed) and writes its usage to usage_path. POSIX only.
+    
+    Args:
+        argv: Command and arguments
+        limits: Resource limits, None for no limits
+        usage_path: File the usage is written to once the command exits
+        
+    Returns:
+        Wrapped command
+    """
+    rlimits = limits.as_rlimits() if limits else {}
+    return [sys.executable, "-I", "-S", "-c", _LIMITED_LAUNCHER, usage_path, json.dumps(rlimits), *argv]
+
+def read_resource_usage(usage_path: str) -> Optional[ResourceUsage]:
+    """
+    Read the usage written by a command from build_limited_command.
+    
+    Args:
+        usage_path: File passed to build_limited_command
+        
+    Returns:
+        Resource usage with max_rss in bytes, or None if the command did not report any
+    """
+    try:
+        with open(usage_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # ru_maxrss is in kilobytes except on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return ResourceUsage(
+        user_time=float(data["utime"]),
+        system_time=float(data["stime"]),
+        max_rss=int(data["maxrss"]) * scale
+    )
+
+async def kill_process_group(process: asyncio.subprocess.Process, grace_period: float = 5) -> None:
+    """
+    Terminate a process started with start_new_session=True and every process in its group.
+    
+    The group is sent SIGTERM, then SIGKILL if the leader has not exited after
+    the grace period. Children are killed even if the leader already exited.
+    
+    Args:
+        process: Session leader process
+        grace_period: Seconds to wait between SIGTERM and SIGKILL
+    """
+    def signal_group(sig: int) -> None:
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+            
+    signal_group(signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=grace_period)
+    except asyncio.TimeoutError:
+        pass
+    signal_group(signal.SIGKILL)
+    if process.returncode is None:
+        await process.wait()
+
 def secure_join_args(args: List[str]) -> str:
     """
     Securely join command arguments to prevent command injection.
@@ -107,17 +539,21 @@ async def async_secure_shell_execute(
     shell: bool = False, 
     env: Optional[Dict[str, str]] = None,
     cwd: Optional[str] = None,
-    timeout: Optional[int] = None
+    timeout: Optional[int] = None,
+    capture: Optional[OutputCapture] = None
 ) -> Tuple[int, str, str]:
     """
     Execute a shell command securely with asyncio.
     
+    Output is streamed into a bounded capture rather than buffered whole.
+    
     Args:
         command: Command to execute as string or list of arguments
         shell: Whether to use shell execution
         env: Environment variables
         cwd: Working directory
         timeout: Command timeout in seconds
+        capture: Output capture to use, a default bounded capture if None
         
     Returns:
         Tuple of (exit_code, stdout, stderr)
@@ -161,11 +597,9 @@ async def async_secure_shell_execute(
                 cwd=cwd
             )
         
+        capture = capture or OutputCapture()
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), 
-                timeout=timeout
-            )
+            exit_code = await stream_process_output(process, capture, timeout)
         except asyncio.TimeoutError:
             # Kill the process if it times out
             try:
@@ -178,9 +612,8 @@ async def async_secure_shell_execute(
             logger.error(f"Command timed out after {timeout} seconds: {cmd_str}")
             return 124, "", f"Command timed out after {timeout} seconds"
             
-        stdout_str = stdout.decode('utf-8', errors='replace')
-        stderr_str = stderr.decode('utf-8', errors='replace')
-        exit_code = process.returncode
+        stdout_str = capture.stdout_text()
+        stderr_str = capture.stderr_text()
         
         if exit_code != 0:
             logger.warning(f"Command exited with non-zero code {exit_code}: {cmd_str}")
@@ -202,24 +635,5 @@ def is_command_available(command: str) -> bool:
     Returns:
         True if command is available, False otherwise
     """
-    try:
-        import shutil
-        return shutil.which(command) is not None
-    except ImportError:
-        try:
-            if platform.system() == 'Windows':
-                cmd = f'where {command}'
-            else:
-                cmd = f'which {command}'
-                
-            process = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            return process.returncode == 0
-        except Exception:
-            return False
+    from .capabilities import get_capability_registry
+    return get_capability_registry().has_command(command)
@@ -9,6 +9,8 @@ import uuid
 import json
 from typing import Dict, Any
 
+from .capabilities import get_capability_registry
+
 def get_system_context() -> Dict[str, Any]:
     """
     Get information about the system environment.
@@ -96,35 +98,15 @@ def detect_package_managers() -> Dict[str, bool]:
     # Check if we're on Windows
     is_windows = platform.system().lower() == "windows"
     
-    # Always check pip since we're running Python
-    try:
-        import subprocess
-        subprocess.check_output([sys.executable, "-m", "pip", "--version"])
-        package_managers["pip"] = True
-    except Exception:
-        pass
-    
-    if is_windows:
-        # Check Windows package managers
-        for cmd in ["choco", "winget"]:
-            try:
-                subprocess.check_output(["where", cmd], stderr=subprocess.DEVNULL)
-                package_managers[cmd] = True
-            except Exception:
-                pass
-    else:
-        # Check Unix package managers
-        for cmd in ["npm", "apt", "apt-get", "yum", "dnf", "pacman", "brew"]:
-            try:
-                subprocess.check_output(["which", cmd], stderr=subprocess.DEVNULL)
-                
-                # Map apt-get to apt
-                if cmd == "apt-get":
-                    package_managers["apt"] = True
-                else:
-                    package_managers[cmd] = True
-            except Exception:
-                pass
+    # pip ships as a module of the running Python; the rest are commands on the PATH
+    commands = ["choco", "winget"] if is_windows else ["npm", "apt", "apt-get", "yum", "dnf", "pacman", "brew"]
+    registry = get_capability_registry()
+    available = registry.check_many(["module:pip"] + [f"command:{cmd}" for cmd in commands])
+    package_managers["pip"] = available["module:pip"]
+    for cmd in commands:
+        if available[f"command:{cmd}"]:
+            # Map apt-get to apt
+            package_managers["apt" if cmd == "apt-get" else cmd] = True
     
     return package_managers
 
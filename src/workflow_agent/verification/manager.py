@@ -34,7 +34,8 @@ class VerificationStep:
         category: str = "general",
         importance: str = "medium",
         verification_type: str = "existence",
-        reasoning: Optional[str] = None
+        reasoning: Optional[str] = None,
+        idempotent: Optional[bool] = None
     ):
         """
         Initialize verification step with enhanced metadata.
@@ -50,6 +51,8 @@ class VerificationStep:
             importance: Importance level ("high", "medium", "low")
             verification_type: Type of verification ("existence", "content", "status", "connectivity")
             reasoning: Reasoning for including this step
+            idempotent: Whether the script only reads state, so recent results may be reused
+                (None to look for a "# workflow-agent: read-only" marker in the script)
         """
         self.name = name
         self.description = description
@@ -61,6 +64,7 @@ class VerificationStep:
         self.importance = importance
         self.verification_type = verification_type
         self.reasoning = reasoning
+        self.idempotent = idempotent
         self.result = None
         self.executed_at = None
         self.duration_ms = None
@@ -78,6 +82,7 @@ class VerificationStep:
             "importance": self.importance,
             "verification_type": self.verification_type,
             "reasoning": self.reasoning,
+            "idempotent": self.idempotent,
             "result": self.result,
             "executed_at": self.executed_at.isoformat() if self.executed_at else None,
             "duration_ms": self.duration_ms
@@ -96,7 +101,8 @@ class VerificationStep:
             category=data.get("category", "general"),
             importance=data.get("importance", "medium"),
             verification_type=data.get("verification_type", "existence"),
-            reasoning=data.get("reasoning")
+            reasoning=data.get("reasoning"),
+            idempotent=data.get("idempotent")
         )
 
 class VerificationManager:
@@ -15,12 +15,24 @@ import asyncio
 from ..core.state import WorkflowState, Change
 from ..error.exceptions import VerificationError
 from ..error.handler import ErrorHandler, handle_safely_async
+from ..utils.shell_worker import get_shell_pool
+from ..utils.capabilities import get_capability_registry
+from .system_snapshot import SystemSnapshot
 
 logger = logging.getLogger(__name__)
 
 class PlatformVerifier:
     """Base class for platform-specific verification."""
     
+    def __init__(self, snapshot: Optional[SystemSnapshot] = None):
+        """
+        Initialize the verifier.
+        
+        Args:
+            snapshot: Process, port and package view shared by checks
+        """
+        self.snapshot = snapshot or SystemSnapshot()
+    
     @classmethod
     def create(cls) -> 'PlatformVerifier':
         """Factory method to create appropriate verifier for current platform."""
@@ -74,6 +86,10 @@ class PlatformVerifier:
     
     async def verify_port_in_use(self, port: int) -> bool:
         """Verify a port is in use."""
+        listening = self.snapshot.is_port_listening(port)
+        if listening is not None:
+            return listening
+            
         # This method works cross-platform using asyncio
         try:
             # Try to bind to the port
@@ -94,6 +110,32 @@ class PlatformVerifier:
         """Verify a port is not in use."""
         return not await self.verify_port_in_use(port)
     
+    async def _run_command(self, cmd: str, timeout: float = 30) -> Tuple[int, str, str]:
+        """
+        Run a short check command in the shared persistent shell.
+        
+        Args:
+            cmd: Shell command
+            timeout: Timeout in seconds
+            
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+        """
+        return await get_shell_pool().run(cmd, timeout=timeout)
+    
+    async def verify_changes(self, changes: List[Change]) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Verify several changes against one fresh snapshot of the system.
+        
+        Args:
+            changes: Changes to verify
+            
+        Returns:
+            List of (is_verified, message) tuples in the order of the changes
+        """
+        self.snapshot.refresh()
+        return [await self.verify_change(change) for change in changes]
+    
     async def verify_change(self, change: Change) -> Tuple[bool, Optional[str]]:
         """
         Verify a specific change based on its type.
@@ -262,47 +304,23 @@ class LinuxVerifier(PlatformVerifier):
             # First try systemctl (systemd)
             if shutil.which('systemctl'):
                 cmd = f'systemctl is-active --quiet {service_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await result.communicate()
+                returncode, _, _ = await self._run_command(cmd)
                 
                 # Exit code 0 means service is running
-                if result.returncode == 0:
+                if returncode == 0:
                     return True
             
             # Fall back to service command
             if shutil.which('service'):
                 cmd = f'service {service_name} status'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, _ = await result.communicate()
+                _, stdout, _ = await self._run_command(cmd)
                 
                 # Check for "running" in output
-                output = stdout.decode().lower()
+                output = stdout.lower()
                 return 'running' in output or 'started' in output
             
             # Last resort, check process list
-            cmd = f'ps -A | grep -w {service_name}'
-            result = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await result.communicate()
-            
-            # If we have output (excluding grep itself), service might be running
-            output_lines = stdout.decode().strip().split('\n')
-            for line in output_lines:
-                if service_name in line and 'grep' not in line:
-                    return True
-                    
-            return False
+            return self.snapshot.is_process_running(service_name)
         except Exception as e:
             logger.error(f"Error checking Linux service {service_name}: {e}")
             return False
@@ -314,54 +332,29 @@ class LinuxVerifier(PlatformVerifier):
     async def verify_package_installed(self, package_name: str) -> bool:
         """Verify a package is installed on Linux."""
         try:
-            # Try different package managers
-            
-            # Debian/Ubuntu
-            if shutil.which('dpkg'):
-                cmd = f'dpkg -l {package_name} | grep -E "^ii"'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, _ = await result.communicate()
-                if stdout.strip():
-                    return True
-            
-            # Red Hat/CentOS
-            if shutil.which('rpm'):
-                cmd = f'rpm -q {package_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await result.communicate()
-                if result.returncode == 0:
-                    return True
-            
-            # Arch Linux
-            if shutil.which('pacman'):
-                cmd = f'pacman -Q {package_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await result.communicate()
-                if result.returncode == 0:
+            # Read package databases directly, querying the package manager if one is unreadable
+            registry = get_capability_registry()
+            for manager, cmd in (
+                ('dpkg', f'dpkg -l {package_name} | grep -E "^ii"'),
+                ('rpm', f'rpm -q {package_name}'),
+                ('pacman', f'pacman -Q {package_name}')
+            ):
+                if not registry.has_command(manager):
+                    continue
+                packages = self.snapshot.packages.installed(manager)
+                if packages is not None:
+                    if package_name in packages:
+                        return True
+                    continue
+                returncode, _, _ = await self._run_command(cmd)
+                if returncode == 0:
                     return True
             
             # Snap packages
-            if shutil.which('snap'):
+            if registry.has_command('snap'):
                 cmd = f'snap list {package_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, _ = await result.communicate()
-                if stdout.strip() and package_name in stdout.decode():
+                _, stdout, _ = await self._run_command(cmd)
+                if stdout.strip() and package_name in stdout:
                     return True
                     
             return False
@@ -381,12 +374,7 @@ class MacOSVerifier(PlatformVerifier):
         try:
             # Try launchctl
             cmd = f'launchctl list | grep {service_name}'
-            result = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await result.communicate()
+            _, stdout, _ = await self._run_command(cmd)
             
             # If we have output, the service might be running
             return bool(stdout.strip())
@@ -404,25 +392,15 @@ class MacOSVerifier(PlatformVerifier):
             # Try Homebrew
             if shutil.which('brew'):
                 cmd = f'brew list | grep {package_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, _ = await result.communicate()
+                _, stdout, _ = await self._run_command(cmd)
                 if stdout.strip():
                     return True
             
             # Try macports
             if shutil.which('port'):
                 cmd = f'port installed {package_name}'
-                result = await asyncio.create_subprocess_shell(
-                    cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, _ = await result.communicate()
-                if stdout.strip() and 'None of the specified' not in stdout.decode():
+                _, stdout, _ = await self._run_command(cmd)
+                if stdout.strip() and 'None of the specified' not in stdout:
                     return True
                     
             # For .app packages, check Applications directory
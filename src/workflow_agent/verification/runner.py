@@ -11,6 +11,7 @@ from ..core.state import WorkflowState
 from ..error.exceptions import VerificationError
 from ..config.configuration import WorkflowConfiguration
 from ..execution.isolation import IsolationFactory
+from .system_snapshot import SystemSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -41,14 +42,19 @@ class VerificationRunner:
         
         # Get isolation strategy
         isolation_method = state.isolation_method or self.config.isolation_method
+        if isolation_method == "direct" and getattr(self.config, "verification_shell_worker", False):
+            # Short checks skip the process and shell startup of direct execution
+            isolation_method = "worker"
         isolation = IsolationFactory.create(isolation_method, self.config)
         
         try:
             # Execute the script
-            output = await isolation.execute(
+            # Read-only probes repeated by retries reuse a recent result
+            output = await isolation.execute_cached(
                 step.script,
                 state.parameters,
-                None  # Use default working directory
+                None,  # Use default working directory
+                idempotent=getattr(step, "idempotent", None)
             )
             
             # Check results
@@ -101,6 +107,8 @@ class DirectVerifier:
             config: Workflow configuration
         """
         self.config = config
+        # One process and port view shared by the checks of this verifier
+        self.snapshot = SystemSnapshot()
         
     async def verify_file_exists(self, file_path: str) -> Dict[str, Any]:
         """Verify that a file exists."""
@@ -120,14 +128,11 @@ class DirectVerifier:
         
     async def verify_process_running(self, process_name: str) -> Dict[str, Any]:
         """Verify that a process is running."""
-        import psutil
-        
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'] == process_name:
-                return {
-                    "success": True,
-                    "error": ""
-                }
+        if self.snapshot.is_process_running(process_name):
+            return {
+                "success": True,
+                "error": ""
+            }
                 
         return {
             "success": False,
@@ -136,12 +141,16 @@ class DirectVerifier:
         
     async def verify_port_listening(self, port: int) -> Dict[str, Any]:
         """Verify that a port is open and listening."""
-        import socket
-        
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('127.0.0.1', port))
-        sock.close()
+        listening = self.snapshot.is_port_listening(port)
+        if listening is not None:
+            result = 0 if listening else 1
+        else:
+            import socket
+            
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(1)
+            result = sock.connect_ex(('127.0.0.1', port))
+            sock.close()
         
         if result == 0:
             return {
@@ -153,3 +162,16 @@ class DirectVerifier:
                 "success": False,
                 "error": f"Port {port} is not listening"
             }
+            
+    async def verify_package_installed(self, package_name: str) -> Dict[str, Any]:
+        """Verify that a package is installed, reading the package databases directly."""
+        installed = self.snapshot.packages.is_installed(package_name)
+        if installed is None:
+            return {
+                "success": False,
+                "error": "No readable package database"
+            }
+        return {
+            "success": installed,
+            "error": "" if installed else f"Package not installed: {package_name}"
+        }
@@ -0,0 +1,310 @@
+"""
+Native lookups of packages, processes and listening ports for verification checks.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+RPM_DB_DIRS = ("/var/lib/rpm", "/usr/lib/sysimage/rpm")
+PACMAN_LOCAL_DIR = "/var/lib/pacman/local"
+PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+# Hex connection state of listening sockets in /proc/net/tcp
+TCP_LISTEN = "0A"
+# Linux truncates process names (comm) to 15 characters
+COMM_LENGTH = 15
+
+def _stamp(paths: Iterable[str], contents: bool = True) -> Optional[Tuple]:
+    """Modification stamp of files, or of directory contents if requested; None if none exist."""
+    stamp = []
+    for path in paths:
+        try:
+            if contents and os.path.isdir(path):
+                for entry in os.scandir(path):
+                    info = entry.stat()
+                    stamp.append((entry.path, info.st_mtime_ns, info.st_size))
+            else:
+                info = os.stat(path)
+                stamp.append((path, info.st_mtime_ns, info.st_size))
+        except OSError:
+            continue
+    return tuple(sorted(stamp)) or None
+
+def parse_dpkg_status(text: str) -> Dict[str, str]:
+    """
+    Parse a dpkg status file.
+
+    Args:
+        text: Content of /var/lib/dpkg/status
+
+    Returns:
+        Dictionary mapping installed package names to versions, as `dpkg -l` lists with "ii"
+    """
+    packages = {}
+    name = status = version = arch = None
+
+    def add_stanza() -> None:
+        if name and status == "install ok installed":
+            packages[name] = version or ""
+            if arch:
+                packages[f"{name}:{arch}"] = version or ""
+
+    for line in text.split("\n"):
+        if not line:
+            add_stanza()
+            name = status = version = arch = None
+        elif line.startswith("Package: "):
+            name = line[9:].strip()
+        elif line.startswith("Status: "):
+            status = line[8:].strip()
+        elif line.startswith("Version: "):
+            version = line[9:].strip()
+        elif line.startswith("Architecture: "):
+            arch = line[14:].strip()
+    # The last stanza need not end with a blank line
+    add_stanza()
+    return packages
+
+class PackageIndex:
+    """
+    Installed packages per package manager, reloaded only when its database changes.
+
+    dpkg and pacman databases are read directly; the rpm database is listed
+    with a single `rpm -qa` instead of one query per package.
+    """
+
+    def __init__(self,
+                dpkg_status_path: str = DPKG_STATUS_PATH,
+                rpm_db_dirs: Tuple[str, ...] = RPM_DB_DIRS,
+                pacman_local_dir: str = PACMAN_LOCAL_DIR):
+        """
+        Initialize the index; databases are read on first lookup.
+
+        Args:
+            dpkg_status_path: dpkg status file
+            rpm_db_dirs: Candidate rpm database directories
+            pacman_local_dir: pacman local database directory
+        """
+        self.dpkg_status_path = dpkg_status_path
+        self.rpm_db_dirs = rpm_db_dirs
+        self.pacman_local_dir = pacman_local_dir
+        self.loads = 0
+        self._cache: Dict[str, Tuple[Tuple, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, manager: str, stamp: Optional[Tuple], load) -> Optional[FrozenSet[str]]:
+        if stamp is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(manager)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        try:
+            packages = frozenset(load())
+        except Exception as e:
+            logger.debug(f"Failed to read {manager} package database: {e}")
+            return None
+        with self._lock:
+            self._cache[manager] = (stamp, packages)
+            self.loads += 1
+        return packages
+
+    def _load_dpkg(self) -> Set[str]:
+        with open(self.dpkg_status_path, encoding="utf-8", errors="replace") as f:
+            return set(parse_dpkg_status(f.read()))
+
+    def _load_rpm(self) -> Set[str]:
+        result = subprocess.run(
+            ["rpm", "-qa", "--qf", "%{NAME}\\n"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=60, check=True
+        )
+        return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+    def _load_pacman(self) -> Set[str]:
+        # Entries are "<name>-<version>-<release>"
+        return {entry.rsplit("-", 2)[0] for entry in os.listdir(self.pacman_local_dir) if entry.count("-") >= 2}
+
+    def installed(self, manager: str) -> Optional[FrozenSet[str]]:
+        """
+        Get the installed packages of a package manager.
+
+        Args:
+            manager: "dpkg", "rpm" or "pacman"
+
+        Returns:
+            Installed package names, or None if the manager's database is not available
+        """
+        if manager == "dpkg":
+            return self._cached("dpkg", _stamp([self.dpkg_status_path]), self._load_dpkg)
+        if manager == "rpm":
+            if not shutil.which("rpm"):
+                return None
+            return self._cached("rpm", _stamp(self.rpm_db_dirs), self._load_rpm)
+        if manager == "pacman":
+            # Installs and removals add and remove entries, changing the directory itself
+            return self._cached("pacman", _stamp([self.pacman_local_dir], contents=False), self._load_pacman)
+        raise ValueError(f"Unsupported package manager: {manager}")
+
+    def is_installed(self, package_name: str) -> Optional[bool]:
+        """
+        Check whether any package manager with a readable database has a package installed.
+
+        Args:
+            package_name: Package name
+
+        Returns:
+            True or False, or None if no package database is available
+        """
+        found_database = False
+        for manager in ("dpkg", "rpm", "pacman"):
+            packages = self.installed(manager)
+            if packages is None:
+                continue
+            found_database = True
+            if package_name in packages:
+                return True
+        return False if found_database else None
+
+_package_index = PackageIndex()
+
+def get_package_index() -> PackageIndex:
+    """
+    Get the package index shared by the whole process.
+
+    Returns:
+        Shared package index
+    """
+    return _package_index
+
+def read_listening_ports(paths: Tuple[str, ...] = PROC_NET_TCP) -> Optional[Set[int]]:
+    """
+    Read the TCP ports with a listening socket from /proc.
+
+    Args:
+        paths: /proc/net/tcp files to read
+
+    Returns:
+        Listening ports, or None if /proc/net is not available
+    """
+    ports: Set[int] = set()
+    readable = False
+    for path in paths:
+        try:
+            with open(path) as f:
+                lines = f.read().splitlines()[1:]
+        except OSError:
+            continue
+        readable = True
+        for line in lines:
+            fields = line.split()
+            if len(fields) > 3 and fields[3] == TCP_LISTEN:
+                ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+    return ports if readable else None
+
+class SystemSnapshot:
+    """
+    Point-in-time view of processes and listening ports shared by the checks of one verification run.
+
+    Each view is taken on first use and reused for at most max_age seconds,
+    so checks made in quick succession share one psutil pass and one read of
+    /proc/net. A lookup that misses on a reused view is retried on a new one,
+    so a check polled until something starts never waits on a stale view; a
+    check that something stopped may see it for up to max_age. Packages come
+    from the process-wide package index, which reloads when a database changes.
+    """
+
+    def __init__(self, max_age: float = 1.0, package_index: Optional[PackageIndex] = None):
+        """
+        Initialize the snapshot.
+
+        Args:
+            max_age: Seconds a view is reused
+            package_index: Package index, defaults to the shared one
+        """
+        self.max_age = max_age
+        self.packages = package_index or get_package_index()
+        self._processes: Optional[Tuple[float, FrozenSet[str]]] = None
+        self._ports: Optional[Tuple[float, Optional[Set[int]]]] = None
+
+    def _fresh(self, view: Optional[Tuple]) -> bool:
+        return view is not None and time.monotonic() - view[0] < self.max_age
+
+    def process_names(self) -> FrozenSet[str]:
+        """
+        Get the names of running processes, from one psutil pass per snapshot.
+
+        Returns:
+            Process names and executable base names
+        """
+        if not self._fresh(self._processes):
+            names = set()
+            for proc in psutil.process_iter(["name", "exe"]):
+                name, exe = proc.info.get("name"), proc.info.get("exe")
+                if name:
+                    names.add(name)
+                if exe:
+                    names.add(os.path.basename(exe))
+            self._processes = (time.monotonic(), frozenset(names))
+        return self._processes[1]
+
+    def is_process_running(self, name: str) -> bool:
+        """
+        Check whether a process with a name is running.
+
+        Args:
+            name: Process name
+
+        Returns:
+            True if a process has the name, also when truncated as the kernel does
+        """
+        reused = self._fresh(self._processes)
+        running = self._has_process(self.process_names(), name)
+        if reused and not running:
+            self._processes = None
+            running = self._has_process(self.process_names(), name)
+        return running
+
+    @staticmethod
+    def _has_process(names: FrozenSet[str], name: str) -> bool:
+        return name in names or (len(name) > COMM_LENGTH and name[:COMM_LENGTH] in names)
+
+    def listening_ports(self) -> Optional[Set[int]]:
+        """
+        Get the listening TCP ports.
+
+        Returns:
+            Listening ports, or None if they cannot be read without a socket probe
+        """
+        if not self._fresh(self._ports):
+            self._ports = (time.monotonic(), read_listening_ports())
+        return self._ports[1]
+
+    def is_port_listening(self, port: int) -> Optional[bool]:
+        """
+        Check whether a TCP port has a listening socket.
+
+        Args:
+            port: Port number
+
+        Returns:
+            True or False, or None if listening ports cannot be read without a socket probe
+        """
+        reused = self._fresh(self._ports)
+        listening = self.listening_ports()
+        if reused and listening is not None and port not in listening:
+            self._ports = None
+            listening = self.listening_ports()
+        return None if listening is None else port in listening
+
+    def refresh(self) -> None:
+        """Drop the process and port views so the next check takes new ones."""
+        self._processes = None
+        self._ports = None
@@ -0,0 +1,79 @@
+"""
+Benchmark ChangeTracker extraction on synthetic multi-megabyte installer logs.
+
+Run with: PYTHONPATH=src python tests/benchmarks/bench_change_tracker.py [--megabytes 8]
+"""
+import argparse
+import json
+import re
+import time
+
+from workflow_agent.execution.change_tracker import ChangeTracker, MARKER_HANDLERS
+
+NOISE = [
+    "Get:{i} http://archive.ubuntu.com/ubuntu jammy/main amd64 libfoo{i} amd64 1.2.{i} [{i} kB]",
+    "Unpacking libfoo{i} (1.2.{i}) over (1.1.{i}) ...",
+    "Setting up libfoo{i} (1.2.{i}) ...",
+    "Processing triggers for man-db (2.10.2-1) ...",
+    "  [{i}%] Building C object src/CMakeFiles/agent.dir/module_{i}.c.o",
+]
+
+def build_log(megabytes: int, marker_every: int = 200) -> str:
+    """Build an installer log with a change marker every `marker_every` lines."""
+    lines = []
+    size = 0
+    i = 0
+    markers = list(MARKER_HANDLERS)
+    while size < megabytes * 1024 * 1024:
+        if i % marker_every == 0:
+            line = f"CHANGE:{markers[(i // marker_every) % len(markers)]}:/opt/agent/item_{i}"
+        elif i % (marker_every * 10) == 1:
+            line = "CHANGE_JSON_BEGIN\n" + json.dumps({"type": "config_modified", "target": f"/etc/agent_{i}.yml"}) + "\nCHANGE_JSON_END"
+        else:
+            line = NOISE[i % len(NOISE)].format(i=i)
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    return "\n".join(lines)
+
+def legacy_extract(tracker: ChangeTracker, output: str) -> int:
+    """Approximate the previous extraction: one regex pass per marker type plus a catch-all."""
+    count = 0
+    for block in re.findall(r"CHANGE_JSON_BEGIN\s*(.*?)\s*CHANGE_JSON_END", output, re.DOTALL):
+        json.loads(block)
+        count += 1
+    patterns = [rf"CHANGE:{marker}:(\S+)(?::(\S+))?" for marker in MARKER_HANDLERS]
+    patterns.append(r"CHANGE:(\w+):(\S+)(?::(.+))?")
+    for pattern in patterns:
+        for match in re.finditer(pattern, output):
+            tracker._create_generic_change("legacy", match.group(1))
+            count += 1
+    return count
+
+def timed(label: str, func) -> None:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {elapsed * 1000:9.1f} ms ({result} changes)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=8)
+    args = parser.parse_args()
+
+    output = build_log(args.megabytes)
+    print(f"Log: {len(output) / (1024 * 1024):.1f} MB, {output.count(chr(10)) + 1} lines")
+    tracker = ChangeTracker()
+
+    timed("single-pass extract_changes", lambda: len(tracker.extract_changes(output)))
+
+    def streamed() -> int:
+        scanner = tracker.create_scanner()
+        for i in range(0, len(output), 64 * 1024):
+            scanner.feed(output[i:i + 64 * 1024])
+        return len(scanner.finish())
+    timed("incremental feed, 64 KiB chunks", streamed)
+    timed("legacy multi-pass (reference)", lambda: legacy_extract(tracker, output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark TemplateRegistry scans on a synthetic template tree.
+
+Run with: PYTHONPATH=src python tests/benchmarks/bench_template_registry.py [--templates 10000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from workflow_agent.templates.registry.template_registry import TemplateRegistry
+
+ACTIONS = ["install", "verify", "uninstall", "configure"]
+PLATFORMS = ["linux", "windows"]
+
+def build_tree(root: str, count: int) -> int:
+    """Create `count` templates spread over integration/action/platform directories."""
+    per_leaf = 25
+    created = 0
+    integration = 0
+    while created < count:
+        for action in ACTIONS:
+            for platform in PLATFORMS:
+                directory = os.path.join(root, "script", f"integration_{integration}", action, platform)
+                os.makedirs(directory, exist_ok=True)
+                for i in range(min(per_leaf, count - created)):
+                    with open(os.path.join(directory, f"step_{i}.sh.j2"), "w") as f:
+                        f.write(f"#!/bin/bash\necho '{{{{ name }}}} step {i}'\n{{% if verbose %}}set -x{{% endif %}}\n")
+                    created += 1
+                if created >= count:
+                    return created
+        integration += 1
+    return created
+
+def legacy_unchanged_scan(registry: TemplateRegistry) -> None:
+    """Approximate the previous scan: per-template exists/getmtime plus a full os.walk."""
+    for template_info in registry.templates.values():
+        if os.path.exists(template_info.template_path):
+            os.path.getmtime(template_info.template_path)
+    for template_dir in registry.template_dirs:
+        for root, _, files in os.walk(template_dir):
+            for filename in files:
+                if filename.endswith(('.j2', '.jinja', '.tmpl')):
+                    registry._generate_template_id(os.path.join(root, filename))
+
+def timed(label: str, func) -> None:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    suffix = f" ({len(result)} changed)" if isinstance(result, set) else ""
+    print(f"{label:<42} {elapsed * 1000:9.1f} ms{suffix}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--templates", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template_root = os.path.join(tmp, "templates")
+        index_path = os.path.join(tmp, "index", "index.json")
+        print(f"Created {build_tree(template_root, args.templates)} templates")
+
+        # Age the tree so directory listings are trusted on rescans
+        past = time.time() - 60
+        for root, dirs, files in os.walk(template_root):
+            for name in dirs + files:
+                os.utime(os.path.join(root, name), (past, past))
+        os.utime(template_root, (past, past))
+
+        registry = TemplateRegistry([template_root], index_path=index_path)
+        timed("cold scan (empty index)", registry.scan_templates)
+
+        timed("load index", lambda: TemplateRegistry([template_root], index_path=index_path))
+        registry = TemplateRegistry([template_root], index_path=index_path)
+        timed("warm rescan, nothing changed", registry.scan_templates)
+        timed("legacy-style unchanged scan (reference)", lambda: legacy_unchanged_scan(registry))
+
+        changed = sorted(registry.templates.values(), key=lambda t: t.template_id)[:10]
+        for template_info in changed:
+            with open(template_info.template_path, "a") as f:
+                f.write("# edited\n")
+        timed("rescan after editing 10 templates", registry.scan_templates)
+        timed("refresh_paths for the 10 edited paths", lambda: registry.refresh_paths(t.template_path for t in changed))
+        print(f"index {os.path.getsize(index_path)} bytes, journal "
+              f"{os.path.getsize(registry.journal_path) if os.path.exists(registry.journal_path) else 0} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for snapshot-cached documentation fetching.
+"""
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from workflow_agent.documentation.parser import DocumentationParser
+from workflow_agent.error.exceptions import DocumentationFetchError
+
+SEARCH_URL = "https://docs.newrelic.com/api/search?query=mysql+integration+install"
+DOC_URL = "https://docs.newrelic.com/docs/mysql"
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    """Snapshot directory seeded with the search result and page for mysql."""
+    parser = DocumentationParser(snapshot_dir=str(tmp_path / "docs"), offline=True)
+    parser.snapshots.store(SEARCH_URL, json.dumps({"results": [{"url": DOC_URL}]}).encode())
+    parser.snapshots.store(DOC_URL, b"""<html><head><title>MySQL integration</title>
+<meta name="description" content="Monitor MySQL with New Relic."><script>track()</script></head>
+<body><h1>Install the MySQL integration</h1>
+<h2>Install and activate</h2><ol><li>Install the package:</li><li>Restart the agent</li></ol>
+<pre>sudo apt-get install nri-mysql</pre>
+<h2>Find and use data</h2><ul><li>Open the dashboard</li></ul></body></html>""")
+    return tmp_path / "docs"
+
+@pytest_asyncio.fixture
+async def doc_server():
+    state = {"requests": 0, "conditional": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            state["conditional"] += 1
+            return web.Response(status=304)
+        return web.Response(body=b"page", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/doc", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/doc", state
+    await runner.cleanup()
+
+async def _urls(url):
+    return [url]
+
+@pytest.mark.asyncio
+async def test_offline_fetch_reads_fixture_snapshots(fixture_dir):
+    parser = DocumentationParser(snapshot_dir=str(fixture_dir), offline=True)
+
+    docs = await parser.fetch_integration_docs("mysql")
+
+    assert docs["source_url"] == DOC_URL
+    assert docs["title"] == "Install the MySQL integration"
+    assert docs["description"] == "Monitor MySQL with New Relic."
+    assert docs["installation_steps"] == ["Install the package:", "Restart the agent"]
+    assert docs["commands"] == ["sudo apt-get install nri-mysql"]
+    assert "content" not in docs
+
+@pytest.mark.asyncio
+async def test_offline_fetch_without_snapshot_raises(tmp_path):
+    parser = DocumentationParser(snapshot_dir=str(tmp_path), offline=True)
+
+    with pytest.raises(DocumentationFetchError):
+        await parser.fetch_integration_docs("redis")
+
+@pytest.mark.asyncio
+async def test_network_fetch_is_opt_in(tmp_path, doc_server):
+    url, state = doc_server
+    parser = DocumentationParser(snapshot_dir=str(tmp_path))
+
+    with pytest.raises(DocumentationFetchError):
+        await parser._fetch(url)
+    docs = await parser.fetch_integration_docs("redis")
+
+    assert state["requests"] == 0
+    assert docs["name"] == "redis" and "source_url" not in docs
+
+@pytest.mark.asyncio
+async def test_session_is_closed_after_fetch_outside_context(tmp_path, doc_server):
+    url, _ = doc_server
+    parser = DocumentationParser(snapshot_dir=str(tmp_path), fetch=True)
+    parser._search_documentation = lambda integration_type: _urls(url)
+
+    await parser.fetch_integration_docs("redis")
+
+    assert parser._session is None
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_skips_request(tmp_path, doc_server):
+    url, state = doc_server
+    async with DocumentationParser(snapshot_dir=str(tmp_path), fetch=True) as parser:
+        assert await parser._fetch(url) == b"page"
+        assert await parser._fetch(url) == b"page"
+
+    assert state["requests"] == 1
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_revalidated_with_etag(tmp_path, doc_server):
+    url, state = doc_server
+    async with DocumentationParser(snapshot_dir=str(tmp_path), max_age=-1, fetch=True) as parser:
+        await parser._fetch(url)
+
+        assert await parser._fetch(url) == b"page"
+
+    assert state["conditional"] == 1
@@ -0,0 +1,108 @@
+"""
+Unit tests for concurrent batch execution across targets.
+"""
+import asyncio
+
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.core.state import WorkflowState
+from workflow_agent.execution.batch import BatchExecutor, BatchPolicy
+
+def make_states(count, **system_context):
+    return [
+        WorkflowState(
+            action="install",
+            target_name=f"host-{i}",
+            integration_type="infra_agent",
+            script="echo ok\n",
+            isolation_method="direct",
+            system_context={"group": f"rack-{i % 2}", **system_context}
+        )
+        for i in range(count)
+    ]
+
+class FakeRunner:
+    """Runner recording concurrency and failing the given targets."""
+
+    def __init__(self, failing=(), delay=0.02):
+        self.failing = set(failing)
+        self.delay = delay
+        self.running = {}
+        self.peak = 0
+        self.peak_by_group = {}
+        self.started = []
+
+    async def __call__(self, state):
+        group = state.system_context["group"]
+        self.started.append(state.target_name)
+        self.running[group] = self.running.get(group, 0) + 1
+        self.peak = max(self.peak, sum(self.running.values()))
+        self.peak_by_group[group] = max(self.peak_by_group.get(group, 0), self.running[group])
+        await asyncio.sleep(self.delay)
+        self.running[group] -= 1
+        if state.target_name in self.failing:
+            return state.set_error("install failed")
+        return state.mark_completed()
+
+@pytest.mark.asyncio
+async def test_global_and_group_limits():
+    runner = FakeRunner()
+    policy = BatchPolicy(max_concurrency=3, group_limits={"rack-0": 1})
+    batch = BatchExecutor(WorkflowConfiguration(), policy=policy, runner=runner)
+
+    results = await batch.run_all(make_states(8))
+
+    assert [r.target for r in results] == [f"host-{i}" for i in range(8)]
+    assert all(r.succeeded for r in results)
+    assert runner.peak == 3
+    assert runner.peak_by_group == {"rack-0": 1, "rack-1": 2}
+
+@pytest.mark.asyncio
+async def test_fail_fast_skips_remaining_targets():
+    runner = FakeRunner(failing={"host-0"})
+    batch = BatchExecutor(WorkflowConfiguration(), policy=BatchPolicy(max_concurrency=1, fail_fast=True), runner=runner)
+
+    results = await batch.run_all(make_states(4))
+
+    assert runner.started == ["host-0"]
+    assert batch.stats == {"succeeded": 0, "failed": 1, "skipped": 3}
+    assert all(r.skipped and "batch aborted" in r.state.error for r in results[1:])
+
+@pytest.mark.asyncio
+async def test_max_failure_percentage():
+    runner = FakeRunner(failing={"host-0", "host-1", "host-2"})
+    policy = BatchPolicy(max_concurrency=1, max_failure_percentage=25)
+    batch = BatchExecutor(WorkflowConfiguration(), policy=policy, runner=runner)
+
+    await batch.run_all(make_states(8))
+
+    # One failure in eight is within 25%, the third exceeds it
+    assert batch.stats == {"succeeded": 0, "failed": 3, "skipped": 5}
+
+@pytest.mark.asyncio
+async def test_canaries_run_first_and_gate_the_rest():
+    states = make_states(5)
+    states[3] = states[3].evolve(system_context={"group": "rack-1", "canary": True})
+    runner = FakeRunner(failing={"host-3"})
+    batch = BatchExecutor(WorkflowConfiguration(), policy=BatchPolicy(max_concurrency=4), runner=runner)
+
+    results = [result async for result in batch.run(states)]
+
+    assert results[0].target == "host-3"
+    assert runner.started == ["host-3"]
+    assert batch.abort_reason == "canary failed"
+    assert batch.stats["skipped"] == 4
+
+@pytest.mark.asyncio
+async def test_default_runner_uses_direct_isolation(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+    states = make_states(3)
+    states[1] = states[1].evolve(script="echo broken >&2\nexit 2\n")
+    batch = BatchExecutor(config, policy=BatchPolicy(max_concurrency=2))
+
+    results = await batch.run_all(states)
+
+    assert [r.succeeded for r in results] == [True, False, True]
+    assert results[0].state.output.stdout == "ok\n"
+    assert "exit code 2" in results[1].state.error
@@ -0,0 +1,53 @@
+"""
+Unit tests for single-pass change extraction.
+"""
+import json
+
+from workflow_agent.execution.change_tracker import ChangeTracker
+
+OUTPUT = "\n".join([
+    "Reading package lists...",
+    "CHANGE:PACKAGE_INSTALLED:nginx",
+    "CHANGE:FILE_CREATED:/etc/nginx/conf.d/agent.conf",
+    "CHANGE_JSON_BEGIN",
+    json.dumps([{"type": "service_started", "target": "nginx", "revertible": True}]),
+    "CHANGE_JSON_END",
+    "CHANGE:CUSTOM_STEP:cache-warmed",
+    "CHANGE:PACKAGE_INSTALLED:nginx",
+    "done",
+])
+
+def test_markers_are_dispatched_once_and_deduplicated():
+    changes = ChangeTracker().extract_changes(OUTPUT)
+
+    assert [(c.type, c.target) for c in changes] == [
+        ("package_installed", "nginx"),
+        ("file_created", "/etc/nginx/conf.d/agent.conf"),
+        ("service_started", "nginx"),
+        ("custom_step", "cache-warmed"),
+    ]
+    assert changes[1].revertible and "/etc/nginx/conf.d/agent.conf" in changes[1].revert_command
+
+def test_incremental_feed_matches_whole_output():
+    tracker = ChangeTracker()
+    scanner = tracker.create_scanner()
+
+    streamed = []
+    for i in range(0, len(OUTPUT), 7):
+        streamed.extend(scanner.feed(OUTPUT[i:i + 7]))
+    streamed.extend(scanner.finish()[len(streamed):])
+
+    expected = tracker.extract_changes(OUTPUT)
+    assert [(c.type, c.target) for c in streamed] == [(c.type, c.target) for c in expected]
+
+def test_inference_only_without_explicit_changes():
+    tracker = ChangeTracker()
+
+    inferred = tracker.extract_changes("Successfully installed requests\nnpm install -g typescript\n")
+    explicit = tracker.extract_changes("Successfully installed requests\nCHANGE:FILE_DELETED:/tmp/x\n")
+
+    assert [(c.type, c.target) for c in inferred] == [
+        ("inferred_package_install", "typescript"),
+        ("inferred_package_install", "requests"),
+    ]
+    assert [(c.type, c.target) for c in explicit] == [("file_deleted", "/tmp/x")]
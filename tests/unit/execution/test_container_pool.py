@@ -0,0 +1,119 @@
+"""
+Unit tests for the warm Docker container pool, using a fake docker CLI.
+"""
+import os
+import sys
+import textwrap
+
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.execution.container_pool import CONTAINER_WORKDIR, ContainerPool
+from workflow_agent.execution.isolation import DockerIsolation
+from workflow_agent.utils.subprocess_utils import OutputCapture
+
+FAKE_DOCKER = textwrap.dedent("""\
+    #!{python}
+    # Minimal docker CLI: containers are directories, exec runs on the host
+    import os, shutil, subprocess, sys, uuid
+    root = os.environ["FAKE_DOCKER_ROOT"]
+    args = sys.argv[1:]
+    with open(os.path.join(root, "calls.log"), "a") as log:
+        log.write(" ".join(args[:1]) + "\\n")
+    if args[0] == "--version":
+        print("Docker version 99.0.0")
+    elif args[0] == "run":
+        container_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(root, container_id))
+        print(container_id)
+    elif args[0] == "inspect":
+        print("true" if os.path.isdir(os.path.join(root, args[-1])) else "false")
+    elif args[0] == "exec":
+        container = os.path.join(root, args[2])
+        command = args[-1].replace("{workdir}", os.path.join(container, "work"))
+        sys.exit(subprocess.call(["sh", "-c", command]))
+    elif args[0] == "rm":
+        shutil.rmtree(os.path.join(root, args[-1]), ignore_errors=True)
+    """)
+
+@pytest.fixture
+def fake_docker(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    docker = bin_dir / "docker"
+    docker.write_text(FAKE_DOCKER.format(python=sys.executable, workdir=CONTAINER_WORKDIR))
+    docker.chmod(0o755)
+    return str(docker), tmp_path
+
+def calls(root):
+    with open(root / "calls.log") as f:
+        return f.read().split()
+
+@pytest.mark.asyncio
+async def test_containers_are_reused_and_recycled(fake_docker, monkeypatch):
+    docker, root = fake_docker
+    monkeypatch.setenv("FAKE_DOCKER_ROOT", str(root))
+    pool = ContainerPool("debian:stable-slim", max_size=1, max_uses=2, docker_command=docker)
+
+    outputs = []
+    for i in range(3):
+        capture = OutputCapture(spill_dir=None)
+        exit_code = await pool.execute(f"#!/bin/sh\nls\necho run {i}\n", capture, read_only=True)
+        outputs.append((exit_code, capture.stdout_text()))
+
+    assert outputs == [(0, "script.sh\nrun 0\n"), (0, "script.sh\nrun 1\n"), (0, "script.sh\nrun 2\n")]
+    assert calls(root).count("run") == 2
+    assert pool.stats == {"started": 2, "reused": 1, "removed": 1}
+    await pool.close()
+    assert not [p for p in os.listdir(root) if len(p) == 32]
+
+@pytest.mark.asyncio
+async def test_unhealthy_and_idle_containers_are_replaced(fake_docker, monkeypatch):
+    docker, root = fake_docker
+    monkeypatch.setenv("FAKE_DOCKER_ROOT", str(root))
+    pool = ContainerPool("debian:stable-slim", health_check_interval=0, idle_timeout=3600, docker_command=docker)
+
+    first = await pool.acquire()
+    await pool.release(first)
+    os.rmdir(root / first.container_id)  # container died while idle
+    second = await pool.acquire()
+    await pool.release(second)
+
+    assert second.container_id != first.container_id
+    pool.idle_timeout = 0
+    assert await pool.reap_idle() == 1
+    assert pool.size == 0
+
+@pytest.mark.asyncio
+async def test_docker_isolation_uses_pool(fake_docker, monkeypatch):
+    docker, root = fake_docker
+    monkeypatch.setenv("FAKE_DOCKER_ROOT", str(root))
+    isolation = DockerIsolation(WorkflowConfiguration(docker_pool_size=1))
+    isolation.docker_command = docker
+
+    first = await isolation.execute("#!/bin/sh\n# workflow-agent: read-only\necho one\n", {})
+    second = await isolation.execute("#!/bin/sh\n# workflow-agent: read-only\necho two >&2\nexit 3\n", {})
+
+    assert (first.exit_code, first.stdout) == (0, "one\n")
+    assert (second.exit_code, second.stderr) == (3, "two\n")
+    assert calls(root).count("run") == 1
+    assert calls(root).count("--version") == 1
+    await isolation.get_pool().close()
+
+@pytest.mark.asyncio
+async def test_changes_outside_scratch_dir_are_not_shared(fake_docker, monkeypatch):
+    docker, root = fake_docker
+    monkeypatch.setenv("FAKE_DOCKER_ROOT", str(root))
+    pool = ContainerPool("debian:stable-slim", max_size=1, docker_command=docker)
+
+    # The scratch directory's parent stands in for the rest of the container filesystem
+    await pool.execute("#!/bin/sh\necho installed > ../leaked\n", OutputCapture(spill_dir=None))
+    capture = OutputCapture(spill_dir=None)
+    await pool.execute("#!/bin/sh\ncat ../leaked 2>/dev/null || echo clean\n", capture, read_only=True)
+
+    assert capture.stdout_text() == "clean\n"
+    assert pool.stats["removed"] == 1
+    await pool.close()
+
+def test_pooling_is_off_by_default():
+    assert DockerIsolation(WorkflowConfiguration()).get_pool() is None
@@ -0,0 +1,36 @@
+"""
+Unit tests for recording changes while a script runs.
+"""
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.core.state import WorkflowState
+from workflow_agent.core.state_manager import StateManager
+from workflow_agent.execution.executor import ScriptExecutor
+from workflow_agent.execution.isolation import DirectIsolation
+
+SCRIPT = """
+echo "CHANGE:PACKAGE_INSTALLED:agent"
+echo "CHANGE:FILE_CREATED:/etc/agent.yml"
+sleep 2
+echo "CHANGE:SERVICE_STARTED:agent"
+"""
+
+@pytest.mark.asyncio
+async def test_timed_out_script_keeps_changes(tmp_path):
+    config = WorkflowConfiguration(execution_timeout=1, output_log_dir=tmp_path)
+    state_manager = StateManager(str(tmp_path / "states.db"))
+    state = WorkflowState(action="install", target_name="agent", integration_type="infra_agent", script=SCRIPT)
+
+    result = await ScriptExecutor(config)._run_script(state, DirectIsolation(config), state_manager)
+
+    assert result.has_error
+    assert [(c.type, c.target) for c in result.changes] == [
+        ("package_installed", "agent"),
+        ("file_created", "/etc/agent.yml"),
+    ]
+
+    # A fresh manager recovers the journal from storage
+    restored = StateManager(str(tmp_path / "states.db")).merge_recorded_changes(state)
+    assert [c.change_id for c in restored.changes] == [c.change_id for c in result.changes]
+    assert state_manager.merge_recorded_changes(result) is result
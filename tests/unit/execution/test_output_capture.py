@@ -0,0 +1,108 @@
+"""
+Unit tests for bounded, streaming script output capture.
+"""
+import gzip
+import os
+import time
+
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.execution.isolation import DirectIsolation
+from workflow_agent.utils.subprocess_utils import MAX_LINE_LENGTH, STREAM_CHUNK_SIZE, BoundedText, prune_output_logs
+
+SCRIPT = """
+for i in $(seq 1 5000); do echo "line $i"; done
+echo "CHANGE:PACKAGE_INSTALLED:agent"
+echo "warning" >&2
+"""
+
+def test_bounded_text_keeps_head_and_tail():
+    text = BoundedText(head_size=10, tail_size=10)
+    for i in range(100):
+        text.append(f"{i:04d}\n")
+
+    assert text.size == 500
+    assert text.truncated
+    kept = text.text("/tmp/full.log.gz")
+    assert kept.startswith("0000\n0001\n")
+    assert kept.endswith("0098\n0099\n")
+    assert "480 characters truncated, full output in /tmp/full.log.gz" in kept
+
+@pytest.mark.asyncio
+async def test_direct_isolation_streams_and_spills(tmp_path):
+    config = WorkflowConfiguration(output_head_size=100, output_tail_size=200, output_log_dir=tmp_path)
+    lines = []
+
+    output = await DirectIsolation(config).execute(SCRIPT, {}, on_output=lambda stream, line: lines.append((stream, line)))
+
+    assert output.exit_code == 0
+    assert output.truncated
+    assert output.stdout.startswith("line 1\nline 2\n")
+    assert output.stdout.endswith("line 5000\nCHANGE:PACKAGE_INSTALLED:agent\n")
+    assert len(output.stdout) < 300 + len(output.log_path) + 100
+    assert output.stderr == "warning\n"
+    assert len(lines) == 5002 and ("stderr", "warning\n") in lines
+
+    with gzip.open(output.log_path, "rt") as f:
+        log = f.read().splitlines()
+    assert len(log) == 5002
+    assert "[stderr] warning" in log
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_partial_output(tmp_path):
+    config = WorkflowConfiguration(execution_timeout=1, output_log_dir=tmp_path)
+
+    output = await DirectIsolation(config).execute("echo started\nsleep 2\n", {})
+
+    assert output.exit_code == 124
+    assert output.stdout == "started\n"
+    assert output.stderr.endswith("Script execution timed out")
+
+@pytest.mark.asyncio
+async def test_output_without_newlines_stays_bounded(tmp_path):
+    config = WorkflowConfiguration(output_head_size=1000, output_tail_size=1000, output_log_dir=tmp_path)
+    fragments = []
+
+    start = time.monotonic()
+    output = await DirectIsolation(config).execute(
+        "head -c 40000000 /dev/zero | tr '\\0' 'x'\necho\necho CHANGE:PACKAGE_INSTALLED:agent\n",
+        {},
+        on_output=lambda stream, line: fragments.append(len(line))
+    )
+
+    assert time.monotonic() - start < 10
+    assert output.exit_code == 0 and output.truncated
+    assert output.stdout.startswith("x" * 1000)
+    assert output.stdout.endswith("x\nCHANGE:PACKAGE_INSTALLED:agent\n")
+    assert max(fragments) <= MAX_LINE_LENGTH + STREAM_CHUNK_SIZE
+    assert sum(fragments) == 40000000 + 1 + len("CHANGE:PACKAGE_INSTALLED:agent\n")
+
+def test_prune_output_logs_applies_count_and_age(tmp_path):
+    now = time.time()
+    for i in range(5):
+        path = tmp_path / f"workflow-output-{i}.log.gz"
+        path.write_bytes(b"")
+        os.utime(path, (now - i * 60, now - i * 60))
+    stale = tmp_path / "workflow-output-stale.log.gz"
+    stale.write_bytes(b"")
+    os.utime(stale, (now - 3600, now - 3600))
+    (tmp_path / "unrelated.txt").write_text("kept")
+
+    assert prune_output_logs(str(tmp_path), max_files=3, max_age=1800) == 3
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "unrelated.txt", "workflow-output-0.log.gz", "workflow-output-1.log.gz", "workflow-output-2.log.gz"
+    ]
+
+@pytest.mark.asyncio
+async def test_spilled_logs_are_pruned_to_retention(tmp_path):
+    config = WorkflowConfiguration(output_head_size=100, output_tail_size=200, output_log_dir=tmp_path, output_log_max_files=2)
+    isolation = DirectIsolation(config)
+
+    for _ in range(4):
+        output = await isolation.execute(SCRIPT, {})
+
+    logs = sorted(tmp_path.glob("workflow-output-*.log.gz"))
+    assert len(logs) == 3
+    assert output.log_path in {str(p) for p in logs}
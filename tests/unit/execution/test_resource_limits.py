@@ -0,0 +1,79 @@
+"""
+Unit tests for process-group timeouts, resource limits and usage of direct execution.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.execution.isolation import DirectIsolation
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="process groups and rlimits are POSIX only")
+
+@pytest.mark.asyncio
+async def test_reports_cpu_time_and_max_rss(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+    script = "i=0; while [ $i -lt 200000 ]; do i=$((i+1)); done\necho done\n"
+
+    output = await DirectIsolation(config).execute(script, {})
+
+    assert output.exit_code == 0
+    assert output.cpu_time > 0
+    assert output.max_rss > 1024 * 1024
+
+@pytest.mark.asyncio
+async def test_timeout_kills_background_children(tmp_path):
+    config = WorkflowConfiguration(execution_timeout=1, output_log_dir=tmp_path)
+    marker = tmp_path / "survived"
+    script = f"(sleep 3; touch {marker}) &\nsleep 30\n"
+
+    start = time.monotonic()
+    output = await DirectIsolation(config).execute(script, {})
+
+    assert output.exit_code == 124
+    assert time.monotonic() - start < 10
+    time.sleep(3)
+    assert not marker.exists()
+
+@pytest.mark.asyncio
+async def test_open_files_limit_applies_to_script(tmp_path):
+    config = WorkflowConfiguration(script_open_files_limit=64, script_cpu_limit=30, output_log_dir=tmp_path)
+
+    output = await DirectIsolation(config).execute("ulimit -n\nulimit -t\n", {})
+
+    assert output.exit_code == 0
+    assert output.stdout.split() == ["64", "30"]
+
+@pytest.mark.asyncio
+async def test_exit_code_of_script_is_preserved(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+
+    output = await DirectIsolation(config).execute("echo failing >&2\nexit 3\n", {})
+
+    assert output.exit_code == 3
+    assert "failing" in output.stderr
+
+@pytest.mark.asyncio
+async def test_cancellation_kills_script_tree(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+    marker = tmp_path / "survived"
+    script = f"(sleep 2; touch {marker}) &\nsleep 2\ntouch {marker}\n"
+
+    task = asyncio.ensure_future(DirectIsolation(config).execute(script, {}))
+    await asyncio.sleep(0.5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    time.sleep(2.5)
+    assert not marker.exists()
+
+@pytest.mark.asyncio
+async def test_signal_exit_is_reported_as_128_plus_signal(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+
+    output = await DirectIsolation(config).execute("kill -TERM $$\n", {})
+
+    assert output.exit_code == 143
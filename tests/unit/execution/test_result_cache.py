@@ -0,0 +1,68 @@
+"""
+Unit tests for caching results of idempotent scripts.
+"""
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.core.state import WorkflowState
+from workflow_agent.execution.executor import ScriptExecutor
+from workflow_agent.execution.isolation import DirectIsolation
+from workflow_agent.execution.result_cache import get_result_cache, is_idempotent_script
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    get_result_cache().invalidate()
+    yield
+    get_result_cache().invalidate()
+
+def counting_script(counter, marker="# workflow-agent: read-only\n", exit_code=0):
+    return f"#!/bin/bash\n{marker}echo run >> {counter}\necho probed\nexit {exit_code}\n"
+
+def runs(counter):
+    return len(counter.read_text().splitlines()) if counter.exists() else 0
+
+def test_marker_detection():
+    assert is_idempotent_script("#!/bin/sh\n# workflow-agent: idempotent\nsystemctl is-active agent\n")
+    assert is_idempotent_script("# Workflow-Agent: Read-Only\n")
+    assert not is_idempotent_script("#!/bin/sh\nsystemctl restart agent\n")
+
+@pytest.mark.asyncio
+async def test_marked_script_runs_once_within_ttl(tmp_path):
+    isolation = DirectIsolation(WorkflowConfiguration(output_log_dir=tmp_path))
+    counter = tmp_path / "runs"
+    lines = []
+
+    first = await isolation.execute_cached(counting_script(counter), {"port": 8080})
+    second = await isolation.execute_cached(counting_script(counter), {"port": 8080}, on_output=lambda s, l: lines.append(l))
+    other = await isolation.execute_cached(counting_script(counter), {"port": 9090})
+
+    assert runs(counter) == 2
+    assert second is first and other.stdout == "probed\n"
+    assert lines == ["probed\n"]
+
+@pytest.mark.asyncio
+async def test_unmarked_failed_and_disabled_are_not_cached(tmp_path):
+    counter = tmp_path / "runs"
+    isolation = DirectIsolation(WorkflowConfiguration(output_log_dir=tmp_path))
+    for _ in range(2):
+        await isolation.execute_cached(counting_script(counter, marker=""), {})
+        await isolation.execute_cached(counting_script(counter, exit_code=1), {})
+        await isolation.execute_cached(counting_script(counter, marker=""), {}, idempotent=False)
+    disabled = DirectIsolation(WorkflowConfiguration(output_log_dir=tmp_path, script_cache_ttl=0))
+    for _ in range(2):
+        await disabled.execute_cached(counting_script(counter), {})
+
+    assert runs(counter) == 8
+
+@pytest.mark.asyncio
+async def test_executed_scripts_invalidate_cache(tmp_path):
+    config = WorkflowConfiguration(output_log_dir=tmp_path)
+    isolation = DirectIsolation(config)
+    counter = tmp_path / "runs"
+
+    await isolation.execute_cached(counting_script(counter), {})
+    state = WorkflowState(action="install", target_name="agent", integration_type="infra_agent", script="true\n")
+    await ScriptExecutor(config)._run_script(state, isolation)
+    await isolation.execute_cached(counting_script(counter), {})
+
+    assert runs(counter) == 2
@@ -0,0 +1,73 @@
+"""
+Unit tests for platform-aware documentation filtering.
+"""
+import re
+
+import pytest
+
+from workflow_agent.knowledge.enhancement import (
+    DocumentationEnhancer,
+    IntegrationContext,
+    PlatformCompatibilityIndex
+)
+
+def _is_compatible(platforms, ctx):
+    """Reference check: a platform value matches as a whole word, ignoring case."""
+    if not platforms:
+        return True
+    values = [value for value in (ctx.system, ctx.distribution, ctx.architecture) if value]
+    return any(
+        re.search(rf"\b{re.escape(value)}\b", platform, re.IGNORECASE)
+        for platform in platforms
+        for value in values
+    )
+
+@pytest.fixture
+def items():
+    return [
+        {"name": "any"},
+        {"name": "debian", "platforms": ["Debian 11", "Ubuntu (debian family)"]},
+        {"name": "windows", "platforms": ["Windows Server 2019"]},
+        {"name": "arm", "platforms": ["Linux-ARM64"]},
+        {"name": "x86_64 only", "platforms": ["x86_64"]},
+    ]
+
+@pytest.fixture
+def contexts():
+    return [
+        IntegrationContext.from_raw_data({"system": "Linux", "distribution": "Debian", "architecture": "x86_64"}),
+        IntegrationContext.from_raw_data({"system": "Windows", "architecture": "AMD64"}),
+        IntegrationContext.from_raw_data({"system": "Darwin", "architecture": "x86"}),
+        IntegrationContext.from_raw_data({"system": "Linux", "architecture": "arm64"}),
+    ]
+
+def test_index_lookup_matches_per_item_compatibility_check(items, contexts):
+    index = PlatformCompatibilityIndex(items)
+
+    for ctx in contexts:
+        expected = [item for item in items if _is_compatible(item.get("platforms", []), ctx)]
+        assert index.lookup(ctx) == expected
+
+def test_installation_methods_are_ordered_by_priority(contexts):
+    enhancer = DocumentationEnhancer(parser=None)
+    methods = [
+        {"name": "tarball", "priority": 1},
+        {"name": "apt", "priority": 5, "platforms": ["debian"]},
+        {"name": "msi", "priority": 9, "platforms": ["windows"]},
+    ]
+
+    indexes = enhancer._build_indexes({"prerequisites": [], "installation_methods": methods})
+    result = indexes["installation_methods"].lookup(contexts[0])
+
+    assert [method["name"] for method in result] == ["apt", "tarball"]
+
+def test_lookup_results_do_not_alias_the_index(items, contexts):
+    index = PlatformCompatibilityIndex(items)
+
+    expected = index.lookup(contexts[0])
+    first = index.lookup(contexts[0])
+    first.append({"name": "added"})
+    first[0]["name"] = "changed"
+
+    assert index.lookup(contexts[0]) == expected
+    assert items[0]["name"] == "any"
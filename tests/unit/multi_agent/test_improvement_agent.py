@@ -0,0 +1,61 @@
+"""
+Unit tests for ImprovementAgent persistence of learning data.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from workflow_agent.multi_agent.improvement import ImprovementAgent
+
+class _Agent(ImprovementAgent):
+    """ImprovementAgent without message bus handler registration."""
+
+    async def _handle_message(self, message):
+        pass
+
+    def register_handler(self, name, handler):
+        pass
+
+class _Store:
+    """Learning store whose writes yield control, like the SQLite-backed store."""
+
+    def __init__(self, during_write=None, fail=False):
+        self.records = {}
+        self.during_write = during_write
+        self.fail = fail
+
+    async def put_many(self, items):
+        if self.during_write is not None:
+            self.during_write, during_write = None, self.during_write
+            during_write()
+        if self.fail:
+            raise OSError("disk full")
+        items = list(items)
+        self.records.update(items)
+        return len(items)
+
+@pytest.fixture
+def agent():
+    agent = _Agent(MagicMock(), knowledge_base=MagicMock())
+    agent.learning_data = {"a": {"successes": 1}, "b": {"successes": 2}}
+    return agent
+
+@pytest.mark.asyncio
+async def test_keys_marked_dirty_during_a_write_are_kept(agent):
+    agent.learning_store = _Store(during_write=lambda: agent._dirty_keys.add("b"))
+
+    await agent._save_learning_data("a")
+    assert set(agent.learning_store.records) == {"a"}
+    assert agent._dirty_keys == {"b"}
+
+    await agent._save_learning_data()
+    assert set(agent.learning_store.records) == {"a", "b"}
+    assert not agent._dirty_keys
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_keys_dirty(agent):
+    agent.learning_store = _Store(fail=True)
+
+    await agent._save_learning_data("a")
+
+    assert agent._dirty_keys == {"a"}
@@ -0,0 +1,60 @@
+"""
+Unit tests for KnowledgeAgent reuse of enhanced knowledge.
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from workflow_agent.core.state import WorkflowState
+from workflow_agent.multi_agent.knowledge import KnowledgeAgent
+
+class _Agent(KnowledgeAgent):
+    """KnowledgeAgent with the message plumbing replaced by a record of published events."""
+
+    async def _handle_message(self, message):
+        pass
+
+    def register_handler(self, name, handler):
+        pass
+
+    async def publish(self, event, data):
+        self.published.append((event, data))
+
+@pytest.fixture
+def agent(tmp_path):
+    knowledge_base = MagicMock()
+    knowledge_base.retrieve_documents = AsyncMock(return_value={"definition": {"name": "infra_agent"}})
+    agent = _Agent(
+        MagicMock(),
+        knowledge_base=knowledge_base,
+        llm_service=MagicMock(),
+        config={"knowledge_cache_dir": str(tmp_path / "knowledge")}
+    )
+    agent.published = []
+    agent._enhance_documentation_with_llm = AsyncMock(return_value={"definition": {"steps": ["install"]}})
+    agent._generate_knowledge_reasoning = AsyncMock(return_value="reasoning")
+    return agent
+
+def _message(license_key):
+    state = WorkflowState(
+        action="install",
+        target_name="infra_agent",
+        integration_type="infra_agent",
+        parameters={"license_key": license_key}
+    )
+    return {"workflow_id": "wf", "state": state.model_dump()}
+
+@pytest.mark.asyncio
+async def test_cache_is_reused_only_for_the_same_parameter_values(agent):
+    await agent._handle_retrieve_knowledge(_message("secret-a"))
+    await agent._handle_retrieve_knowledge(_message("secret-a"))
+
+    assert agent._enhance_documentation_with_llm.await_count == 1
+    assert agent.published[-1][0] == "knowledge_retrieved"
+    assert agent.published[-1][1]["state"]["template_data"] == {"steps": ["install"]}
+
+    await agent._handle_retrieve_knowledge(_message("secret-b"))
+
+    assert agent._enhance_documentation_with_llm.await_count == 2
+    for path in agent.knowledge_cache.cache_dir.iterdir():
+        assert "secret" not in path.name
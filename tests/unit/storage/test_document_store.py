@@ -0,0 +1,88 @@
+"""
+Unit tests for the SQLite-backed document store.
+"""
+import json
+import sqlite3
+import pytest
+
+from workflow_agent.storage.document_store import DocumentStore
+from workflow_agent.storage.knowledge_cache import EnhancedKnowledgeBase
+
+@pytest.fixture
+def legacy_json(tmp_path):
+    path = tmp_path / "learning_data.json"
+    path.write_text(json.dumps({
+        "infra_agent_monitoring_agent_install": {"failures": [], "successes": 2, "improvements": []},
+        "infra_agent_infra_agent_install": {"failures": [], "successes": 1, "improvements": []}
+    }))
+    return path
+
+@pytest.mark.asyncio
+async def test_initialize_imports_legacy_json_once(tmp_path, legacy_json):
+    store = DocumentStore(str(tmp_path / "learning.db"), "learning", str(legacy_json))
+    await store.initialize()
+    await store.put("infra_agent_monitoring_agent_install", {"successes": 3})
+    await store.cleanup()
+
+    reopened = DocumentStore(str(tmp_path / "learning.db"), "learning", str(legacy_json))
+
+    assert await reopened.count() == 2
+    assert await reopened.get("infra_agent_monitoring_agent_install") == {"successes": 3}
+    await reopened.cleanup()
+
+@pytest.mark.asyncio
+async def test_put_writes_single_record_without_touching_others(tmp_path, legacy_json):
+    store = DocumentStore(str(tmp_path / "learning.db"), "learning", str(legacy_json))
+    await store.put("new_key", {"successes": 1})
+
+    assert await store.get("infra_agent_infra_agent_install") == {"failures": [], "successes": 1, "improvements": []}
+    assert await store.get("new_key") == {"successes": 1}
+    await store.cleanup()
+
+@pytest.mark.asyncio
+async def test_items_prefix_treats_underscore_literally(tmp_path):
+    store = DocumentStore(str(tmp_path / "docs.db"), "documents")
+    await store.put_many([("infra_agent_a_definition", 1), ("infraXagent_a_definition", 2)])
+
+    assert await store.keys("infra_agent_") == ["infra_agent_a_definition"]
+    await store.cleanup()
+
+@pytest.mark.asyncio
+async def test_enhanced_knowledge_base_retrieves_documents_by_type(tmp_path):
+    kb = EnhancedKnowledgeBase(str(tmp_path))
+    await kb.initialize()
+    await kb.add_document("infra_agent", "monitoring_agent", "definition", {"name": "monitoring_agent"})
+    await kb.add_document("infra_agent", "monitoring_agent", "parameters", {"license_key": {}})
+
+    docs = await kb.retrieve_documents("infra_agent", "monitoring_agent")
+
+    assert docs == {"definition": {"name": "monitoring_agent"}, "parameters": {"license_key": {}}}
+    await kb.cleanup()
+
+@pytest.mark.asyncio
+async def test_integration_records_do_not_include_longer_integration_names(tmp_path):
+    kb = EnhancedKnowledgeBase(str(tmp_path))
+    await kb.initialize()
+    await kb.add_document("infra", "infra", "definition", {"name": "infra"})
+    await kb.add_document("infra_agent", "infra_agent", "definition", {"name": "infra_agent"})
+
+    assert await kb.load_integration("infra") == {"infra_definition": {"name": "infra"}}
+    assert await kb.store.keys(integration_type="infra_agent") == ["infra_agent_infra_agent_definition"]
+    await kb.cleanup()
+
+@pytest.mark.asyncio
+async def test_records_from_before_the_integration_column_are_migrated(tmp_path):
+    db_path = str(tmp_path / "knowledge.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE records (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+        "updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+    )
+    conn.execute("INSERT INTO records VALUES ('documents', 'mysql_mysql_definition', '{}', 0)")
+    conn.commit()
+    conn.close()
+    kb = EnhancedKnowledgeBase(str(tmp_path))
+    await kb.initialize()
+
+    assert await kb.load_integration("mysql") == {"mysql_definition": {}}
+    await kb.cleanup()
@@ -0,0 +1,71 @@
+"""
+Unit tests for lazy, memory-bounded knowledge loading.
+"""
+import asyncio
+import pytest
+
+from workflow_agent.storage.history import ExecutionHistoryManager
+from workflow_agent.storage.knowledge_base import KnowledgeBase
+from workflow_agent.storage.knowledge_cache import LRUCache
+
+async def _seed(kb, integration_types):
+    for integration_type in integration_types:
+        await kb.add_document(integration_type, integration_type, "definition", {"name": integration_type})
+
+@pytest.mark.asyncio
+async def test_only_requested_integrations_are_loaded(tmp_path):
+    kb = KnowledgeBase(str(tmp_path), prefetch_count=0)
+    await _seed(kb, ["mysql", "redis", "nginx"])
+
+    await kb.retrieve_documents("redis")
+
+    assert list(kb.get_memory_usage()) == ["redis"]
+    assert kb.get_memory_usage()["redis"] > 0
+    await kb.cleanup()
+
+@pytest.mark.asyncio
+async def test_likely_next_integration_is_prefetched(tmp_path):
+    kb = KnowledgeBase(str(tmp_path), recent_integrations=["mysql", "redis", "mysql", "redis"])
+    await _seed(kb, ["mysql", "redis"])
+
+    await kb.retrieve_documents("mysql")
+    await asyncio.gather(*kb.enhanced_kb._prefetch_tasks)
+
+    assert set(kb.get_memory_usage()) == {"mysql", "redis"}
+    await kb.cleanup()
+
+def test_lru_cache_evicts_oldest_entries_over_byte_budget():
+    cache = LRUCache(max_size=10, ttl=None, max_bytes=100)
+    cache.set("a", "x", size=60)
+    cache.set("b", "y", size=30)
+    cache.get("a")
+    cache.set("c", "z", size=30)
+
+    assert cache.keys() == ["a", "c"]
+    assert cache.total_bytes == 90
+
+@pytest.mark.asyncio
+async def test_prefetch_is_seeded_from_execution_history(tmp_path):
+    history = ExecutionHistoryManager(str(tmp_path / "history.db"))
+    await history.initialize()
+    for integration_type in ["mysql", "redis", "mysql", "redis"]:
+        await history.save_execution(integration_type, "install", True, 1, "script", integration_type=integration_type)
+    kb = KnowledgeBase(str(tmp_path / "kb"), history=history)
+    await _seed(kb, ["mysql", "redis"])
+
+    await kb.retrieve_documents("mysql")
+    await asyncio.gather(*kb.enhanced_kb._prefetch_tasks)
+
+    assert set(kb.get_memory_usage()) == {"mysql", "redis"}
+    await kb.cleanup()
+    await history.cleanup()
+
+@pytest.mark.asyncio
+async def test_history_rows_without_integration_type_are_skipped(tmp_path):
+    history = ExecutionHistoryManager(str(tmp_path / "history.db"))
+    await history.initialize()
+    await history.save_execution("mysql-integration", "install", True, 1, "script")
+    await history.save_execution("redis-integration", "install", True, 1, "script", integration_type="redis")
+
+    assert await history.recent_integrations() == ["redis"]
+    await history.cleanup()
@@ -0,0 +1,59 @@
+"""
+Unit tests for the persistent enhanced-knowledge result cache.
+"""
+import pytest
+
+from workflow_agent.storage.knowledge_result_cache import KnowledgeResultCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return KnowledgeResultCache(cache_dir=str(tmp_path / "knowledge"))
+
+@pytest.fixture
+def docs():
+    return {"definition": {"name": "infra_agent", "installation": ["step"]}}
+
+def test_get_returns_value_persisted_by_another_instance(cache, docs, tmp_path):
+    fingerprint = cache.fingerprint_documents(docs)
+    key = cache.make_key("infra_agent", "infra_agent", "install", "linux-apt", {"license_key": "abc"})
+    cache.set(key, fingerprint, {"enhanced_docs": docs})
+
+    other = KnowledgeResultCache(cache_dir=str(tmp_path / "knowledge"))
+
+    assert other.get(key, fingerprint) == {"enhanced_docs": docs}
+
+def test_get_misses_when_documentation_changes(cache, docs):
+    key = cache.make_key("infra_agent", "infra_agent", "install", "linux-apt")
+    cache.set(key, cache.fingerprint_documents(docs), {"enhanced_docs": docs})
+
+    changed = {"definition": {"name": "infra_agent", "installation": ["other step"]}}
+
+    assert cache.get(key, cache.fingerprint_documents(changed)) is None
+    assert not (cache.cache_dir / f"{key}.json").exists()
+
+def test_make_key_depends_on_parameter_values_but_not_order(cache):
+    first = cache.make_key("infra_agent", "host-a", "install", "linux-apt", {"port": 80, "host": "a"})
+    second = cache.make_key("infra_agent", "host-a", "install", "linux-apt", {"host": "a", "port": 80})
+    other = cache.make_key("infra_agent", "host-a", "install", "linux-apt", {"host": "a", "port": 81})
+
+    assert first == second
+    assert first != other
+
+def test_failed_write_removes_temporary_file(cache, docs, monkeypatch):
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr("workflow_agent.storage.knowledge_result_cache.os.replace", fail_replace)
+    key = cache.make_key("infra_agent", "infra_agent", "install", "linux-apt")
+
+    cache.set(key, cache.fingerprint_documents(docs), {"enhanced_docs": docs})
+
+    assert list(cache.cache_dir.iterdir()) == []
+    assert cache.get(key, cache.fingerprint_documents(docs)) == {"enhanced_docs": docs}
+
+def test_platform_family_distinguishes_package_managers():
+    apt = KnowledgeResultCache.platform_family({"platform": {"system": "Linux"}, "package_managers": {"apt": True}})
+    yum = KnowledgeResultCache.platform_family({"os": "Linux", "package_managers": {"yum": True}})
+
+    assert apt == "linux-apt"
+    assert yum == "linux-yum"
+    assert KnowledgeResultCache.platform_family({"is_windows": True}) == "windows"
@@ -0,0 +1,73 @@
+"""
+Unit tests for shared template analysis.
+"""
+import pytest
+from jinja2 import TemplateSyntaxError
+
+from workflow_agent.templates.manager import TemplateManager
+from workflow_agent.templates.pipeline import SyntaxValidator
+from workflow_agent.templates.validator import TemplateValidator
+
+SOURCE = """{# META
+description: Install agent
+#}
+{% extends 'base.j2' %}
+{% block body %}curl {{ url }} | sh{% endblock %}
+"""
+
+@pytest.mark.asyncio
+async def test_registry_and_validator_share_one_parse(tmp_path):
+    (tmp_path / "base.j2").write_text("{% block body %}{% endblock %}")
+    (tmp_path / "install.j2").write_text(SOURCE)
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    parses = manager.analyzer.parses
+
+    result = await TemplateValidator(manager).validate_template("install.j2")
+
+    assert manager.analyzer.parses == parses
+    assert result["valid"]
+    assert [w["match"] for w in result["security_warnings"]] == ["curl {{ url }} | sh"]
+    info = manager.template_registry["install.j2"]
+    assert (info["extends"], info["blocks"], info["description"]) == ("base.j2", ["body"], "Install agent")
+
+@pytest.mark.asyncio
+async def test_syntax_errors_are_reported_from_analysis(tmp_path):
+    validator = SyntaxValidator()
+
+    result = await validator.validate("{% if x %}unterminated")
+    await validator.validate("{% if x %}unterminated")
+
+    assert not result.valid
+    assert result.errors[0].startswith("Syntax error:")
+    assert validator.analyzer.parses == 1
+
+def test_cached_analysis_raises_fresh_errors_and_is_immutable(tmp_path):
+    (tmp_path / "broken.j2").write_text("{% if x %}unterminated")
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    analysis = manager.analyzer.analyze("{% if x %}unterminated")
+
+    errors = []
+    for _ in range(2):
+        with pytest.raises(TemplateSyntaxError) as raised:
+            analysis.raise_syntax_error()
+        errors.append(raised.value)
+
+    assert errors[0] is not errors[1]
+    assert errors[1].lineno == analysis.syntax_error.lineno
+    assert analysis.syntax_error.__traceback__ is None
+
+    valid = manager.analyzer.analyze("{% block body %}{{ name }}{% endblock %}")
+    assert isinstance(valid.undeclared_variables, frozenset)
+    assert valid.blocks == ("body",)
+
+def test_metadata_does_not_share_nested_values_with_the_cache(tmp_path):
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    source = "{# META\ntags: [agent]\n#}\necho\n"
+
+    first = manager._extract_template_metadata(source, "a.j2")
+    first["tags"].append("changed")
+    second = manager._extract_template_metadata(source, "b.j2")
+
+    assert second["tags"] == ["agent"]
+    with pytest.raises(TypeError):
+        manager.analyzer.analyze(source).meta["tags"] = []
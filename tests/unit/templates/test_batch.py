@@ -0,0 +1,58 @@
+"""
+Unit tests for batch template rendering.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from workflow_agent.templates.batch import render_batch
+from workflow_agent.templates.manager import TemplateManager
+from workflow_agent.templates.pipeline import CacheResolver, Jinja2Renderer, TemplatePipeline
+
+@pytest.mark.asyncio
+async def test_manager_batch_deduplicates_contexts(tmp_path):
+    (tmp_path / "install.sh.j2").write_text("install on {{ host }}")
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    contexts = [{"host": "a"}, {"host": "b"}, {"host": "a"}]
+
+    results = [r async for r in manager.render_batch("install.sh.j2", contexts, max_workers=2)]
+
+    by_index = {tuple(r.indexes): r.content for r in results}
+    assert by_index == {(0, 2): "install on a", (1,): "install on b"}
+
+@pytest.mark.asyncio
+async def test_pipeline_batch_compiles_once_and_reports_errors(tmp_path):
+    resolver = CacheResolver()
+    resolver.add_template("install", "{{ host }} {{ port + 1 }}")
+    renderer = Jinja2Renderer(bytecode_cache_dir=str(tmp_path))
+    pipeline = TemplatePipeline(resolvers=[resolver], renderers=[renderer])
+    contexts = [{"host": f"h{i}", "port": i} for i in range(20)] + [{"host": "bad", "port": "x"}]
+
+    results = [r async for r in pipeline.process_batch("install", contexts, validate=False, max_workers=4)]
+
+    assert renderer.compiled_templates.compilations == 1
+    assert len(results) == 21
+    failed = [r for r in results if not r.success]
+    assert [r.indexes for r in failed] == [[20]]
+    assert {r.content for r in results if r.indexes == [3]} == {"h3 4"}
+
+@pytest.mark.asyncio
+async def test_stopping_early_drops_queued_renders():
+    rendered = []
+    lock = threading.Lock()
+
+    def render(context):
+        time.sleep(0.05)
+        with lock:
+            rendered.append(context["n"])
+        return str(context["n"])
+
+    batch = render_batch(render, [{"n": i} for i in range(20)], max_workers=1)
+    first = await batch.__anext__()
+    await batch.aclose()
+    await asyncio.sleep(0.2)
+
+    assert first.content == "0"
+    assert len(rendered) <= 2
@@ -0,0 +1,62 @@
+"""
+Unit tests for precompiled template bundles.
+"""
+import os
+import pytest
+
+from workflow_agent.templates.manager import TemplateManager
+
+@pytest.fixture
+def template_dir(tmp_path):
+    root = tmp_path / "templates"
+    (root / "infra_agent").mkdir(parents=True)
+    (root / "base.j2").write_text("{% block body %}{% endblock %}\n")
+    (root / "infra_agent" / "install_linux.sh.j2").write_text(
+        "{% extends 'base.j2' %}{% block body %}install {{ name }}{% endblock %}\n"
+    )
+    return root
+
+def _manager(template_dir, bundle_dir):
+    return TemplateManager(
+        template_dirs=[str(template_dir)],
+        bytecode_cache_dir=str(bundle_dir.parent / "bytecode"),
+        bundle_dir=str(bundle_dir)
+    )
+
+@pytest.mark.asyncio
+async def test_fresh_bundle_skips_template_scan(tmp_path, template_dir, monkeypatch):
+    bundle_dir = tmp_path / "bundle"
+    assert _manager(template_dir, bundle_dir).build_bundle() == 2
+
+    def fail_scan(self, template_dir):
+        raise AssertionError("templates scanned despite fresh bundle")
+    monkeypatch.setattr(TemplateManager, "_scan_templates", fail_scan)
+    manager = _manager(template_dir, bundle_dir)
+
+    assert manager.bundle_loaded
+    assert manager.inheritance_map["base.j2"] == ["infra_agent/install_linux.sh.j2"]
+    assert manager.template_registry["infra_agent/install_linux.sh.j2"]["requires"] == ["name"]
+    rendered = await manager.render_template("infra_agent/install_linux.sh.j2", {"name": "agent"}, use_cache=False)
+    assert rendered.strip() == "install agent"
+
+def test_changed_template_invalidates_bundle(tmp_path, template_dir):
+    bundle_dir = tmp_path / "bundle"
+    _manager(template_dir, bundle_dir).build_bundle()
+
+    child = template_dir / "infra_agent" / "install_linux.sh.j2"
+    child.write_text("{% block body %}install {{ name }} {{ version }}{% endblock %}\n")
+    stat = os.stat(child)
+    os.utime(child, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    manager = _manager(template_dir, bundle_dir)
+
+    assert not manager.bundle_loaded
+    assert sorted(manager.template_registry["infra_agent/install_linux.sh.j2"]["requires"]) == ["name", "version"]
+
+def test_default_bundle_dir_is_loaded_when_present(tmp_path, template_dir, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("WORKFLOW_TEMPLATE_BUNDLE_DIR", raising=False)
+    assert TemplateManager(template_dirs=[str(template_dir)]).bundle is None
+
+    TemplateManager(template_dirs=[str(template_dir)]).build_bundle(os.path.join("cache", "template_bundle"))
+
+    assert TemplateManager(template_dirs=[str(template_dir)]).bundle_loaded
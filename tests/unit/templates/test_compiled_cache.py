@@ -0,0 +1,36 @@
+"""
+Unit tests for compiled template caching in the pipeline renderer.
+"""
+import pytest
+
+from workflow_agent.templates.pipeline import Jinja2Renderer
+
+TEMPLATE = "#!/bin/bash\necho 'Installing {{ name }} on {{ host }}'\n"
+
+@pytest.mark.asyncio
+async def test_render_compiles_each_template_once(tmp_path):
+    renderer = Jinja2Renderer(bytecode_cache_dir=str(tmp_path))
+
+    outputs = [await renderer.render(TEMPLATE, {"name": "agent", "host": f"host-{i}"}) for i in range(50)]
+
+    assert renderer.compiled_templates.compilations == 1
+    assert outputs[7] == "#!/bin/bash\necho 'Installing agent on host-7'\n"
+
+@pytest.mark.asyncio
+async def test_bytecode_cache_is_reused_by_new_renderer(tmp_path):
+    await Jinja2Renderer(bytecode_cache_dir=str(tmp_path)).render(TEMPLATE, {"name": "a", "host": "b"})
+    renderer = Jinja2Renderer(bytecode_cache_dir=str(tmp_path))
+
+    rendered = await renderer.render(TEMPLATE, {"name": "a", "host": "b"})
+
+    assert renderer.compiled_templates.compilations == 0
+    assert rendered == "#!/bin/bash\necho 'Installing a on b'\n"
+
+@pytest.mark.asyncio
+async def test_compiled_cache_is_bounded(tmp_path):
+    renderer = Jinja2Renderer(cache_size=2, use_bytecode_cache=False)
+
+    for i in range(5):
+        await renderer.render(f"{{{{ value }}}}-{i}", {"value": i})
+
+    assert len(renderer.compiled_templates) == 2
@@ -0,0 +1,52 @@
+"""
+Unit tests for compiled conditional rendering.
+"""
+import pytest
+
+from workflow_agent.templates.conditional import ConditionalTemplateRenderer
+from workflow_agent.templates.manager import TemplateManager
+
+CONTENT = (
+    "start\n"
+    "<!-- BEGIN:IF system.os == 'linux' AND verbose -->linux verbose\n<!-- END:IF -->"
+    "<!-- BEGIN:IF packages contains 'curl' OR force -->curl\n<!-- END:IF -->"
+    "<!-- BEGIN:IF count > 2 -->many\n<!-- END:IF -->"
+    "end"
+)
+
+@pytest.fixture
+def renderer(tmp_path):
+    (tmp_path / "base.j2").write_text("{% block body %}{% endblock %}")
+    (tmp_path / "child.j2").write_text("{% extends 'base.j2' %}{% block body %}{{ name }}{% endblock %}")
+    (tmp_path / "broken.j2").write_text("{% include 'missing.j2' %}")
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    return ConditionalTemplateRenderer(manager)
+
+@pytest.mark.asyncio
+async def test_conditional_blocks_compile_once(renderer):
+    context = {"system": {"os": "linux"}, "verbose": True, "packages": ["wget"], "count": 3}
+
+    first = await renderer.render_conditional_blocks(CONTENT, context)
+    plan = renderer.compile_conditional_blocks(CONTENT)
+    second = await renderer.render_conditional_blocks(CONTENT, {"packages": ["curl"], "count": 1})
+
+    assert first == "start\nlinux verbose\nmany\nend"
+    assert second == "start\ncurl\nend"
+    assert renderer.compile_conditional_blocks(CONTENT) is plan
+    assert renderer._evaluate_simple_condition("system.os != 'linux'", context) is False
+
+@pytest.mark.asyncio
+async def test_nested_plan_follows_registry_generation(renderer):
+    result = await renderer.render_nested_template("child.j2", {"name": "agent"})
+    plan = renderer.get_nested_plan("child.j2")
+
+    assert result["rendered"] == "agent"
+    assert result["includes"] == ["base.j2"]
+    assert renderer.get_nested_plan("child.j2") is plan
+
+    renderer.template_manager.reload_templates()
+    assert renderer.get_nested_plan("child.j2") is not plan
+
+    broken = await renderer.render_nested_template("broken.j2", {})
+    assert not broken["success"]
+    assert "missing.j2" in broken["error"]
@@ -0,0 +1,62 @@
+"""
+Unit tests for fuzzy parameter name matching.
+"""
+import random
+import string
+
+import pytest
+
+from workflow_agent.templates.fuzzy import NGramIndex, bounded_levenshtein
+from workflow_agent.templates.manager import TemplateManager
+from workflow_agent.templates.validator import TemplateValidator
+
+def _levenshtein(s1, s2):
+    """Reference edit distance by the full dynamic programming table."""
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current = [i + 1]
+        for j, c2 in enumerate(s2):
+            current.append(min(previous[j + 1] + 1, current[j] + 1, previous[j] + (c1 != c2)))
+        previous = current
+    return previous[-1]
+
+def test_bounded_levenshtein_exits_beyond_bound():
+    assert bounded_levenshtein("license_key", "licence_key", 2) == 1
+    assert bounded_levenshtein("install_dir", "log_path", 2) is None
+    assert bounded_levenshtein("a", "abcd", 2) is None
+
+def test_ngram_index_matches_brute_force():
+    rng = random.Random(7)
+    words = {"".join(rng.choices(string.ascii_lowercase[:6], k=rng.randint(1, 9))) for _ in range(400)}
+    index = NGramIndex(words)
+
+    for query in sorted(words)[:40] + ["abcabc", "fedcba", "x", "zz"]:
+        expected = sorted(
+            (_levenshtein(query, word), word) for word in words
+            if _levenshtein(query, word) <= 2
+        )
+        assert index.search(query, 2) == expected
+
+@pytest.mark.asyncio
+async def test_validate_parameters_suggests_required_names(tmp_path):
+    names = [f"param_{i:03d}" for i in range(300)] + ["license_key"]
+    (tmp_path / "install.j2").write_text(" ".join(f"{{{{ {name} }}}}" for name in names))
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+    parameters = {name: 1 for name in names if name != "license_key"}
+    parameters["licence_key"] = "x"
+
+    result = await TemplateValidator(manager).validate_parameters("install.j2", parameters)
+
+    assert result["missing_parameters"] == ["license_key"]
+    assert result["suggestions"] == {"licence_key": ["license_key"]}
+
+def test_parameter_indexes_are_bounded():
+    validator = TemplateValidator()
+    validator.max_parameter_indexes = 2
+
+    first = validator._get_parameter_index("a", {"x"})
+    validator._get_parameter_index("b", {"y"})
+    assert validator._get_parameter_index("a", {"x"}) is first
+    validator._get_parameter_index("c", {"z"})
+
+    assert list(validator._parameter_indexes) == ["a", "c"]
@@ -0,0 +1,80 @@
+"""
+Unit tests for the rendered template cache.
+"""
+from datetime import datetime
+
+import pytest
+
+from workflow_agent.templates.manager import TemplateCache, TemplateManager
+
+def test_evicts_least_recently_used_entry():
+    cache = TemplateCache(max_size=2)
+    cache.set("a.j2:1", "a")
+    cache.set("b.j2:1", "b")
+    cache.get("a.j2:1")
+    cache.set("c.j2:1", "c")
+
+    assert cache.get("b.j2:1") is None
+    assert cache.get("a.j2:1") == "a"
+    assert len(cache.cache) == 2
+
+def test_byte_budget_bounds_total_size():
+    cache = TemplateCache(max_size=100, max_bytes=10)
+    cache.set("a.j2:1", "x" * 6)
+    cache.set("b.j2:1", "y" * 6)
+
+    assert cache.get("a.j2:1") is None
+    assert cache.total_bytes == 6
+
+    cache.set("huge.j2:1", "z" * 11)
+    assert cache.get("huge.j2:1") is None
+    assert cache.get("b.j2:1") == "y" * 6
+
+def test_expired_entries_are_dropped_lazily(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("workflow_agent.templates.manager.time.time", lambda: now[0])
+    cache = TemplateCache(ttl=10)
+    cache.set("a.j2:1", "a")
+    now[0] += 11
+    cache.set("b.j2:1", "b")
+
+    assert "a.j2:1" not in cache.cache
+    assert cache.total_bytes == 1
+
+def test_invalidate_uses_template_index():
+    cache = TemplateCache()
+    cache.set("infra_agent/install.j2:1", "a")
+    cache.set("infra_agent/install.j2:2", "b")
+    cache.set("common/verify.j2:1", "c")
+
+    cache.invalidate(r"^infra_agent/")
+
+    assert len(cache.cache) == 1
+    assert list(cache.key_index) == ["common/verify.j2"]
+    assert cache.invalidate_template("common/verify.j2") == 1
+    assert cache.total_bytes == 0
+
+def test_stable_hash_handles_arbitrary_values():
+    from datetime import datetime
+    from pathlib import Path
+    from workflow_agent.templates.compiled_cache import stable_hash
+
+    first = {"when": datetime(2024, 1, 1), "paths": {Path("/a"), Path("/b")}, "n": 1}
+    second = {"n": 1, "paths": {Path("/b"), Path("/a")}, "when": datetime(2024, 1, 1)}
+
+    assert stable_hash(first) == stable_hash(second)
+    assert stable_hash(first) != stable_hash({**first, "n": 2})
+
+@pytest.mark.asyncio
+async def test_render_cache_ignores_unreferenced_context(tmp_path):
+    (tmp_path / "base.j2").write_text("{{ host }}:{% block body %}{% endblock %}")
+    (tmp_path / "install.j2").write_text("{% extends 'base.j2' %}{% block body %}{{ name }}{% endblock %}")
+    manager = TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+
+    first = await manager.render_template("install.j2", {"name": "a", "host": "h", "timestamp": datetime.now()})
+    await manager.render_template("install.j2", {"name": "a", "host": "h", "timestamp": datetime.now()})
+    changed = await manager.render_template("install.j2", {"name": "a", "host": "other"})
+
+    assert first == "h:a"
+    assert changed == "other:a"
+    assert len(manager.cache.cache) == 2
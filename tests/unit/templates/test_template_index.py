@@ -0,0 +1,49 @@
+"""
+Unit tests for indexed template lookup in the template manager.
+"""
+import pytest
+
+from workflow_agent.templates.manager import TemplateManager, TemplatePathIndex
+
+def test_path_index_prefix_lookup_and_remove():
+    index = TemplatePathIndex()
+    for path in ["infra_agent/install_linux.sh.j2", "infra_agent/install.sh.j2", "common/install.sh.j2"]:
+        index.add(path)
+
+    assert index.find_prefix("infra_agent/install") == ["infra_agent/install.sh.j2", "infra_agent/install_linux.sh.j2"]
+    assert index.find_prefix("generic/") == []
+
+    index.remove("infra_agent/install.sh.j2")
+    assert index.find_prefix("infra_agent/") == ["infra_agent/install_linux.sh.j2"]
+    assert "infra_agent/install.sh.j2" not in index
+
+@pytest.fixture
+def manager(tmp_path):
+    for rel_path in ["infra_agent/install_linux.sh.j2", "infra_agent/install_windows.ps1.j2", "common/install.sh.j2"]:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("echo {{ name }}\n")
+    return TemplateManager(template_dirs=[str(tmp_path)], bytecode_cache_dir=str(tmp_path / "bytecode"))
+
+@pytest.mark.asyncio
+async def test_find_templates_orders_by_specificity(manager):
+    matches = await manager.find_templates_for_integration("infra_agent", "install", {"is_windows": False})
+
+    assert [m["path"] for m in matches] == [
+        "infra_agent/install_linux.sh.j2",
+        "infra_agent/install_linux.sh.j2",
+        "common/install.sh.j2",
+    ]
+
+@pytest.mark.asyncio
+async def test_select_best_template_checks_index_without_loading(manager, monkeypatch):
+    def fail_load(*args, **kwargs):
+        raise AssertionError("template loaded for existence check")
+    monkeypatch.setattr(manager.env, "get_template", fail_load)
+
+    best = await manager.select_best_template(
+        [{"path": "missing.j2", "conditions": {}}, {"path": "common/install.sh.j2", "conditions": {}}],
+        {}
+    )
+
+    assert best == "common/install.sh.j2"
@@ -0,0 +1,62 @@
+"""
+Unit tests for incremental template registry scans.
+"""
+import os
+
+from workflow_agent.templates.registry.template_registry import TemplateRegistry
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+def _age(path, seconds=60):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+def _registry(tmp_path):
+    return TemplateRegistry([str(tmp_path / "templates")], index_path=str(tmp_path / "index" / "index.json"))
+
+def test_rescan_reuses_directory_listing_and_skips_hashing(tmp_path, monkeypatch):
+    template = tmp_path / "templates" / "script" / "infra_agent" / "install" / "linux.sh.j2"
+    _write(template, "echo {{ name }}")
+    for directory in [template.parent, template.parent.parent, template.parent.parent.parent, tmp_path / "templates"]:
+        _age(directory)
+    assert _registry(tmp_path).scan_templates() == {"script/infra_agent/install/linux.sh.j2"}
+
+    registry = _registry(tmp_path)
+    monkeypatch.setattr(os, "scandir", lambda *a, **k: (_ for _ in ()).throw(AssertionError("directory listed")))
+    monkeypatch.setattr(
+        "workflow_agent.templates.registry.template_registry.TemplateInfo._compute_hash",
+        lambda self: (_ for _ in ()).throw(AssertionError("template hashed"))
+    )
+
+    assert registry.scan_templates() == set()
+    assert registry.templates["script/infra_agent/install/linux.sh.j2"].variables == ["name"]
+
+def test_modified_and_removed_templates_are_journaled(tmp_path):
+    root = tmp_path / "templates"
+    _write(root / "a.j2", "{{ a }}")
+    _write(root / "b.j2", "{{ b }}")
+    registry = _registry(tmp_path)
+    registry.scan_templates()
+
+    _write(root / "a.j2", "{{ a }} {{ extra }}")
+    os.remove(root / "b.j2")
+    assert registry.scan_templates() == {"a.j2", "b.j2"}
+    assert os.path.exists(registry.journal_path)
+
+    reloaded = _registry(tmp_path)
+    assert sorted(reloaded.templates) == ["a.j2"]
+    assert sorted(reloaded.templates["a.j2"].variables) == ["a", "extra"]
+
+def test_refresh_paths_processes_only_given_files(tmp_path):
+    root = tmp_path / "templates"
+    _write(root / "a.j2", "{{ a }}")
+    registry = _registry(tmp_path)
+    registry.scan_templates()
+
+    _write(root / "new.j2", "{{ n }}")
+    _write(root / "ignored.j2", "{{ i }}")
+
+    assert registry.refresh_paths([str(root / "new.j2")]) == {"new.j2"}
+    assert "ignored.j2" not in registry.templates
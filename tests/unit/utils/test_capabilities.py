@@ -0,0 +1,82 @@
+"""
+Unit tests for the cached capability registry.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from workflow_agent.utils.capabilities import CapabilityRegistry
+
+def test_probes_once_per_ttl():
+    registry = CapabilityRegistry(ttl=60)
+
+    assert registry.check_many(["command:sh", "command:definitely-not-a-tool", "module:json"]) == {
+        "command:sh": True,
+        "command:definitely-not-a-tool": False,
+        "module:json": True,
+    }
+    assert registry.has_command("sh")
+    assert registry.probes == 3
+
+    registry.ttl = 0
+    assert registry.has_command("sh")
+    assert registry.probes == 4
+
+def test_concurrent_checks_share_one_probe():
+    registry = CapabilityRegistry()
+    calls = []
+
+    def slow_probe():
+        calls.append(1)
+        time.sleep(0.1)
+        return True
+
+    threads = [threading.Thread(target=registry.check, args=("slow", slow_probe)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        registry.check("unknown")
+
+def test_results_persist_for_the_same_path(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "capabilities.json")
+    CapabilityRegistry(cache_path=cache_path).check("custom", lambda: True)
+
+    assert CapabilityRegistry(cache_path=cache_path).check("custom", lambda: False)
+
+    monkeypatch.setenv("PATH", "/nonexistent")
+    assert not CapabilityRegistry(cache_path=cache_path).check("custom", lambda: False)
+
+@pytest.mark.asyncio
+async def test_async_probes_are_cached():
+    registry = CapabilityRegistry()
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        return True
+
+    assert await registry.check_async("docker:docker", probe)
+    assert await registry.check_async("docker:docker", probe)
+    assert await registry.check_many_async(["command:sh", "module:json"]) == {"command:sh": True, "module:json": True}
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_async_checks_share_one_probe():
+    registry = CapabilityRegistry()
+    calls = []
+
+    async def slow_probe():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return True
+
+    results = await asyncio.gather(*(registry.check_async("slow", slow_probe) for _ in range(5)))
+
+    assert results == [True] * 5
+    assert len(calls) == 1
@@ -0,0 +1,101 @@
+"""
+Unit tests for the persistent shell worker.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from workflow_agent.config.configuration import WorkflowConfiguration
+from workflow_agent.core.state import WorkflowState
+from workflow_agent.utils.shell_worker import ShellWorker, ShellWorkerPool
+from workflow_agent.verification.manager import VerificationStep
+from workflow_agent.verification.runner import VerificationRunner
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="shell worker needs bash")
+
+@pytest.mark.asyncio
+async def test_commands_share_one_shell_but_not_state():
+    worker = ShellWorker()
+    try:
+        assert await worker.run("echo out; echo err >&2; exit 3") == (3, "out\n", "err\n")
+        assert await worker.run("printf 'no newline'") == (0, "no newline", "")
+        assert await worker.run("cd /; LEAK=1") == (0, "", "")
+        exit_code, stdout, _ = await worker.run('echo "[$LEAK]"; read line || echo "no stdin"')
+        assert (exit_code, stdout) == (0, "[]\nno stdin\n")
+        assert worker.starts == 1 and worker.commands == 4
+    finally:
+        await worker.close()
+
+@pytest.mark.asyncio
+async def test_timeout_restarts_worker():
+    worker = ShellWorker()
+    try:
+        exit_code, _, stderr = await worker.run("sleep 10", timeout=0.5)
+        assert exit_code == 124
+        assert "timed out" in stderr
+        assert await worker.run("echo back") == (0, "back\n", "")
+        assert worker.starts == 2
+    finally:
+        await worker.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_command_does_not_leak_into_next():
+    worker = ShellWorker()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(worker.run("sleep 1; echo stale-output"), 0.3)
+        await asyncio.sleep(1)
+        assert await worker.run("echo fresh") == (0, "fresh\n", "")
+        assert worker.starts == 2
+    finally:
+        await worker.close()
+
+@pytest.mark.asyncio
+async def test_output_is_bounded():
+    worker = ShellWorker(head_size=1000, tail_size=2000)
+    try:
+        exit_code, stdout, _ = await worker.run("head -c 5000000 /dev/zero | tr '\\0' x; echo; echo last")
+        assert exit_code == 0
+        assert stdout.startswith("x" * 1000)
+        assert stdout.endswith("x\nlast\n")
+        assert "bytes truncated" in stdout
+        assert len(stdout) < 10000
+        assert await worker.run("echo next") == (0, "next\n", "")
+    finally:
+        await worker.close()
+
+@pytest.mark.asyncio
+async def test_pool_runs_commands_concurrently():
+    pool = ShellWorkerPool(size=3)
+    try:
+        start = time.monotonic()
+        results = await asyncio.gather(
+            pool.run("sleep 0.5; echo a"),
+            pool.run("sleep 0.5; echo b"),
+            pool.run("sleep 5", timeout=0.5)
+        )
+        assert time.monotonic() - start < 2
+        assert results[0] == (0, "a\n", "") and results[1] == (0, "b\n", "")
+        assert results[2][0] == 124
+        # Only the worker that timed out was killed
+        assert sum(worker._process is not None for worker in pool.workers) == 2
+        assert await pool.run("echo again") == (0, "again\n", "")
+    finally:
+        await pool.close()
+
+def test_worker_is_opt_in_for_verification_steps():
+    assert WorkflowConfiguration().verification_shell_worker is False
+
+@pytest.mark.asyncio
+async def test_verification_steps_run_in_worker(tmp_path):
+    runner = VerificationRunner(WorkflowConfiguration(
+        isolation_method="direct", output_log_dir=tmp_path, verification_shell_worker=True
+    ))
+    state = WorkflowState(action="verify", target_name="agent", integration_type="infra_agent")
+    step = VerificationStep(name="shell", description="", script="echo $((6 * 7))\n", expected_result="42")
+
+    result = await runner.run_step(step, state)
+
+    assert result["success"], result
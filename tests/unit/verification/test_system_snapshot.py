@@ -0,0 +1,103 @@
+"""
+Unit tests for native package, process and port lookups.
+"""
+import os
+import socket
+import sys
+
+import psutil
+import pytest
+
+from workflow_agent.verification.platform_verifier import PlatformVerifier
+from workflow_agent.verification.system_snapshot import (
+    PackageIndex, SystemSnapshot, parse_dpkg_status, read_listening_ports
+)
+
+DPKG_STATUS = """Package: curl
+Status: install ok installed
+Architecture: amd64
+Version: 7.88.1-10
+
+Package: removed-tool
+Status: deinstall ok config-files
+Version: 1.0
+
+Package: libfoo
+Status: install ok installed
+Version: 2.1
+"""
+
+def test_parse_dpkg_status_keeps_installed_packages():
+    assert parse_dpkg_status(DPKG_STATUS) == {"curl": "7.88.1-10", "curl:amd64": "7.88.1-10", "libfoo": "2.1"}
+
+def test_parse_dpkg_status_without_trailing_newline():
+    status = "Package: curl\nStatus: install ok installed\nArchitecture: arm64\nVersion: 8.0"
+
+    assert parse_dpkg_status(status) == {"curl": "8.0", "curl:arm64": "8.0"}
+
+def test_package_index_reloads_only_when_database_changes(tmp_path):
+    status = tmp_path / "status"
+    status.write_text(DPKG_STATUS)
+    index = PackageIndex(dpkg_status_path=str(status), rpm_db_dirs=(), pacman_local_dir=str(tmp_path / "none"))
+
+    assert index.is_installed("curl")
+    assert not index.is_installed("removed-tool")
+    assert index.loads == 1
+
+    status.write_text(DPKG_STATUS + "\nPackage: agent\nStatus: install ok installed\nVersion: 1\n")
+    os.utime(status, ns=(1, 1))
+    assert index.is_installed("agent")
+    assert index.loads == 2
+
+def test_package_index_without_databases(tmp_path):
+    index = PackageIndex(dpkg_status_path=str(tmp_path / "none"), rpm_db_dirs=(), pacman_local_dir=str(tmp_path / "none"))
+
+    assert index.is_installed("curl") is None
+
+def test_read_listening_ports(tmp_path):
+    tcp = tmp_path / "tcp"
+    tcp.write_text(
+        "  sl  local_address rem_address   st tx_queue rx_queue\n"
+        "   0: 0100007F:1F90 00000000:0000 0A 00000000:00000000\n"
+        "   1: 0100007F:D431 0100007F:1F90 01 00000000:00000000\n"
+    )
+
+    assert read_listening_ports((str(tcp),)) == {8080}
+    assert read_listening_ports((str(tmp_path / "missing"),)) is None
+
+def test_snapshot_is_shared_until_refreshed():
+    snapshot = SystemSnapshot(max_age=60)
+    own_name = psutil.Process().name()
+
+    assert snapshot.is_process_running(own_name)
+    assert snapshot.process_names() is snapshot.process_names()
+    views = snapshot.process_names()
+    snapshot.refresh()
+    assert snapshot.process_names() is not views
+
+def test_miss_on_reused_view_takes_a_new_one(monkeypatch):
+    snapshot = SystemSnapshot(max_age=60)
+    snapshot.process_names()
+    snapshot._processes = (snapshot._processes[0], frozenset())
+    snapshot._ports = (snapshot._processes[0], set())
+    monkeypatch.setattr("workflow_agent.verification.system_snapshot.read_listening_ports", lambda: {8080})
+
+    assert snapshot.is_process_running(psutil.Process().name())
+    assert snapshot.is_port_listening(8080)
+    assert not snapshot.is_port_listening(9090)
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/net/tcp")
+async def test_port_check_reads_proc():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    port = server.getsockname()[1]
+    try:
+        verifier = PlatformVerifier()
+        assert await verifier.verify_port_in_use(port)
+        assert verifier.snapshot.listening_ports() is not None
+    finally:
+        server.close()
+    verifier.snapshot.refresh()
+    assert await verifier.verify_port_not_in_use(port)